@@ -1,7 +1,30 @@
 from abc import abstractmethod
+from typing import Callable, Tuple
+
+from globals import CurrentUser
+from rich import print
+from util.output import TABLE
 
 
 class Command:
+    # Subcommands that list rows and accept --format, see util.output
+    LISTINGS: Tuple[str, ...] = ()
+
     @abstractmethod
-    def handle(self, command):
+    def handle(self, command, current_user: CurrentUser):
         pass
+
+    def run(
+        self,
+        subcommand: str,
+        handler: Callable,
+        current_user: CurrentUser,
+        output: str = TABLE,
+    ) -> None:
+        """Runs a subcommand, passing the output format to the listings."""
+        if subcommand in self.LISTINGS:
+            handler(current_user, output=output)
+        elif output != TABLE:
+            print(f"[red]{subcommand} does not support --format[/red]")
+        else:
+            handler(current_user)
@@ -1,12 +1,18 @@
-from command.factory import Command
+import os
+
+from command.command import Command
 from globals import CurrentUser
-from repository.customers import Customers, CustomersRepository
-from repository.users import Users, UsersRepository
+from repository.customers import CustomerRow, Customers
 from rich import print
 from rich.console import Console
 from rich.prompt import Prompt
 from rich.table import Table
-from util.decorator import singleton
+from service.customers import CustomerService
+from service.errors import ServiceError
+from util.exporter import prompt_export
+from util.importer import import_file, print_result
+from util.output import TABLE, split_format, write_rows
+from util.pagination import PAGE_SIZE, show_pages, show_rows
 from util.validation import (
     get_validated_input,
     validate_digit,
@@ -15,7 +21,6 @@ from util.validation import (
 )
 
 
-@singleton
 class CustomerCommand(Command):
     HELP_MESSAGE = """
     Available Commands:
@@ -24,24 +29,34 @@ class CustomerCommand(Command):
         /customer add     Add a new customer
         /customer update  Update a customer information
         /customer delete  Delete a customer
+        /customer import  Import customers from a CSV or JSONL file
+        /customer export  Export customers to a CSV or JSONL file
+
+    Add --format plain, csv or jsonl to list or search to print every row as text.
     """
+    LISTINGS = ("list", "search")
 
-    def __init__(self, current_user: CurrentUser) -> None:
-        self.customer_repo = CustomersRepository()
-        self.users_repo = UsersRepository()
-        self.current_user = current_user
+    def __init__(self) -> None:
+        self.customer_service = CustomerService()
         self.commands = {
             "list": self.list_customers,
             "search": self.search_customer,
             "add": self.add_customer,
             "update": self.update_customer,
             "delete": self.delete_customer,
+            "import": self.import_customers,
+            "export": self.export_customers,
         }
 
-    def handle(self, command):
-        if self.current_user.role_name == "customer":
+    def handle(self, command, current_user: CurrentUser):
+        if current_user.role_name == "customer":
             print(f"[red]Unknown command: {command}[/red]")
             return
+        try:
+            command, output = split_format(command)
+        except ValueError as e:
+            print(f"[red]{e}[/red]")
+            return
         parts = command.split()
         if len(parts) < 2:
             print(self.HELP_MESSAGE)
@@ -50,24 +65,39 @@ class CustomerCommand(Command):
         subcommand = parts[1]
 
         if subcommand in self.commands:
-            self.commands[subcommand]()
+            self.run(subcommand, self.commands[subcommand], current_user, output)
         else:
             print(f"[red]Unknown subcommand: {subcommand}[/red]")
 
-    def list_customers(self):
-        customers = self.customer_repo.get_customers(search_str="")
-        self.display_customer_table(customers)
+    def list_customers(self, current_user: CurrentUser, output: str = TABLE):
+        if output != TABLE:
+            customers = self.customer_service.list_customers(
+                current_user, limit=None, stream=True
+            )
+            write_rows(customers, CustomerRow._fields, output)
+            return
+        show_pages(
+            lambda after_id, limit: self.customer_service.list_customers(
+                current_user, after_id=after_id, limit=limit
+            ),
+            self.display_customer_table,
+        )
 
-    def search_customer(self):
+    def search_customer(self, current_user: CurrentUser, output: str = TABLE):
         keyword = Prompt.ask("Enter the keyword to search")
-        customers = self.customer_repo.get_customers(keyword)
-        self.display_customer_table(customers)
+        customers = self.customer_service.search_customers(
+            current_user, keyword, limit=PAGE_SIZE
+        )
+        if output != TABLE:
+            write_rows(customers, CustomerRow._fields, output)
+            return
+        show_rows(customers, self.display_customer_table)
 
-    def add_customer(self):
+    def add_customer(self, current_user: CurrentUser):
         username = get_validated_input(
             "Enter your username",
             "The username has exist, please try again.",
-            self.users_repo.username_exists,
+            self.customer_service.users_repo.username_exists,
             False,
         )
         customer = Customers()
@@ -86,7 +116,7 @@ class CustomerCommand(Command):
         customer.driver_license = get_validated_input(
             "Enter the driver license",
             "The driver license has exist.",
-            self.customer_repo.driver_license_exits,
+            self.customer_service.customer_repo.driver_license_exits,
             False,
         )
 
@@ -96,15 +126,17 @@ class CustomerCommand(Command):
             optional=False,
             password=True,
         )
-        user = Users(username=username, password=password, role_id=2)
-        user_id = self.users_repo.add_user(user)
-
-        customer.user_id = user_id
-        self.customer_repo.add_customer(customer)
+        try:
+            self.customer_service.add_customer(
+                current_user, customer, username, password
+            )
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
 
         print("[green]Customer added successfully[/green]")
 
-    def update_customer(self):
+    def update_customer(self, current_user: CurrentUser):
         customer = Customers()
 
         customer_id = get_validated_input(
@@ -129,26 +161,38 @@ class CustomerCommand(Command):
         customer.address = Prompt.ask("Enter the address (optional)")
         customer.driver_license = Prompt.ask("Enter the driver license (optional)")
 
-        self.customer_repo.update_customer(customer)
+        try:
+            self.customer_service.update_customer(current_user, customer)
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
 
         print("[green]Customer updated successfully[/green]")
 
-    def delete_customer(self):
+    def delete_customer(self, current_user: CurrentUser):
         id = get_validated_input(
             "Enter the customer id",
             "The customer id is not valid",
             validate_digit,
         )
-
-        customer = self.customer_repo.get_by_customer_id(id)
-        if customer is None:
-            print("[red]Can not find the customer[/red]")
+        try:
+            self.customer_service.delete_customer(current_user, int(id))
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
             return
-
-        self.customer_repo.delete_customer(id)
-        self.users_repo.delete_user(customer.user_id)
         print("[green]Customer deleted successfully[/green]")
 
+    def import_customers(self, current_user: CurrentUser):
+        path = get_validated_input(
+            "Enter the CSV or JSONL file path",
+            "The file does not exist",
+            os.path.isfile,
+        )
+        print_result(import_file("customers", path))
+
+    def export_customers(self, current_user: CurrentUser):
+        prompt_export("customers")
+
     def display_customer_table(self, customers):
         table = Table()
         table.add_column("customer_id")
@@ -162,14 +206,14 @@ class CustomerCommand(Command):
 
         for customer in customers:
             table.add_row(
-                str(customer[0]),
-                str(customer[1]),
-                customer[2],
-                customer[3],
-                customer[4],
-                customer[5],
-                customer[6],
-                customer[7],
+                str(customer.customer_id),
+                str(customer.user_id),
+                customer.full_name,
+                customer.email,
+                customer.phone,
+                customer.address,
+                customer.driver_license,
+                customer.created_at,
             )
         console = Console()
         console.print(table)
@@ -0,0 +1,99 @@
+from command.command import Command
+from db import config
+from globals import CurrentUser
+from rich import print
+from rich.console import Console
+from rich.prompt import Prompt
+from rich.table import Table
+from service.debug import DebugService
+from service.errors import ServiceError
+
+# Statements shown by /debug stats
+TOP_STATEMENTS = 20
+
+
+class DebugCommand(Command):
+    HELP_MESSAGE = """
+    Available commands:
+        /debug stats     Show the slowest queries in total
+        /debug export    Write the query statistics in the Prometheus format
+        /debug reset     Forget the query statistics
+    """
+
+    def __init__(self) -> None:
+        self.debug_service = DebugService()
+
+        self.commands = {
+            "stats": self.show_stats,
+            "export": self.export_stats,
+            "reset": self.reset_stats,
+        }
+
+    def handle(self, command, current_user: CurrentUser):
+        parts = command.split()
+        if len(parts) < 2:
+            print(self.HELP_MESSAGE)
+            return
+
+        subcommand = parts[1]
+
+        if subcommand in self.commands:
+            self.commands[subcommand](current_user)
+        else:
+            print(f"[red]Unknown subcommand: {subcommand}[/red]")
+
+    def show_stats(self, current_user: CurrentUser):
+        try:
+            stats = self.debug_service.query_stats(current_user)
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
+
+        table = Table()
+
+        table.add_column("statement")
+        table.add_column("caller")
+        table.add_column("calls", justify="right")
+        table.add_column("total ms", justify="right")
+        table.add_column("avg ms", justify="right")
+        table.add_column("p95 ms", justify="right")
+        table.add_column("max ms", justify="right")
+        table.add_column("avg rows", justify="right")
+        table.add_column("slow", justify="right")
+
+        for s in stats[:TOP_STATEMENTS]:
+            calls = s.seconds.count
+            table.add_row(
+                s.statement,
+                s.caller,
+                str(calls),
+                f"{s.seconds.sum * 1000:.1f}",
+                f"{s.seconds.sum / calls * 1000:.3f}",
+                f"≤{s.seconds.quantile(0.95) * 1000:g}",
+                f"{s.max_seconds * 1000:.3f}",
+                f"{s.rows.sum / calls:.1f}",
+                str(s.slow),
+            )
+
+        console = Console()
+        console.print(table)
+        print(f"Slow queries are logged to {config.slow_query_log()}")
+
+    def export_stats(self, current_user: CurrentUser):
+        path = Prompt.ask("Enter the file name", default=config.metrics_path())
+        try:
+            self.debug_service.export_stats(current_user, path)
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
+
+        print(f"[green]Query statistics written to {path}[/green]")
+
+    def reset_stats(self, current_user: CurrentUser):
+        try:
+            self.debug_service.reset_stats(current_user)
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
+
+        print("[green]Query statistics reset[/green]")
@@ -1,29 +1,49 @@
-from typing import Optional
+from importlib import import_module
+from typing import Dict, Optional
 
 from command.command import Command
-from command.customers import CustomerCommand
-from command.help import HelpCommand
-from command.profile import ProfileCommand
-from command.rentals import RentalCommand
-from command.staff import StaffCommand
-from command.vehicles import VehicleCommand
+from globals import CurrentUser
 from rich import print
 
+# Module and class of every command by name. The modules are imported when
+# their command is first used, so the program starts without loading the
+# commands, their services and libraries such as NumPy. Packaged builds need
+# these modules as hidden imports (see .github/workflows/build.yaml).
+COMMANDS = {
+    "/?": ("command.help", "HelpCommand"),
+    "/customer": ("command.customers", "CustomerCommand"),
+    "/staff": ("command.staff", "StaffCommand"),
+    "/vehicle": ("command.vehicles", "VehicleCommand"),
+    "/rental": ("command.rentals", "RentalCommand"),
+    "/profile": ("command.profile", "ProfileCommand"),
+    "/report": ("command.reports", "ReportCommand"),
+    "/debug": ("command.debug", "DebugCommand"),
+}
+
 
 class CommandFactory:
-    @staticmethod
-    def get_command(type: str, current_user) -> Optional[Command]:
-        if type == "/?":
-            return HelpCommand(current_user)
-        elif type.startswith("/customer"):
-            return CustomerCommand(current_user)
-        elif type.startswith("/staff"):
-            return StaffCommand(current_user)
-        elif type.startswith("/vehicle"):
-            return VehicleCommand(current_user)
-        elif type.startswith("/rental"):
-            return RentalCommand(current_user)
-        elif type.startswith("/profile"):
-            return ProfileCommand(current_user)
-        else:
+    """
+    Registry of the commands by name. Every command, and the services and
+    repositories behind it, is built on first use and shared by all users,
+    who are passed to each call.
+    """
+
+    def __init__(self) -> None:
+        self.commands: Dict[str, Command] = {}
+
+    def get_command(self, type: str) -> Optional[Command]:
+        name = type.split()[0] if type.strip() else type
+        command = self.commands.get(name)
+        if command is None and name in COMMANDS:
+            module, class_name = COMMANDS[name]
+            command = getattr(import_module(module), class_name)()
+            self.commands[name] = command
+        if command is None:
             print(f"[red]Unknown command: {type}[/red]")
+        return command
+
+    def handle(self, type: str, current_user: CurrentUser) -> None:
+        """Runs a command line, e.g. "/vehicle list", for the user."""
+        command = self.get_command(type)
+        if command is not None:
+            command.handle(type, current_user)
@@ -1,10 +1,8 @@
 from command.command import Command
 from globals import CurrentUser
 from rich import print
-from util.decorator import singleton
 
 
-@singleton
 class HelpCommand(Command):
     STAFF_AVAILABLE_COMMANDS = """
     Available Commands:
@@ -13,7 +11,10 @@ class HelpCommand(Command):
         /customer     Manage customer information
         /vehicle      Manage vehicle information
         /rental       Manage rental information
+        /report       Show revenue, utilization and rental reports
+        /debug        Show query statistics
         /?            Display this help message
+        /logout       Log out and exit the program
         /bye          Exit the program
     """
     CUSTOMER_AVAILABLE_COMMANDS = """
@@ -22,14 +23,12 @@ class HelpCommand(Command):
         /vehicle      View available vehicles
         /rental       View rental records or book a new one
         /?            Display this help message
+        /logout       Log out and exit the program
         /bye          Exit the program
     """
 
-    def __init__(self, current_user: CurrentUser) -> None:
-        self.current_user = current_user
-
-    def handle(self, command):
-        if self.current_user.role_name == "customer":
+    def handle(self, command, current_user: CurrentUser):
+        if current_user.role_name == "customer":
             print(self.CUSTOMER_AVAILABLE_COMMANDS)
         else:
             print(self.STAFF_AVAILABLE_COMMANDS)
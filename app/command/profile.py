@@ -1,16 +1,14 @@
-import bcrypt
 from command.command import Command
 from globals import CurrentUser
-from repository.customers import Customers, CustomersRepository
-from repository.staff import Staff, StaffRepository
-from repository.users import UsersRepository
+from repository.customers import Customers
+from repository.staff import Staff
 from rich import print
 from rich.prompt import Prompt
-from util.decorator import singleton
+from service.errors import ServiceError
+from service.profile import ProfileService
 from util.validation import get_validated_input, validate_email, validate_phone
 
 
-@singleton
 class ProfileCommand(Command):
     HELP_MESSAGE = """
     Available Command:
@@ -19,18 +17,15 @@ class ProfileCommand(Command):
         /profile password   Update password
     """
 
-    def __init__(self, current_user: CurrentUser) -> None:
-        self.current_user = current_user
-        self.user_repo = UsersRepository()
-        self.customer_repo = CustomersRepository()
-        self.staff_repo = StaffRepository()
+    def __init__(self) -> None:
+        self.profile_service = ProfileService()
         self.commands = {
             "detail": self.get_details,
             "update": self.update_details,
             "password": self.update_password,
         }
 
-    def handle(self, command):
+    def handle(self, command, current_user: CurrentUser):
         parts = command.split()
         if len(parts) < 2:
             print(self.HELP_MESSAGE)
@@ -39,75 +34,52 @@ class ProfileCommand(Command):
         subcommand = parts[1]
 
         if subcommand in self.commands:
-            self.commands[subcommand]()
+            self.commands[subcommand](current_user)
         else:
             print(f"[red]Unknown subcommand: {subcommand}[/red]")
 
-    def get_details(self):
-        if self.current_user.role_name == "customer":
-            customer = self.customer_repo.get_by_user_id(
-                self.current_user.user_id
-            )
-            if customer is None:
-                print("[red]Can't find the customer details. [/red]")
-            else:
-                print(f"Full name: {customer.full_name}")
-                print(f"Email: {customer.email}")
-                print(f"Phone: {customer.phone}")
-                print(f"Address: {customer.address}")
-                print(f"Driver license: {customer.driver_license}")
-        else:
-            staff = self.staff_repo.get_by_user_id(self.current_user.user_id)
-            if staff is None:
-                print("[red]Can't find the details. [/red]")
-            else:
-                print(f"Full name: {staff.full_name}")
-                print(f"Email: {staff.email}")
+    def get_details(self, current_user: CurrentUser):
+        try:
+            profile = self.profile_service.get_profile(current_user)
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
+        print(f"Full name: {profile.full_name}")
+        print(f"Email: {profile.email}")
+        if isinstance(profile, Customers):
+            print(f"Phone: {profile.phone}")
+            print(f"Address: {profile.address}")
+            print(f"Driver license: {profile.driver_license}")
 
-    def update_details(self):
-        if self.current_user.role_name == "customer":
-            current_customer = self.customer_repo.get_by_user_id(
-                self.current_user.user_id
-            )
-            if current_customer is None:
-                print("[red]Can not find your data[/red]")
-                return
-            customer = Customers()
-            customer.customer_id = current_customer.customer_id
-            customer.full_name = Prompt.ask("Enter the full name (optional)")
-            customer.email = get_validated_input(
-                "Enter the email (optional)", validate_email, optional=True
-            )
-            customer.phone = get_validated_input(
+    def update_details(self, current_user: CurrentUser):
+        full_name = Prompt.ask("Enter the full name (optional)")
+        email = get_validated_input(
+            "Enter the email (optional)",
+            "The email is not valid",
+            validate_email,
+            optional=True,
+        )
+        if current_user.role_name == "customer":
+            profile = Customers(full_name=full_name, email=email)
+            profile.phone = get_validated_input(
                 "Enter the phone number (optional)",
+                "The phone number is not valid",
                 validate_phone,
                 optional=True,
             )
-            customer.address = Prompt.ask("Enter the address (optional)")
-            customer.driver_license = Prompt.ask(
-                "Enter the driver license (optional)"
-            )
-            self.customer_repo.update_customer(customer)
-            print("[green]Update profile successfully[/green]")
+            profile.address = Prompt.ask("Enter the address (optional)")
+            profile.driver_license = Prompt.ask("Enter the driver license (optional)")
         else:
-            current_staff = self.staff_repo.get_by_user_id(
-                self.current_user.user_id
-            )
-            if current_staff is None:
-                print("[red]Can not find your data[/red]")
-                return
-            staff = Staff()
-            staff.staff_id = current_staff.staff_id
-            full_name = Prompt.ask("Enter the full name (optional)")
-            email = get_validated_input(
-                "Enter the email (optional)", validate_email, optional=True
-            )
-            staff.full_name = full_name
-            staff.email = email
-            self.staff_repo.update_staff(staff)
-            print("[green]Update profile successfully[/green]")
+            profile = Staff(full_name=full_name, email=email)
+
+        try:
+            self.profile_service.update_profile(current_user, profile)
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
+        print("[green]Update profile successfully[/green]")
 
-    def update_password(self):
+    def update_password(self, current_user: CurrentUser):
         current_password = get_validated_input(
             "Enter your current password",
             "The password is invalid",
@@ -122,18 +94,11 @@ class ProfileCommand(Command):
             password=True,
         )
 
-        user = self.user_repo.get_by_user_id(self.current_user.user_id)
-        if user is None:
-            print("[red]Can not find your user details.[/red]")
-            return
-
-        if bcrypt.checkpw(
-            current_password.encode("utf-8"), user.password.encode()
-        ):
-            hashed = bcrypt.hashpw(
-                new_password.encode("utf-8"), bcrypt.gensalt()
+        try:
+            self.profile_service.change_password(
+                current_user, current_password, new_password
             )
-            self.user_repo.update_password(user.user_id, hashed.decode("utf-8"))
-            print("[green]Password updated.[/green]")
-        else:
-            print("[red]Your current password is incorrect.[/red]")
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
+        print("[green]Password updated.[/green]")
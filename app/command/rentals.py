@@ -1,20 +1,23 @@
-from datetime import datetime, timedelta
+import os
+from datetime import date
 
 from command.command import Command
 from globals import CurrentUser
-from repository.customers import CustomersRepository
-from repository.rentals import Rentals, RentalsRepository
-from repository.staff import StaffRepository
-from repository.vehicles import VehiclesRepository
+from repository.rentals import RentalDetails
 from rich import print
 from rich.console import Console
 from rich.prompt import Prompt
 from rich.table import Table
-from util.decorator import singleton
-from util.validation import get_validated_input, validate_digit
+from service.errors import ServiceError
+from service.pricing import to_amount
+from service.rentals import RentalService
+from util.exporter import prompt_export
+from util.importer import import_file, print_result
+from util.output import TABLE, split_format, write_rows
+from util.pagination import show_pages
+from util.validation import get_validated_input, validate_date, validate_digit
 
 
-@singleton
 class RentalCommand(Command):
     STAFF_AVAILABLE_COMMANDS = """
     Available Commands:
@@ -24,6 +27,11 @@ class RentalCommand(Command):
         /rental audit    Active or reject a rental application
         /rental complete Complete a rental
         /rental cancel   Cancel a rental
+        /rental import   Import rental records from a CSV or JSONL file
+        /rental export   Export rentals to a CSV or JSONL file
+        /rental quote    Price a rental without booking it
+
+    Add --format plain, csv or jsonl to list or active to print every row as text.
     """
 
     CUSTOMER_AVAILABLE_COMMANDS = """
@@ -31,14 +39,15 @@ class RentalCommand(Command):
         /rental list     List rental history
         /rental book     Book a new rental
         /rental cancel   Cancel a rental
+        /rental quote    Price a rental without booking it
+
+    Add --format plain, csv or jsonl to list to print every row as text.
     """
+    LISTINGS = ("list", "active")
 
-    def __init__(self, current_user: CurrentUser) -> None:
-        self.rental_repo = RentalsRepository()
-        self.current_user = current_user
-        self.customer_repo = CustomersRepository()
-        self.staff_repo = StaffRepository()
-        self.vehicle_repo = VehiclesRepository()
+    def __init__(self) -> None:
+        self.rental_service = RentalService()
+        self.rental_repo = self.rental_service.rental_repo
         self.staff_commands = {
             "list": self.list_rentals,
             "active": self.list_active_rentals,
@@ -46,18 +55,27 @@ class RentalCommand(Command):
             "audit": self.audit_rental,
             "complete": self.complete_rental,
             "cancel": self.cancel_rental,
+            "import": self.import_rentals,
+            "export": self.export_rentals,
+            "quote": self.quote_rental,
         }
 
         self.customer_commands = {
             "list": self.list_rental_history,
             "book": self.book_rental,
             "cancel": self.cancel_rental,
+            "quote": self.quote_rental,
         }
 
-    def handle(self, command):
+    def handle(self, command, current_user: CurrentUser):
+        try:
+            command, output = split_format(command)
+        except ValueError as e:
+            print(f"[red]{e}[/red]")
+            return
         parts = command.split()
         if len(parts) < 2:
-            if self.current_user.role_name == "customer":
+            if current_user.role_name == "customer":
                 print(self.CUSTOMER_AVAILABLE_COMMANDS)
             else:
                 print(self.STAFF_AVAILABLE_COMMANDS)
@@ -65,88 +83,63 @@ class RentalCommand(Command):
 
         subcommand = parts[1]
 
-        if self.current_user.role_name == "customer":
+        if current_user.role_name == "customer":
             if subcommand in self.customer_commands:
-                self.customer_commands[subcommand]()
+                self.run(
+                    subcommand, self.customer_commands[subcommand], current_user, output
+                )
             else:
                 print(f"[red]Unknown subcommand: {subcommand}[/red]")
         else:
             if subcommand in self.staff_commands:
-                self.staff_commands[subcommand]()
+                self.run(
+                    subcommand, self.staff_commands[subcommand], current_user, output
+                )
             else:
                 print(f"[red]Unknown subcommand: {subcommand}[/red]")
 
-    def list_rentals(self):
-        rentals = self.rental_repo.get_rental_details()
-        self.display_rental_table(rentals)
-
-    def list_active_rentals(self):
-        rentals = self.rental_repo.get_rental_details("active")
-        self.display_rental_table(rentals)
+    def list_rentals(
+        self, current_user: CurrentUser, status: str = "", output: str = TABLE
+    ):
+        if output != TABLE:
+            rentals = self.rental_service.list_rentals(
+                current_user, status, limit=None, stream=True
+            )
+            write_rows(rentals, RentalDetails._fields, output)
+            return
+        show_pages(
+            lambda before_id, limit: self.rental_service.list_rentals(
+                current_user, status, before_id=before_id, limit=limit
+            ),
+            self.display_rental_table,
+        )
 
-    def add_rental(self):
-        rental = Rentals()
+    def list_active_rentals(self, current_user: CurrentUser, output: str = TABLE):
+        self.list_rentals(current_user, "active", output)
 
+    def add_rental(self, current_user: CurrentUser):
         vehicle_id = get_validated_input(
             "Enter the vehicle ID", "The value is not valid", validate_digit
         )
-        rental.vehicle_id = int(vehicle_id)
         customer_id = get_validated_input(
             "Enter the customer ID", "The value is not valid", validate_digit
         )
-        rental.customer_id = int(customer_id)
-
-        staff = self.staff_repo.get_by_user_id(self.current_user.user_id)
-        if staff is None:
-            print("[red]Can not find your information[/red]")
-            return
-        if staff.staff_id is None:
-            print("[red]Oops. There is an error[/red]")
-            return
-
-        rental.staff_id = staff.staff_id
-
-        # Set dates
-        rental.start_date = datetime.now()
         days = get_validated_input(
             "Enter rental duration (days)",
             "The value is not valid",
             validate_digit,
         )
-        rental.expected_return_date = rental.start_date + timedelta(days=int(days))
-
-        # Get vehicle information for initial mileage and cost calculation
-        vehicle = self.vehicle_repo.get_by_id(rental.vehicle_id)
-        if not vehicle:
-            print("[red]Vehicle not found[/red]")
-            return
-
-        # Check if vehicle is available
-        if vehicle.status != "available":
-            print("[red]Vehicle is not available for rent[/red]")
-            return
 
-        if vehicle.mileage is None:
-            print(
-                "[yellow]Warning: Vehicle mileage is 0, consider checking the vehicle before rental[/yellow]"
+        try:
+            self.rental_service.add_rental(
+                current_user, int(vehicle_id), int(customer_id), int(days)
             )
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
             return
-        rental.initial_mileage = vehicle.mileage  # mileage from vehicle record
-
-        if vehicle.daily_rate is None:
-            print("[red]Vehicle daily rate is not set[/red]")
-            return
-
-        rental.total_cost = vehicle.daily_rate * int(days)  # daily_rate * days
-        rental.rental_status = "active"
-
-        # Update vehicle status
-        self.vehicle_repo.update_status(rental.vehicle_id, "rented")
-
-        self.rental_repo.add_rental(rental)
         print("[green]Rental created successfully[/green]")
 
-    def complete_rental(self):
+    def complete_rental(self, current_user: CurrentUser):
         rental_id = get_validated_input(
             "Enter the rental ID", "The value is not valid", validate_digit
         )
@@ -155,44 +148,38 @@ class RentalCommand(Command):
             "Enter return mileage", "The value is not valid", validate_digit
         )
 
-        rental = self.rental_repo.get_by_id(int(rental_id))
-        if not rental:
-            print("[red]Rental not found[/red]")
-            return
-        if int(return_mileage) < rental.initial_mileage:
-            print("[red]Return mileage cannot be less than initial mileage[/red]")
-            return
-        if not rental.vehicle_id:
-            print("[red]Vehicle not found[/red]")
+        try:
+            self.rental_service.complete_rental(
+                current_user, int(rental_id), int(return_mileage)
+            )
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
             return
-
-        self.rental_repo.complete_rental(
-            int(rental_id), int(return_mileage), datetime.now()
-        )
-        self.vehicle_repo.update_after_return(rental.vehicle_id, int(return_mileage))
         print("[green]Rental completed successfully[/green]")
 
-    def cancel_rental(self):
+    def cancel_rental(self, current_user: CurrentUser):
         rental_id = get_validated_input(
             "Enter the rental ID", "The value is not valid", validate_digit
         )
-        rental = self.rental_repo.get_by_id(int(rental_id))
-        if rental is None:
-            print("[red]Can not find this rental data[/red]")
-            return
-        if rental.rental_status != "apply":
-            print(
-                "[red]This rental status has been changed, please check its details[/red]"
-            )
+        try:
+            self.rental_service.cancel_rental(current_user, int(rental_id))
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
             return
-        self.rental_repo.update_status(int(rental_id), "cancelled")
-
-        # Update the vehicle status is available
-        if rental.vehicle_id:
-            self.vehicle_repo.update_status(rental.vehicle_id, "available")
 
         print("[green]Rental cancelled successfully[/green]")
 
+    def import_rentals(self, current_user: CurrentUser):
+        path = get_validated_input(
+            "Enter the CSV or JSONL file path",
+            "The file does not exist",
+            os.path.isfile,
+        )
+        print_result(import_file("rentals", path))
+
+    def export_rentals(self, current_user: CurrentUser):
+        prompt_export("rentals")
+
     def display_rental_table(self, rentals):
         table = Table()
         table.add_column("ID")
@@ -208,96 +195,98 @@ class RentalCommand(Command):
 
         for rental in rentals:
             table.add_row(
-                str(rental[0]),
-                f"{rental[1]} {rental[2]}",  # brand + model
-                rental[3],  # customer name
-                str(rental[4]),
-                str(rental[5]),
-                str(rental[6] or ""),
-                str(rental[7]),
-                str(rental[8] or ""),
-                rental[9],
-                f"${rental[10]}" if rental[10] else "",
+                str(rental.rental_id),
+                f"{rental.make} {rental.model}",
+                rental.customer,
+                str(rental.start_date),
+                str(rental.expected_return_date),
+                str(rental.actual_return_date or ""),
+                str(rental.initial_mileage),
+                str(rental.return_mileage or ""),
+                rental.rental_status,
+                f"${rental.total_cost}" if rental.total_cost else "",
             )
 
         console = Console()
         console.print(table)
 
-    def list_rental_history(self):
-        customer = self.customer_repo.get_by_user_id(self.current_user.user_id)
-        if customer is None:
-            print("[red]Can not find your information[/red]")
-            return
-        if customer.customer_id is None:
-            print("[red]Oops, there is an error[/red]")
-            return
-        rentals = self.rental_repo.get_rental_details(customer_id=customer.customer_id)
-        self.display_rental_table(rentals)
-
-    def book_rental(self):
-        customer = self.customer_repo.get_by_user_id(self.current_user.user_id)
-        if customer is None:
-            print("[red]Can not find your information[/red]")
-            return
-        if customer.customer_id is None:
-            print("[red]Oops, there is an error[/red]")
+    def list_rental_history(self, current_user: CurrentUser, output: str = TABLE):
+        try:
+            self.rental_service.current_customer(current_user)
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
             return
+        self.list_rentals(current_user, output=output)
 
-        rental = Rentals()
+    def book_rental(self, current_user: CurrentUser):
         vehicle_id = get_validated_input(
             "Enter the vehicle ID",
             "The vehicle id should be number",
             validator=validate_digit,
             optional=False,
         )
-        rental.vehicle_id = int(vehicle_id)
-        rental.customer_id = customer.customer_id
-
-        rental.start_date = datetime.now()
+        start_date = get_validated_input(
+            "Enter the start date (YYYY-MM-DD, optional)",
+            "The date is not valid or in the past",
+            validate_date,
+            optional=True,
+        )
         days = get_validated_input(
             "Enter rental duration (days)",
             "The rental duration should be number",
             validate_digit,
         )
-        rental.expected_return_date = rental.start_date + timedelta(days=int(days))
 
-        # Get vehicle information for initial mileage and cost calculation
-        vehicle = self.vehicle_repo.get_by_id(rental.vehicle_id)
-        if not vehicle:
-            print("[red]Vehicle not found[/red]")
+        try:
+            self.rental_service.book_rental(
+                current_user,
+                int(vehicle_id),
+                int(days),
+                date.fromisoformat(start_date) if start_date else None,
+            )
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
             return
+        print("[green]Rental created successfully[/green]")
 
-        # Check if vehicle is available
-        if vehicle.status != "available":
-            print("[red]Vehicle is not available for rent[/red]")
-            return
+    def quote_rental(self, current_user: CurrentUser):
+        vehicle_id = get_validated_input(
+            "Enter the vehicle ID", "The vehicle id should be number", validate_digit
+        )
+        start_date = get_validated_input(
+            "Enter the start date (YYYY-MM-DD, optional)",
+            "The date is not valid or in the past",
+            validate_date,
+            optional=True,
+        )
+        days = get_validated_input(
+            "Enter rental duration (days)",
+            "The rental duration should be number",
+            validate_digit,
+        )
 
-        if vehicle.mileage is None:
-            print(
-                "[yellow]Warning: Vehicle mileage is 0, consider checking the vehicle before rental[/yellow]"
+        try:
+            quote = self.rental_service.quote_rental(
+                int(vehicle_id),
+                date.fromisoformat(start_date) if start_date else date.today(),
+                int(days),
             )
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
             return
-        rental.initial_mileage = vehicle.mileage  # mileage from vehicle record
+        print(f"Rate for {quote.days} days: {to_amount(quote.base_cents)}")
+        if quote.discount_cents:
+            print(f"Long-term discount: -{to_amount(quote.discount_cents)}")
+        print(f"[green]Total: {quote.total}[/green]")
 
-        if vehicle.daily_rate is None:
-            print("[red]Vehicle daily rate is not set[/red]")
-            return
-
-        rental.total_cost = vehicle.daily_rate * int(days)  # daily_rate * days
-
-        # Update vehicle status
-        self.vehicle_repo.update_status(rental.vehicle_id, "rented")
-
-        self.rental_repo.add_rental(rental)
-        print("[green]Rental created successfully[/green]")
-
-    def audit_rental(self):
+    def audit_rental(self, current_user: CurrentUser):
         rental_id = get_validated_input(
             "Enter the rental ID", "The value is not valid", validate_digit
         )
-        rental = self.rental_repo.get_by_id(int(rental_id))
-        if rental is None:
-            print("[red]Can not find this rental data[/red]")
+        try:
+            rental = self.rental_service.get_rental(current_user, int(rental_id))
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
             return
         if rental.rental_status != "apply":
             print(
@@ -311,10 +300,11 @@ class RentalCommand(Command):
             default="reject",
         )
 
-        self.rental_repo.update_status(int(rental_id), status)
-
-        # If reject the application then update the vehicle status to available
-        if status == "reject" and rental.vehicle_id:
-            self.vehicle_repo.update_status(rental.vehicle_id, "available")
+        try:
+            # The status is checked again in case it changed while prompting
+            self.rental_service.audit_rental(current_user, int(rental_id), status)
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
 
         print("[green]Change rental status successfully[/green]")
@@ -0,0 +1,188 @@
+from datetime import date
+from typing import Optional
+
+from command.command import Command
+from globals import CurrentUser
+from rich import print
+from rich.console import Console
+from rich.table import Table
+from service.errors import ServiceError
+from service.reports import ReportService, report_period
+from util.validation import get_validated_input, validate_day
+
+# Utilization levels of the daily curve, from 0% to 100%
+SPARKS = " ▁▂▃▄▅▆▇█"
+
+
+def sparkline(values) -> str:
+    top = len(SPARKS) - 1
+    return "".join(SPARKS[min(max(round(v * top), 0), top)] for v in values)
+
+
+class ReportCommand(Command):
+    HELP_MESSAGE = """
+    Available commands:
+        /report revenue      Revenue by vehicle
+        /report utilization  Utilization by make
+        /report status       Number of rentals in each status
+        /report fleet        Utilization, duration, mileage and revenue statistics
+    """
+
+    def __init__(self) -> None:
+        self.report_service = ReportService()
+        # Built by the first /report fleet, which loads NumPy
+        self.analytics_service = None
+
+        self.commands = {
+            "revenue": self.show_revenue,
+            "utilization": self.show_utilization,
+            "status": self.show_status_counts,
+            "fleet": self.show_fleet,
+        }
+
+    def handle(self, command, current_user: CurrentUser):
+        if current_user.role_name == "customer":
+            print(f"[red]Unknown command: {command}[/red]")
+            return
+        parts = command.split()
+        if len(parts) < 2:
+            print(self.HELP_MESSAGE)
+            return
+
+        subcommand = parts[1]
+
+        if subcommand in self.commands:
+            self.commands[subcommand](current_user)
+        else:
+            print(f"[red]Unknown subcommand: {subcommand}[/red]")
+
+    def ask_day(self, prompt: str) -> Optional[date]:
+        value = get_validated_input(
+            f"{prompt} (YYYY-MM-DD, optional)",
+            "The date is not valid",
+            validate_day,
+            True,
+        )
+        return date.fromisoformat(value) if value else None
+
+    def ask_period(self):
+        start = self.ask_day("Enter the first day")
+        end = self.ask_day("Enter the last day")
+        return report_period(start, end)
+
+    def show_revenue(self, current_user: CurrentUser):
+        try:
+            start, end = self.ask_period()
+            rows = self.report_service.revenue_by_vehicle(current_user, start, end)
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
+
+        table = Table(title=f"Revenue from {start} to {end}")
+
+        table.add_column("vehicle_id")
+        table.add_column("make")
+        table.add_column("model")
+        table.add_column("license_plate")
+        table.add_column("rentals", justify="right")
+        table.add_column("revenue", justify="right")
+
+        for row in rows:
+            table.add_row(
+                str(row[0]), row[1], row[2], row[3], str(row[4]), f"{row[5]:.2f}"
+            )
+        table.add_section()
+        table.add_row(
+            "Total",
+            "",
+            "",
+            "",
+            str(sum(row[4] for row in rows)),
+            f"{sum(row[5] for row in rows):.2f}",
+        )
+
+        console = Console()
+        console.print(table)
+
+    def show_utilization(self, current_user: CurrentUser):
+        try:
+            start, end = self.ask_period()
+            rows = self.report_service.utilization_by_make(current_user, start, end)
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
+
+        table = Table(title=f"Utilization from {start} to {end}")
+
+        table.add_column("make")
+        table.add_column("vehicles", justify="right")
+        table.add_column("rentals", justify="right")
+        table.add_column("utilization", justify="right")
+
+        for row in rows:
+            table.add_row(row[0], str(row[1]), str(row[2]), f"{row[3]:.1%}")
+
+        console = Console()
+        console.print(table)
+
+    def show_status_counts(self, current_user: CurrentUser):
+        try:
+            rows = self.report_service.status_counts(current_user)
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
+
+        table = Table()
+
+        table.add_column("rental_status")
+        table.add_column("rentals", justify="right")
+
+        for row in rows:
+            table.add_row(row[0], str(row[1]))
+
+        console = Console()
+        console.print(table)
+
+    def show_fleet(self, current_user: CurrentUser):
+        if self.analytics_service is None:
+            from service.analytics import FleetAnalyticsService
+
+            self.analytics_service = FleetAnalyticsService()
+        try:
+            start, end = self.ask_period()
+            report = self.analytics_service.fleet_report(current_user, start, end)
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
+
+        utilization = report.daily_utilization
+        print(f"Daily utilization from {start} to {end}:")
+        print(f"  {sparkline(utilization)}")
+
+        table = Table(title=f"Fleet of {report.fleet_size} vehicles")
+
+        table.add_column("metric")
+        table.add_column("value", justify="right")
+
+        table.add_row("rentals", str(report.rentals))
+        table.add_row("utilization (avg)", f"{utilization.mean():.1%}")
+        table.add_row(
+            "utilization (min / max)",
+            f"{utilization.min():.1%} / {utilization.max():.1%}",
+        )
+        table.add_row(
+            "rental days (avg / median)",
+            f"{report.average_days:.1f} / {report.median_days:.1f}",
+        )
+        table.add_row(
+            "miles per day (p10 / p50 / p90)",
+            " / ".join(f"{value:.0f}" for value in report.mileage_per_day.values()),
+        )
+        table.add_row("revenue", f"{report.revenue['total']:.2f}")
+        table.add_row(
+            "revenue per rental (p50 / p90 / p99)",
+            " / ".join(f"{report.revenue[key]:.2f}" for key in ("p50", "p90", "p99")),
+        )
+
+        console = Console()
+        console.print(table)
@@ -1,16 +1,17 @@
 from command.command import Command
 from globals import CurrentUser
-from repository.staff import Staff, StaffRepository
-from repository.users import Users, UsersRepository
+from repository.staff import Staff, StaffRow
 from rich import print
 from rich.console import Console
 from rich.prompt import Prompt
 from rich.table import Table
-from util.decorator import singleton
+from service.errors import ServiceError
+from service.staff import StaffService
+from util.output import TABLE, split_format, write_rows
+from util.pagination import show_pages
 from util.validation import get_validated_input, validate_digit, validate_email
 
 
-@singleton
 class StaffCommand(Command):
     HELP_MESSAGE = """
     Available commands:
@@ -18,12 +19,13 @@ class StaffCommand(Command):
         /staff add       Add a new staff
         /staff update    Update staff information
         /staff delete    Delete a staff
+
+    Add --format plain, csv or jsonl to list to print every row as text.
     """
+    LISTINGS = ("list",)
 
-    def __init__(self, current_user: CurrentUser) -> None:
-        self.staff_repo = StaffRepository()
-        self.users_repo = UsersRepository()
-        self.current_user = current_user
+    def __init__(self) -> None:
+        self.staff_service = StaffService()
 
         self.commands = {
             "list": self.list_staffs,
@@ -32,7 +34,12 @@ class StaffCommand(Command):
             "delete": self.delete_staff,
         }
 
-    def handle(self, command):
+    def handle(self, command, current_user: CurrentUser):
+        try:
+            command, output = split_format(command)
+        except ValueError as e:
+            print(f"[red]{e}[/red]")
+            return
         parts = command.split()
         if len(parts) < 2:
             print(self.HELP_MESSAGE)
@@ -41,15 +48,25 @@ class StaffCommand(Command):
         subcommand = parts[1]
 
         if subcommand in self.commands:
-            self.commands[subcommand]()
+            self.run(subcommand, self.commands[subcommand], current_user, output)
         else:
             print(f"[red]Unknown subcommand: {subcommand}[/red]")
 
-    def list_staffs(self):
-        staffs = self.staff_repo.get_staffs()
-        self.display_staff_table(staffs)
+    def list_staffs(self, current_user: CurrentUser, output: str = TABLE):
+        if output != TABLE:
+            staffs = self.staff_service.list_staff(
+                current_user, limit=None, stream=True
+            )
+            write_rows(staffs, StaffRow._fields, output)
+            return
+        show_pages(
+            lambda after_id, limit: self.staff_service.list_staff(
+                current_user, after_id=after_id, limit=limit
+            ),
+            self.display_staff_table,
+        )
 
-    def add_staff(self):
+    def add_staff(self, current_user: CurrentUser):
         staff = Staff()
         staff.full_name = get_validated_input(
             "Enter the full name", "The full name cannot be empty"
@@ -61,7 +78,7 @@ class StaffCommand(Command):
         username = get_validated_input(
             "Enter your username",
             "The username has exist, please try another one.",
-            self.users_repo.username_exists,
+            self.staff_service.users_repo.username_exists,
             False,
         )
 
@@ -72,61 +89,49 @@ class StaffCommand(Command):
             password=True,
         )
 
-        user = Users(username=username, password=password, role_id=1)
-        user_id = self.users_repo.add_user(user)
-
-        staff.user_id = user_id
-
-        self.staff_repo.add_staff(staff)
+        try:
+            self.staff_service.add_staff(current_user, staff, username, password)
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
 
         print("[green]Staff added successfully[/green]")
 
-    def update_staff(self):
+    def update_staff(self, current_user: CurrentUser):
         staff = Staff()
         staff_id = get_validated_input(
             "Enter the staff id", "The staff id is not valid", validate_digit
         )
         full_name = Prompt.ask("Enter the full name (optional)")
         email = get_validated_input(
-            "Enter the email (optional)", validate_email, optional=True
+            "Enter the email (optional)",
+            "The email is not valid",
+            validate_email,
+            optional=True,
         )
 
         staff.staff_id = int(staff_id)
         staff.full_name = full_name
         staff.email = email
 
-        self.staff_repo.update_staff(staff)
+        try:
+            self.staff_service.update_staff(current_user, staff)
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
 
         print("[green]Staff updated successfully[/green]")
 
-    def delete_staff(self):
+    def delete_staff(self, current_user: CurrentUser):
         staff_id = get_validated_input(
             "Enter the staff id", "The staff is not valid", validate_digit
         )
-
-        current_staff = self.staff_repo.get_by_user_id(self.current_user.user_id)
-        if current_staff is None:
-            print("[red]Oops, There is an error.[/red]")
-            return
-        if current_staff.staff_id is None:
-            print("[red]Oops, There is an error.[/red]")
-            return
-
-        if int(staff_id) == current_staff.staff_id:
-            print("[red]You cannot delete yourself.[/red]")
+        try:
+            self.staff_service.delete_staff(current_user, int(staff_id))
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
             return
 
-        staff = self.staff_repo.get_by_staff_id(int(staff_id))
-        if staff is None:
-            print("[red]Can not find the staff.[/red]")
-            return
-        if staff.user_id is None:
-            print("[red]Oops, There is an error.[/red]")
-            return
-
-        self.staff_repo.delete_staff(staff_id)
-        self.users_repo.delete_user(staff.user_id)
-
         print("[green]Staff deleted successfully[/green]")
 
     def display_staff_table(self, staffs):
@@ -139,7 +144,13 @@ class StaffCommand(Command):
         table.add_column("created_at")
 
         for staff in staffs:
-            table.add_row(str(staff[0]), str(staff[1]), staff[2], staff[3], staff[4])
+            table.add_row(
+                str(staff.staff_id),
+                str(staff.user_id),
+                staff.full_name,
+                staff.email,
+                staff.created_at,
+            )
 
         console = Console()
         console.print(table)
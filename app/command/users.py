@@ -1,24 +1,22 @@
 from typing import Optional
 
-import bcrypt
 from globals import CurrentUser
-from repository.customers import Customers, CustomersRepository
-from repository.roles import RoleRepository
-from repository.users import Users, UsersRepository
+from repository.customers import Customers
 from rich import print
 from rich.prompt import Prompt
-from util.decorator import singleton
+from service.customers import CustomerService
+from service.errors import ServiceError
+from util.passwords import check_password
 from util.validation import get_validated_input, validate_email
 
 
-@singleton
 class UsersCommand:
     def __init__(self):
-        self.customer_repo = CustomersRepository()
-        self.users_repo = UsersRepository()
-        self.roles_repo = RoleRepository()
+        self.customer_service = CustomerService()
+        self.customer_repo = self.customer_service.customer_repo
+        self.users_repo = self.customer_service.users_repo
 
-    def handle_register_command(self):
+    def handle_register_command(self) -> bool:
         username = get_validated_input(
             "Enter your username",
             "The username has exist, please try again.",
@@ -47,37 +45,38 @@ class UsersCommand:
             password=True,
         )
 
-        user = Users(username=username, password=password, role_id=2)
-        user_id = self.users_repo.add_user(user)
-
         customer = Customers(
             full_name=full_name,
-            user_id=user_id,
             email=email,
             phone=phone,
             address=address,
             driver_license=driver_license,
         )
-        self.customer_repo.add_customer(customer)
+        try:
+            self.customer_service.register(customer, username, password)
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return False
 
         print("[green]Register successfully.[/green]")
+        return True
 
     def handle_login_command(self) -> Optional[CurrentUser]:
         username = Prompt.ask("Enter your username")
         password = Prompt.ask("Enter your password", password=True)
 
-        user = self.users_repo.get_by_username(username)
+        result = self.users_repo.get_with_role(username)
+        if result is None:
+            return None
+        user, role_name = result
 
-        if user and bcrypt.checkpw(password.encode("utf-8"), user.password.encode()):
+        if check_password(password, user.password):
             if user.user_id:
                 self.users_repo.update_last_login(user.user_id)
-            role = self.roles_repo.get_role(user.role_id)
-            if role is None:
-                return None
             current_user = CurrentUser(
                 user_id=user.user_id,
                 username=user.username,
-                role_name=role.role_name,
+                role_name=role_name,
             )
 
             return current_user
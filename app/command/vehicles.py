@@ -1,55 +1,82 @@
+import os
+from datetime import datetime
+
 from command.command import Command
 from globals import CurrentUser
-from repository.vehicles import Vehicles, VehiclesRepository
+from repository.vehicles import VehicleRow, Vehicles
 from rich import print
 from rich.console import Console
 from rich.prompt import Prompt
 from rich.table import Table
-from util.decorator import singleton
+from service.errors import ServiceError
+from service.pricing import pricing_engine
+from service.vehicles import VehicleService
+from util.exporter import prompt_export
+from util.importer import import_file, print_result
+from util.output import TABLE, split_format, write_rows
+from util.pagination import PAGE_SIZE, show_pages, show_rows
 from util.validation import (
     get_validated_input,
+    validate_date,
     validate_digit,
     validate_price,
     validate_year,
 )
 
 
-@singleton
 class VehicleCommand(Command):
     STAFF_AVAILABLE_COMMANDS = """
     Available Commands:
         /vehicle list    List vehicles' information
-        /vehicle search  Search vehicles by make
+        /vehicle search  Search vehicles by make, model or description
+        /vehicle free    List vehicles that are free for a date range
         /vehicle add     Add a new vehicle
         /vehicle update  Update a vehicle information
         /vehicle delete  Delete a vehicle
+        /vehicle import  Import vehicles from a CSV or JSONL file
+        /vehicle export  Export vehicles to a CSV or JSONL file
+
+    Add --format plain, csv or jsonl to list or search to print every row as text.
     """
 
     CUSTOMER_AVAILABLE_COMMANDS = """
     Available Commands:
         /vehicle list    List vehicles' information
-        /vehicle search  Search vehicles by make
+        /vehicle search  Search vehicles by make, model or description
+        /vehicle free    List vehicles that are free for a date range
+
+    Add --format plain, csv or jsonl to list or search to print every row as text.
     """
+    LISTINGS = ("list", "search")
 
-    def __init__(self, current_user: CurrentUser) -> None:
-        self.vehicles_repo = VehiclesRepository()
-        self.current_user = current_user
+    def __init__(self) -> None:
+        self.vehicle_service = VehicleService()
+        self.pricing = pricing_engine()
         self.staff_commands = {
             "list": self.list_vehicles,
             "search": self.search_vehicle,
+            "free": self.list_free_vehicles,
             "add": self.add_vehicle,
             "update": self.update_vehicle,
             "delete": self.delete_vehicle,
+            "import": self.import_vehicles,
+            "export": self.export_vehicles,
         }
         self.customer_commands = {
             "list": self.list_available_vehicles,
             "search": self.search_available_vehicles,
+            "free": self.list_free_vehicles,
         }
 
-    def handle(self, command):
+    def handle(self, command, current_user: CurrentUser):
+        try:
+            command, output = split_format(command)
+        except ValueError as e:
+            print(f"[red]{e}[/red]")
+            return
         parts = command.split()
         if len(parts) < 2:
-            if self.current_user.role_name == "customer":
+            if current_user.role_name == "customer":
                 print(self.CUSTOMER_AVAILABLE_COMMANDS)
             else:
                 print(self.STAFF_AVAILABLE_COMMANDS)
@@ -57,27 +84,35 @@ class VehicleCommand(Command):
 
         subcommand = parts[1]
 
-        if self.current_user.role_name == "customer":
+        if current_user.role_name == "customer":
             if subcommand in self.customer_commands:
-                self.customer_commands[subcommand]()
+                self.run(
+                    subcommand, self.customer_commands[subcommand], current_user, output
+                )
             else:
                 print(f"[red]Unknown subcommand: {subcommand}[/red]")
         else:
             if subcommand in self.staff_commands:
-                self.staff_commands[subcommand]()
+                self.run(
+                    subcommand, self.staff_commands[subcommand], current_user, output
+                )
             else:
                 print(f"[red]Unknown subcommand: {subcommand}[/red]")
 
-    def list_vehicles(self):
-        vehicles = self.vehicles_repo.get_vehicles(search_str="")
-        self.display_vehicle_table(vehicles)
+    def list_vehicles(self, current_user: CurrentUser, output: str = TABLE):
+        self.show_vehicles(current_user, output=output)
 
-    def search_vehicle(self):
-        keyword = Prompt.ask("Enter the make to search")
-        vehicles = self.vehicles_repo.get_vehicles(keyword)
-        self.display_vehicle_table(vehicles)
+    def search_vehicle(self, current_user: CurrentUser, output: str = TABLE):
+        keyword = Prompt.ask("Enter the make, model or description to search")
+        vehicles = self.vehicle_service.search_vehicles(
+            current_user, keyword, limit=PAGE_SIZE
+        )
+        if output != TABLE:
+            write_rows(vehicles, VehicleRow._fields, output)
+            return
+        show_rows(vehicles, self.display_vehicle_table)
 
-    def add_vehicle(self):
+    def add_vehicle(self, current_user: CurrentUser):
         vehicle = Vehicles()
         vehicle.make = get_validated_input("Enter the make", "The make should not none")
         vehicle.model = get_validated_input(
@@ -106,11 +141,15 @@ class VehicleCommand(Command):
             default="available",
         )
 
-        self.vehicles_repo.add_vehicle(vehicle)
+        try:
+            self.vehicle_service.add_vehicle(current_user, vehicle)
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
 
         print("[green]Vehicle added successfully[/green]")
 
-    def update_vehicle(self):
+    def update_vehicle(self, current_user: CurrentUser):
         vehicle = Vehicles()
 
         vehicle_id = get_validated_input(
@@ -150,18 +189,37 @@ class VehicleCommand(Command):
             show_default=False,
         )
 
-        self.vehicles_repo.update_vehicle(vehicle)
+        try:
+            self.vehicle_service.update_vehicle(current_user, vehicle)
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
 
         print("[green]Vehicle updated successfully[/green]")
 
-    def delete_vehicle(self):
+    def delete_vehicle(self, current_user: CurrentUser):
         id = get_validated_input(
             "Enter the vehicle id", "The value is not valid", validate_digit
         )
-        self.vehicles_repo.delete_vehicle(int(id))
+        try:
+            self.vehicle_service.delete_vehicle(current_user, int(id))
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
         print("[green]Vehicle deleted successfully[/green]")
 
-    def display_vehicle_table(self, vehicles):
+    def import_vehicles(self, current_user: CurrentUser):
+        path = get_validated_input(
+            "Enter the CSV or JSONL file path",
+            "The file does not exist",
+            os.path.isfile,
+        )
+        print_result(import_file("vehicles", path))
+
+    def export_vehicles(self, current_user: CurrentUser):
+        prompt_export("vehicles")
+
+    def display_vehicle_table(self, vehicles, prices=None):
         table = Table()
         table.add_column("id")
         table.add_column("make")
@@ -172,30 +230,72 @@ class VehicleCommand(Command):
         table.add_column("daily_rate")
         table.add_column("description")
         table.add_column("status")
+        if prices is not None:
+            table.add_column("price")
 
-        for vehicle in vehicles:
+        for i, vehicle in enumerate(vehicles):
+            price = [] if prices is None else [str(prices[i] or "")]
             table.add_row(
-                str(vehicle[0]),
-                vehicle[1],
-                vehicle[2],
-                str(vehicle[3]),
-                vehicle[4],
-                str(vehicle[5]),
-                str(vehicle[6]),
-                vehicle[7],
-                vehicle[8],
+                str(vehicle.vehicle_id),
+                vehicle.make,
+                vehicle.model,
+                str(vehicle.year),
+                vehicle.license_plate,
+                str(vehicle.mileage),
+                str(vehicle.daily_rate),
+                vehicle.description,
+                vehicle.status,
+                *price,
             )
 
         console = Console()
         console.print(table)
 
-    def list_available_vehicles(self):
-        vehicles = self.vehicles_repo.get_vehicles(status="available")
-        self.display_vehicle_table(vehicles)
+    def list_available_vehicles(self, current_user: CurrentUser, output: str = TABLE):
+        self.show_vehicles(current_user, status="available", output=output)
+
+    def search_available_vehicles(self, current_user: CurrentUser, output: str = TABLE):
+        # Customers only ever find available vehicles
+        self.search_vehicle(current_user, output)
+
+    def show_vehicles(
+        self, current_user: CurrentUser, status: str = "", output: str = TABLE
+    ):
+        if output != TABLE:
+            vehicles = self.vehicle_service.list_vehicles(
+                current_user, status, limit=None, stream=True
+            )
+            write_rows(vehicles, VehicleRow._fields, output)
+            return
+        show_pages(
+            lambda after_id, limit: self.vehicle_service.list_vehicles(
+                current_user, status, after_id=after_id, limit=limit
+            ),
+            self.display_vehicle_table,
+        )
 
-    def search_available_vehicles(self):
-        keyword = Prompt.ask("Enter the make to search")
-        vehicles = self.vehicles_repo.get_vehicles(
-            search_str=keyword, status="available"
+    def list_free_vehicles(self, current_user: CurrentUser):
+        start_date = get_validated_input(
+            "Enter the start date (YYYY-MM-DD)",
+            "The date is not valid or in the past",
+            validate_date,
+        )
+        days = get_validated_input(
+            "Enter rental duration (days)", "The value is not valid", validate_digit
+        )
+        start = datetime.strptime(start_date, "%Y-%m-%d")
+        try:
+            vehicles = self.vehicle_service.free_vehicles(start, int(days))
+        except ServiceError as e:
+            print(f"[red]{e}[/red]")
+            return
+        quotes = self.pricing.quote_many(
+            (vehicle.daily_rate, start, int(days)) for vehicle in vehicles
+        )
+        prices = [quote and quote.total for quote in quotes]
+        show_rows(
+            list(zip(vehicles, prices, strict=True)),
+            lambda page: self.display_vehicle_table(
+                [vehicle for vehicle, _ in page], [price for _, price in page]
+            ),
         )
-        self.display_vehicle_table(vehicles)
@@ -0,0 +1,92 @@
+import os
+import re
+from typing import Dict
+
+# Pragma profiles applied to every new connection, in order.
+PRAGMA_PROFILES: Dict[str, Dict[str, object]] = {
+    # Readers and writers do not block each other; commits skip the fsync of
+    # the main database file and only the WAL is synced at checkpoints.
+    "wal": {
+        "busy_timeout": 5000,  # ms
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,  # KiB, i.e. 16 MB of page cache
+        "mmap_size": 268435456,  # 256 MB
+        "temp_store": "MEMORY",
+    },
+    # SQLite defaults, for file systems that do not support WAL (e.g. network shares).
+    "compat": {
+        "busy_timeout": 5000,
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+    },
+}
+
+
+def db_path() -> str:
+    """Path of the SQLite database file (``CRS_DB_PATH``)."""
+    return os.environ.get("CRS_DB_PATH", "crs.db")
+
+
+def pool_size() -> int:
+    """Maximum number of pooled connections per database (``CRS_DB_POOL_SIZE``)."""
+    return int(os.environ.get("CRS_DB_POOL_SIZE", "8"))
+
+
+def statement_cache_size() -> int:
+    """
+    Prepared statements kept per pooled connection (``CRS_DB_STATEMENT_CACHE``).
+    It should exceed the number of registered statements, so none is evicted.
+    """
+    return int(os.environ.get("CRS_DB_STATEMENT_CACHE", "256"))
+
+
+def slow_query_ms() -> float:
+    """
+    Queries slower than this many milliseconds go to the slow-query log
+    (``CRS_DB_SLOW_QUERY_MS``). 0 logs every query, a negative value none.
+    """
+    return float(os.environ.get("CRS_DB_SLOW_QUERY_MS", "100"))
+
+
+def slow_query_log() -> str:
+    """Path of the slow-query log (``CRS_DB_SLOW_LOG``)."""
+    return os.environ.get("CRS_DB_SLOW_LOG", db_path() + ".slow.log")
+
+
+def metrics_path() -> str:
+    """File that query metrics are exported to (``CRS_METRICS_FILE``)."""
+    return os.environ.get("CRS_METRICS_FILE", "crs-metrics.prom")
+
+
+def analytics_path() -> str:
+    """
+    Directory of the columnar rental snapshot used by /report fleet
+    (``CRS_ANALYTICS_PATH``).
+    """
+    return os.environ.get("CRS_ANALYTICS_PATH", db_path() + ".analytics")
+
+
+def pragmas() -> Dict[str, object]:
+    """
+    Pragmas for new connections, in the order they are applied.
+    ``CRS_DB_PROFILE`` selects a profile from ``PRAGMA_PROFILES`` and
+    ``CRS_DB_PRAGMAS`` overrides single values, e.g. ``cache_size=-64000,mmap_size=0``.
+    busy_timeout comes first, so switching to WAL waits for other connections.
+    """
+    profile = os.environ.get("CRS_DB_PROFILE", "wal")
+    if profile not in PRAGMA_PROFILES:
+        raise ValueError(f"Unknown database profile: {profile}")
+    result = dict(PRAGMA_PROFILES[profile])
+
+    overrides = os.environ.get("CRS_DB_PRAGMAS", "")
+    for item in overrides.split(","):
+        if not item.strip():
+            continue
+        name, _, value = (part.strip() for part in item.partition("="))
+        if not re.fullmatch(r"\w+", name) or not re.fullmatch(r"-?\w+", value):
+            raise ValueError(f"Invalid pragma override: {item}")
+        result[name] = value
+    if "busy_timeout" in result:
+        result = {"busy_timeout": result.pop("busy_timeout"), **result}
+    return result
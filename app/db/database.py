@@ -1,77 +1,352 @@
+import queue
 import sqlite3
+import sys
+import threading
+import time
 from contextlib import contextmanager
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
+from db import config
+from db.metrics import METRICS
+from db.rows import row_factory
+from db.statements import Query, Statement
 from rich import print
 
 
+def _caller(frame) -> str:
+    """Names the method of frame, e.g. ``VehiclesRepository.get_by_id``."""
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    # Lambdas passed to a cache count for the method that defines them
+    return name.split(".<locals>", 1)[0]
+
+
+def split_script(script: str) -> List[str]:
+    """Splits an SQL script into its statements, keeping trigger bodies whole."""
+    statements = []
+    start = 0
+    for end in range(len(script)):
+        if script[end] == ";" and sqlite3.complete_statement(script[start : end + 1]):
+            statements.append(script[start : end + 1].strip())
+            start = end + 1
+    if script[start:].strip():
+        statements.append(script[start:].strip())
+    return statements
+
+
+class ConnectionPool:
+    """
+    A bounded pool of long-lived SQLite connections.
+
+    A thread keeps the connection it checked out until its last open
+    ``connection()`` block ends, so nested calls on the same thread share it.
+    When every connection is in use, other threads wait for one to be returned.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_size: int,
+        pragmas: Dict[str, object],
+        cached_statements: int = 128,
+    ):
+        self.db_path = db_path
+        self.max_size = max(1, max_size)
+        self.pragmas = pragmas
+        self.cached_statements = cached_statements
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+
+    def _open(self) -> sqlite3.Connection:
+        # Autocommit mode: every statement outside an explicit transaction
+        # commits on its own, like the old connect/commit/close cycle.
+        conn = sqlite3.connect(
+            self.db_path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._connections) < self.max_size:
+                conn = self._open()
+                self._connections.append(conn)
+                return conn
+        return self._idle.get()
+
+    def current(self) -> Optional[sqlite3.Connection]:
+        """Returns the connection checked out by the calling thread, if any."""
+        return getattr(self._local, "conn", None)
+
+    @contextmanager
+    def connection(self):
+        """
+        Checks out the calling thread's connection. The checkouts of a
+        thread are counted, and the last one to end returns the connection,
+        so streaming generators may be closed in any order.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._acquire()
+            self._local.depth = 0
+        self._local.depth += 1
+        try:
+            yield conn
+        finally:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                self._local.conn = None
+                self._idle.put(conn)
+
+    def close(self) -> None:
+        """Closes every connection opened by the pool."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+            self._idle = queue.LifoQueue()
+
+
 class Database:
     """A class to handle SQLite database operations."""
 
-    def __init__(self, db_path: str = "crs.db"):
-        self.db_path = db_path
+    _pools: Dict[str, ConnectionPool] = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or config.db_path()
+        self.pool = self._get_pool(self.db_path)
+
+    @classmethod
+    def _get_pool(cls, db_path: str) -> ConnectionPool:
+        with cls._pools_lock:
+            pool = cls._pools.get(db_path)
+            if pool is None:
+                pool = ConnectionPool(
+                    db_path,
+                    config.pool_size(),
+                    config.pragmas(),
+                    config.statement_cache_size(),
+                )
+                cls._pools[db_path] = pool
+            return pool
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Closes all pooled connections, e.g. before the program exits."""
+        with cls._pools_lock:
+            for pool in cls._pools.values():
+                pool.close()
+            cls._pools.clear()
 
     @contextmanager
     def get_connection(self):
         """
         Context manager for database connections.
-        Ensures connections are properly closed after use.
+        Borrows a long-lived connection from the pool for the current thread.
+        Slow queries are logged once the thread has returned it.
         """
-        conn = sqlite3.connect(self.db_path)
         try:
-            yield conn
+            with self.pool.connection() as conn:
+                yield conn
         finally:
-            conn.commit()
-            conn.close()
+            if self.pool.current() is None:
+                METRICS.write_slow_log()
 
     @contextmanager
-    def get_cursor(self):
+    def transaction(self):
+        """
+        Context manager for a unit of work.
+        Every repository call made by this thread inside the block uses the
+        same connection, so their writes commit together or not at all.
+        Nested blocks join the outermost transaction.
+        """
+        with self.get_connection() as conn:
+            if conn.in_transaction:
+                yield conn
+                return
+
+            # Take the write lock up front so reads inside the block cannot
+            # be invalidated by another writer before we commit.
+            conn.execute("BEGIN IMMEDIATE")
+            self.pool._local.on_end = []
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+            finally:
+                callbacks, self.pool._local.on_end = self.pool._local.on_end, []
+                for callback in callbacks:
+                    callback()
+
+    def in_transaction(self) -> bool:
+        """Checks if the calling thread is inside transaction()."""
+        conn = self.pool.current()
+        return conn is not None and conn.in_transaction
+
+    def after_transaction(self, callback: Callable[[], None]) -> None:
+        """
+        Runs callback once the current transaction has committed or rolled
+        back, or right away outside a transaction.
+        """
+        if self.in_transaction():
+            self.pool._local.on_end.append(callback)
+        else:
+            callback()
+
+    @contextmanager
+    def get_cursor(self, row: Optional[type] = None):
         """
         Context manager for database cursors.
-        Ensures proper connection handling and cleanup.
+        Ensures proper connection handling and cleanup. With a record type
+        as row, the cursor returns rows as records of it, see db.rows.
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            if row is not None:
+                cursor.row_factory = row_factory(row)
             try:
                 yield cursor
             finally:
                 cursor.close()
 
-    def execute(self, query: str, params: tuple = ()) -> sqlite3.Cursor:
-        """Executes a query and commits changes."""
+    @staticmethod
+    def _record(query: Query, started: float, rows: int) -> None:
+        """
+        Records the wall time and rows of a query under the repository
+        method that called the Database method calling this.
+        """
+        seconds = time.perf_counter() - started
+        if isinstance(query, Statement):
+            query.record(seconds)
+        METRICS.observe(query, _caller(sys._getframe(2)), seconds, max(rows, 0))
+
+    def execute(self, query: Query, params: tuple = ()) -> sqlite3.Cursor:
+        """Executes a query. Changes commit at once unless inside a transaction."""
         try:
             with self.get_cursor() as cursor:
-                cursor.execute(query, params)
+                started = time.perf_counter()
+                cursor.execute(str(query), params)
+                self._record(query, started, cursor.rowcount)
                 return cursor
         except sqlite3.Error as e:
             print(f"[red]Database error: {e}[/red]")
             raise
 
-    def fetch_all(self, query: str, params: tuple = ()) -> List[Tuple]:
-        """Executes a query and returns all results."""
+    def fetch_all(
+        self, query: Query, params: tuple = (), row: Optional[type] = None
+    ) -> List[Tuple]:
+        """Executes a query and returns all results, as records of row if given."""
         try:
-            with self.get_cursor() as cursor:
-                cursor.execute(query, params)
-                return cursor.fetchall()
+            with self.get_cursor(row) as cursor:
+                started = time.perf_counter()
+                rows = cursor.execute(str(query), params).fetchall()
+                self._record(query, started, len(rows))
+                return rows
         except sqlite3.Error as e:
             print(f"[red]Database error: {e}[/red]")
             return []
 
-    def fetch_one(self, query: str, params: tuple = ()) -> Optional[Tuple]:
-        """Executes a query and returns one result."""
+    def fetch_one(
+        self, query: Query, params: tuple = (), row: Optional[type] = None
+    ) -> Optional[Tuple]:
+        """Executes a query and returns one result, as a record of row if given."""
         try:
-            with self.get_cursor() as cursor:
-                cursor.execute(query, params)
-                return cursor.fetchone()
+            with self.get_cursor(row) as cursor:
+                started = time.perf_counter()
+                result = cursor.execute(str(query), params).fetchone()
+                self._record(query, started, int(result is not None))
+                return result
         except sqlite3.Error as e:
             print(f"[red]Database error: {e}[/red]")
             return None
 
-    def execute_many(self, query: str, params_list: List[tuple]) -> None:
+    def iter_query(
+        self,
+        query: Query,
+        params: tuple = (),
+        batch_size: int = 1000,
+        row: Optional[type] = None,
+        raise_errors: bool = False,
+    ) -> Iterator[Tuple]:
+        """
+        Executes a query and yields its results without loading them all.
+        Rows are fetched in batches of batch_size, and the connection stays
+        checked out until the generator is exhausted or closed. An error
+        ends the rows early unless raise_errors is set, for callers that
+        must not take a partial result for a whole one.
+        """
+        try:
+            with self.get_cursor(row) as cursor:
+                started = time.perf_counter()
+                cursor.execute(str(query), params)
+                count = 0
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        self._record(query, started, count)
+                        return
+                    count += len(rows)
+                    yield from rows
+        except sqlite3.Error as e:
+            if raise_errors:
+                raise
+            print(f"[red]Database error: {e}[/red]")
+            return
+
+    def execute_script(self, script: str) -> None:
+        """
+        Executes the statements of an SQL script in order. Unlike
+        ``sqlite3.Connection.executescript`` it does not commit first, so a
+        script run inside transaction() commits or rolls back with it.
+        """
+        try:
+            with self.get_connection() as conn:
+                for sql in split_script(script):
+                    conn.execute(sql)
+        except sqlite3.Error as e:
+            print(f"[red]Database error: {e}[/red]")
+            raise
+
+    def execute_each(self, query: Query, params_list: List[tuple]) -> List[int]:
+        """
+        Executes a query once for every parameters on one cursor, like
+        execute_many, and returns the number of rows each execution changed.
+        """
+        try:
+            with self.get_cursor() as cursor:
+                started = time.perf_counter()
+                sql = str(query)
+                counts = [
+                    cursor.execute(sql, params).rowcount for params in params_list
+                ]
+                self._record(query, started, sum(counts))
+                return counts
+        except sqlite3.Error as e:
+            print(f"[red]Database error: {e}[/red]")
+            raise
+
+    def execute_many(self, query: Query, params_list: List[tuple]) -> sqlite3.Cursor:
         """Executes a query multiple times with different parameters."""
         try:
             with self.get_cursor() as cursor:
-                cursor.executemany(query, params_list)
+                started = time.perf_counter()
+                cursor.executemany(str(query), params_list)
+                self._record(query, started, cursor.rowcount)
+                return cursor
         except sqlite3.Error as e:
             print(f"[red]Database error: {e}[/red]")
             raise
@@ -0,0 +1,44 @@
+import re
+from contextlib import contextmanager
+from typing import Optional, Sequence
+
+
+def match_expression(text: str) -> Optional[str]:
+    """
+    Turns free text into an FTS5 query that matches rows containing every
+    word as a prefix, e.g. ``jo smi`` -> ``"jo"* "smi"*``.
+    Returns None if the text has no words.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+@contextmanager
+def deferred_index(db, table: str, id_column: str, columns: Sequence[str]):
+    """
+    Context manager for inserting many rows into a table with an FTS5 index.
+    Must be used inside a transaction. The ``<table>_fts_insert`` trigger is
+    dropped for the block and the new rows are indexed with one statement at
+    the end, because FTS5 flushes its pending terms after every trigger run.
+    """
+    if not db.in_transaction():
+        raise RuntimeError("deferred_index must be used inside a transaction")
+    fts_table = f"{table}_fts"
+    trigger = db.fetch_one(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?",
+        (f"{fts_table}_insert",),
+    )
+    last_id = db.fetch_one(f"SELECT COALESCE(MAX({id_column}), 0) FROM {table}")[0]
+    db.execute(f"DROP TRIGGER {fts_table}_insert")
+    yield
+    names = ", ".join(columns)
+    db.execute(
+        f"""
+        INSERT INTO {fts_table}(rowid, {names})
+        SELECT {id_column}, {names} FROM {table} WHERE {id_column} > ?
+        """,
+        (last_id,),
+    )
+    db.execute(trigger[0])
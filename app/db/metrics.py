@@ -0,0 +1,216 @@
+import os
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from db import config
+from db.statements import normalize
+from rich import print
+
+# Upper bounds of the histogram buckets. Observations above the last bound
+# fall into the +Inf bucket.
+DURATION_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000)
+
+# Name of plain SQL queries, e.g. DDL, that are not registered statements
+UNREGISTERED = "unregistered"
+
+
+class Histogram:
+    """Counts observations in buckets with fixed upper bounds."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Returns (upper bound, observations up to it) pairs, ending with +Inf."""
+        result = []
+        total = 0
+        for bound, count in zip([*self.bounds, "+Inf"], self.counts, strict=True):
+            total += count
+            result.append((str(bound), total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates the q-quantile as the upper bound of its bucket, or the
+        last bound if it falls into the +Inf bucket.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        total = 0
+        # counts has one more bucket, +Inf, which is left out here
+        for bound, count in zip(self.bounds, self.counts, strict=False):
+            total += count
+            if total >= rank:
+                return bound
+        return self.bounds[-1]
+
+
+@dataclass
+class QueryStats:
+    """Timings and row counts of one statement run by one caller."""
+
+    statement: str
+    caller: str
+    seconds: Histogram = field(default_factory=lambda: Histogram(DURATION_BUCKETS))
+    rows: Histogram = field(default_factory=lambda: Histogram(ROW_BUCKETS))
+    max_seconds: float = 0.0
+    slow: int = 0
+
+
+class QueryMetrics:
+    """
+    Aggregates the wall time and returned rows of every query by statement
+    and calling method, and collects queries slower than ``slow_query_ms``
+    for the slow-query log. Database appends them with write_slow_log()
+    once the connection is back in the pool, so file I/O never runs with a
+    connection or transaction held.
+    """
+
+    def __init__(self):
+        self._stats: Dict[Tuple[str, str], QueryStats] = {}
+        self._lock = threading.Lock()
+        self._slow_seconds: Optional[float] = None
+        self._slow_lines: List[str] = []
+        self._slow_log_failed = False
+
+    def observe(self, query, caller: str, seconds: float, rows: int) -> None:
+        name = getattr(query, "name", UNREGISTERED)
+        if self._slow_seconds is None:
+            self._slow_seconds = config.slow_query_ms() / 1000
+        slow = 0 <= self._slow_seconds <= seconds
+        with self._lock:
+            stats = self._stats.get((name, caller))
+            if stats is None:
+                stats = self._stats[(name, caller)] = QueryStats(name, caller)
+            stats.seconds.observe(seconds)
+            stats.rows.observe(rows)
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.slow += slow
+        if slow and not self._slow_log_failed:
+            line = (
+                f"{datetime.now().isoformat(timespec='seconds')} "
+                f"{seconds * 1000:.1f} ms rows={rows} {name} {caller}: "
+                f"{normalize(str(query))}\n"
+            )
+            with self._lock:
+                self._slow_lines.append(line)
+
+    def write_slow_log(self) -> None:
+        """
+        Appends the collected slow queries to the slow-query log. If it can
+        not be written, a warning is printed once and the log is turned off
+        until reset(), as a logging failure must not fail any query.
+        """
+        if not self._slow_lines:
+            return
+        with self._lock:
+            lines, self._slow_lines = self._slow_lines, []
+        if self._slow_log_failed:
+            return
+        try:
+            with open(config.slow_query_log(), "a", encoding="utf-8") as file:
+                file.writelines(lines)
+        except OSError as e:
+            self._slow_log_failed = True
+            print(f"[yellow]The slow-query log is turned off: {e}[/yellow]")
+
+    def snapshot(self) -> List[QueryStats]:
+        """Returns the statistics sorted by total time, slowest first."""
+        with self._lock:
+            stats = list(self._stats.values())
+        return sorted(stats, key=lambda s: s.seconds.sum, reverse=True)
+
+    def reset(self) -> None:
+        """
+        Forgets all statistics, reads the slow-query threshold again and
+        turns the slow-query log back on.
+        """
+        with self._lock:
+            self._stats.clear()
+            self._slow_seconds = None
+            self._slow_lines.clear()
+            self._slow_log_failed = False
+
+    def render(self) -> str:
+        """Returns the statistics in the Prometheus text format."""
+        stats = self.snapshot()
+        lines = [
+            "# HELP crs_db_query_duration_seconds Wall time of database queries.",
+            "# TYPE crs_db_query_duration_seconds histogram",
+        ]
+        for s in stats:
+            lines += _histogram_lines("crs_db_query_duration_seconds", s, s.seconds)
+        lines += [
+            "# HELP crs_db_query_rows Rows returned or changed by database queries.",
+            "# TYPE crs_db_query_rows histogram",
+        ]
+        for s in stats:
+            lines += _histogram_lines("crs_db_query_rows", s, s.rows)
+        lines += [
+            "# HELP crs_db_slow_queries_total Queries written to the slow-query log.",
+            "# TYPE crs_db_slow_queries_total counter",
+        ]
+        for s in stats:
+            lines.append(f"crs_db_slow_queries_total{{{_labels(s)}}} {s.slow}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str) -> None:
+        """
+        Writes the statistics to path in the Prometheus text format. The file
+        is replaced at once, so a collector never reads half of it.
+        """
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "w", encoding="utf-8") as file:
+            file.write(self.render())
+        os.replace(temp, path)
+
+
+def _labels(stats: QueryStats) -> str:
+    return f'statement="{_escape(stats.statement)}",caller="{_escape(stats.caller)}"'
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(name: str, stats: QueryStats, histogram: Histogram) -> List[str]:
+    labels = _labels(stats)
+    lines = [
+        f'{name}_bucket{{{labels},le="{bound}"}} {count}'
+        for bound, count in histogram.cumulative()
+    ]
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+# Every query run by this process
+METRICS = QueryMetrics()
@@ -0,0 +1,45 @@
+from typing import Dict, List
+
+from db.database import Database
+from db.statements import statement
+
+USER_VERSION = statement("migrations.user_version", "PRAGMA user_version")
+
+
+def schema_version(db: Database) -> int:
+    """Reads the schema version stored in the database file."""
+    return db.fetch_one(USER_VERSION)[0]
+
+
+def migrate(
+    db: Database, schema: str, version: int, upgrades: Dict[int, str]
+) -> List[int]:
+    """
+    Brings the database to version and returns the versions applied.
+
+    The version is kept in ``PRAGMA user_version``, so a current database
+    costs one pragma read. A database without a version gets the whole
+    schema, which only creates what is missing; an older one gets the
+    upgrades[v] scripts of every later version v. All of it runs in one
+    transaction, so a failed migration leaves the database as it was.
+    """
+    current = schema_version(db)
+    if current == version:
+        return []
+    with db.transaction():
+        # Another process may have migrated while this one waited for the lock
+        current = schema_version(db)
+        if current > version:
+            raise RuntimeError(
+                f"The database schema version {current} is newer than "
+                f"this program's {version}"
+            )
+        if current == 0:
+            applied = [version]
+            db.execute_script(schema)
+        else:
+            applied = list(range(current + 1, version + 1))
+            for v in applied:
+                db.execute_script(upgrades[v])
+        db.execute(f"PRAGMA user_version = {version}")
+    return applied
@@ -0,0 +1,41 @@
+from collections import namedtuple
+from dataclasses import fields
+from typing import Callable, Dict, Sequence
+
+# Row factories by record type, built once
+_factories: Dict[type, Callable] = {}
+
+
+def field_names(record: type) -> Sequence[str]:
+    """Names of the fields of a dataclass or NamedTuple, in order."""
+    if hasattr(record, "_fields"):
+        return record._fields
+    return [f.name for f in fields(record)]
+
+
+def columns(record: type, alias: str = "") -> str:
+    """
+    The SELECT list of a record type, e.g. ``r.rental_id, r.vehicle_id, ...``
+    for columns(Rentals, "r"). Field names are the column names.
+    """
+    prefix = f"{alias}." if alias else ""
+    return ", ".join(prefix + name for name in field_names(record))
+
+
+def named_row(record: type) -> type:
+    """
+    A NamedTuple type with the fields of a dataclass, for list queries.
+    Its rows are plain tuples in memory and can still be indexed.
+    """
+    return namedtuple(f"{record.__name__}Row", field_names(record))
+
+
+def row_factory(record: type) -> Callable:
+    """
+    A sqlite3 row factory that builds a record from the columns of each
+    row by position, for queries that select columns(record).
+    """
+    factory = _factories.get(record)
+    if factory is None:
+        factory = _factories[record] = lambda _cursor, row: record(*row)
+    return factory
@@ -0,0 +1,100 @@
+import re
+import threading
+from typing import Dict, Union
+
+# String literals are kept as they are when whitespace is normalized
+_LITERAL = re.compile(r"('(?:[^']|'')*')")
+
+
+def normalize(sql: str) -> str:
+    """Collapses the whitespace of sql outside string literals."""
+    parts = _LITERAL.split(sql)
+    for i in range(0, len(parts), 2):
+        parts[i] = re.sub(r"\s+", " ", parts[i])
+    return "".join(parts).strip()
+
+
+class Statement:
+    """
+    A named SQL statement with execution counters.
+
+    The SQL text is normalized once, so every call passes the identical
+    string to sqlite3 and finds the prepared statement in the statement
+    cache of the pooled connection.
+    """
+
+    def __init__(self, name: str, sql: str):
+        self.name = name
+        self.source = sql
+        self.sql = normalize(sql)
+        self.calls = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.seconds += seconds
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {"calls": self.calls, "seconds": self.seconds}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = 0
+            self.seconds = 0.0
+
+    def __str__(self) -> str:
+        return self.sql
+
+    def __repr__(self) -> str:
+        return f"Statement({self.name!r})"
+
+
+# SQL accepted by Database: a registered statement or plain SQL, e.g. DDL
+Query = Union[str, Statement]
+
+# Every statement by name, for statistics
+STATEMENTS: Dict[str, Statement] = {}
+_lock = threading.Lock()
+
+
+def statement(name: str, sql: str) -> Statement:
+    """
+    Registers sql under name, e.g. ``vehicles.get_by_id``, and returns the
+    statement. Registering the same SQL again returns the registered
+    statement; other SQL under a registered name raises ValueError.
+    """
+    current = STATEMENTS.get(name)
+    if current is not None and current.source == sql:
+        return current
+    new = Statement(name, sql)
+    with _lock:
+        current = STATEMENTS.setdefault(name, new)
+    if current.sql != new.sql:
+        raise ValueError(f"Statement {name} is registered with other SQL")
+    return current
+
+
+def variant(name: str, **filters) -> str:
+    """
+    Names a variant of a statement built at runtime from its optional
+    filters, e.g. ``rentals.get_rental_details[status,limit]``.
+    """
+    used = [key for key, value in filters.items() if value]
+    return f"{name}[{','.join(used)}]" if used else name
+
+
+def statement_stats() -> Dict[str, Dict[str, float]]:
+    """Returns the call count and total seconds of every executed statement."""
+    return {
+        name: stats
+        for name, stats in ((s.name, s.stats()) for s in STATEMENTS.values())
+        if stats["calls"]
+    }
+
+
+def reset_statement_stats() -> None:
+    for statement in STATEMENTS.values():
+        statement.reset()
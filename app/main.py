@@ -1,15 +1,19 @@
+import argparse
+import multiprocessing
+import sqlite3
+from datetime import date
 from typing import Optional
 
 from command.factory import CommandFactory
-from command.users import UsersCommand
+from db.database import Database
 from globals import CurrentUser
-from repository.customers import CustomersRepository
-from repository.rentals import RentalsRepository
 from repository.roles import RoleRepository
-from repository.staff import StaffRepository
-from repository.users import UsersRepository
-from repository.vehicles import VehiclesRepository
+from repository.schema import migrate_schema
 from rich import print
+from util.session import end_session, resume_session, save_session
+
+# Modules used by only some runs, e.g. the login prompt, which loads the
+# rich console, are imported where they are needed to start faster.
 
 
 def welcome_prompt() -> Optional[CurrentUser]:
@@ -22,19 +26,19 @@ def welcome_prompt() -> Optional[CurrentUser]:
         /bye      Exit the program
         """)
 
+    from command.users import UsersCommand
+
     users_command = UsersCommand()
     while True:
         try:
             command = input(">>> ")
             if command == "/register":
-                users_command.handle_register_command()
-                print("Use /login command to login into system")
+                if users_command.handle_register_command():
+                    print("Use /login command to login into system")
             elif command == "/login":
                 user = users_command.handle_login_command()
                 if user is None:
-                    print(
-                        "[red]Invalid username or password. Please try again.[/red]"
-                    )
+                    print("[red]Invalid username or password. Please try again.[/red]")
                 else:
                     print(f"[green]Welcome {user.username}[/green]")
                     return user
@@ -48,37 +52,136 @@ def welcome_prompt() -> Optional[CurrentUser]:
 
 
 def initialize():
-    customerRepo = CustomersRepository()
-    customerRepo.create_table()
-    rentalRepo = RentalsRepository()
-    rentalRepo.create_table()
-    roleRepo = RoleRepository()
-    roleRepo.create_table()
-    staffRepo = StaffRepository()
-    staffRepo.create_table()
-    usersRepo = UsersRepository()
-    usersRepo.create_table()
-    vehiclesRepo = VehiclesRepository()
-    vehiclesRepo.create_table()
+    migrate_schema()
+    RoleRepository().load_roles()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Car Rental System")
+    parser.add_argument(
+        "--import",
+        dest="import_args",
+        nargs=2,
+        metavar=("TABLE", "FILE"),
+        help="import a CSV or JSONL file into vehicles, customers, rentals or accounts",
+    )
+    parser.add_argument(
+        "--export",
+        dest="export_args",
+        nargs=2,
+        metavar=("TABLE", "FILE"),
+        help="export rentals, vehicles or customers to a CSV or JSONL file, "
+        "gzipped if FILE ends with .gz",
+    )
+    parser.add_argument(
+        "--from",
+        dest="first",
+        type=date.fromisoformat,
+        metavar="YYYY-MM-DD",
+        help="export rentals that start, or customers created, on or after a date",
+    )
+    parser.add_argument(
+        "--to",
+        dest="last",
+        type=date.fromisoformat,
+        metavar="YYYY-MM-DD",
+        help="export rentals that start, or customers created, on or before a date",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="run the commands in FILE as the logged-in user, without prompts",
+    )
+    args = parser.parse_args(argv)
+    if sum(map(bool, (args.import_args, args.export_args, args.batch))) > 1:
+        parser.error("--import, --export and --batch can not be used together")
+    if args.import_args:
+        from util.importer import IMPORTERS
+
+        if args.import_args[0] not in IMPORTERS:
+            parser.error(f"unknown import table: {args.import_args[0]}")
+    if (args.first or args.last) and not args.export_args:
+        parser.error("--from and --to only apply to --export")
+    if args.export_args:
+        from util.exporter import EXPORTERS, export_format
+
+        table, path = args.export_args
+        if table not in EXPORTERS:
+            parser.error(f"unknown export table: {table}")
+        try:
+            export_format(path)
+        except ValueError as e:
+            parser.error(str(e))
+    return args
 
 
 if __name__ == "__main__":
+    # Password hashing workers re-enter this script in packaged builds
+    multiprocessing.freeze_support()
+    args = parse_args()
     initialize()
 
-    current_user = welcome_prompt()
+    if args.import_args:
+        from util.importer import import_file, print_result
+
+        try:
+            result = import_file(*args.import_args)
+        except (OSError, ValueError) as e:
+            print(f"[red]{e}[/red]")
+            raise SystemExit(1) from None
+        print_result(result)
+        Database.close_all()
+        raise SystemExit(0)
+
+    if args.export_args:
+        from util.exporter import export_file
+        from util.exporter import print_result as print_export_result
+
+        try:
+            result = export_file(*args.export_args, args.first, args.last)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"[red]{e}[/red]")
+            raise SystemExit(1) from None
+        print_export_result(result)
+        Database.close_all()
+        raise SystemExit(0)
+
+    if args.batch:
+        current_user = resume_session()
+        if current_user is None:
+            print("[red]Please run the program and login before a batch[/red]")
+            raise SystemExit(1)
+        from util.batch import BatchRunner
+        from util.batch import print_result as print_batch_result
+
+        result = BatchRunner().run_file(current_user, args.batch)
+        print_batch_result(result)
+        Database.close_all()
+        raise SystemExit(1 if result.failed else 0)
+
+    current_user = resume_session()
+    if current_user is not None:
+        print(f"[green]Welcome back {current_user.username}[/green]")
+    else:
+        current_user = welcome_prompt()
+        if current_user is not None:
+            save_session(current_user)
     if current_user is not None:
+        commands = CommandFactory()
         while True:
             try:
                 type = input(">>> ")
                 if type == "/bye":
                     print("Goodbye!")
                     break
+                elif type == "/logout":
+                    end_session()
+                    print("Logged out. Goodbye!")
+                    break
                 else:
-                    command_handler = CommandFactory.get_command(
-                        type, current_user
-                    )
-                    if command_handler:
-                        command_handler.handle(type)
+                    commands.handle(type, current_user)
             except KeyboardInterrupt:
                 print("\n")
                 pass
+
+    Database.close_all()
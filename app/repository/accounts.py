@@ -0,0 +1,43 @@
+from typing import List, Tuple, Union
+
+from repository.customers import Customers, CustomersRepository
+from repository.staff import Staff, StaffRepository
+from repository.users import Users, UsersRepository
+
+
+class AccountsRepository:
+    """User accounts together with their customer or staff profiles."""
+
+    def __init__(self):
+        self.users_repo = UsersRepository()
+        self.customer_repo = CustomersRepository()
+        self.staff_repo = StaffRepository()
+        self.db = self.users_repo.db
+
+    def add_accounts(
+        self, accounts: List[Tuple[Users, Union[Customers, Staff]]]
+    ) -> int:
+        """
+        Adds users with their profiles. Accounts whose username, email or
+        driver license already exists are skipped.
+        Returns the number of accounts added.
+        """
+        users = self.users_repo.prepare_users([user for user, _ in accounts])
+        with self.db.transaction():
+            user_ids = self.users_repo.add_users(users)
+            if not user_ids:
+                return 0
+            customers, staffs = [], []
+            for user, profile in accounts:
+                if user.username in user_ids:
+                    profile.user_id = user_ids.pop(user.username)
+                    if isinstance(profile, Staff):
+                        staffs.append(profile)
+                    else:
+                        customers.append(profile)
+            self.customer_repo.add_customers(customers)
+            self.staff_repo.add_staffs(staffs)
+            # Users whose profile was a duplicate
+            first_id = min(profile.user_id for profile in customers + staffs)
+            deleted = self.users_repo.delete_users_without_profile(first_id)
+        return len(customers) + len(staffs) - deleted
@@ -0,0 +1,147 @@
+import calendar
+from datetime import datetime
+from typing import List
+
+from db.database import Database
+from db.rows import columns
+from db.statements import statement
+from repository.vehicles import VehicleRow, Vehicles
+
+# Rentals in these states hold their vehicle for the booked date range.
+RESERVING_STATUSES = "('apply', 'active')"
+
+# Minutes since the epoch, as SQLite reads the stored DATETIME text.
+# Both ends round down, so back-to-back rentals do not overlap.
+START_MINUTE = "CAST(strftime('%s', NEW.start_date) AS INTEGER) / 60"
+END_MINUTE = "CAST(strftime('%s', NEW.expected_return_date) AS INTEGER) / 60"
+
+
+def to_minute(value: datetime) -> int:
+    """Converts a datetime to minutes since the epoch, like the triggers do."""
+    return calendar.timegm(value.timetuple()) // 60
+
+
+IS_AVAILABLE = statement(
+    "availability.is_available",
+    """
+    SELECT 1 FROM rental_periods
+    WHERE min_vehicle_id <= ? AND max_vehicle_id >= ?
+      AND start_minute < ? AND end_minute > ?
+    LIMIT 1
+    """,
+)
+
+BUSY_VEHICLE_IDS = statement(
+    "availability.busy_vehicle_ids",
+    """
+    SELECT DISTINCT min_vehicle_id FROM rental_periods
+    WHERE start_minute < ? AND end_minute > ?
+    """,
+)
+
+FREE_VEHICLE_IDS = statement(
+    "availability.free_vehicle_ids",
+    """
+    SELECT vehicle_id FROM vehicles WHERE status != 'maintenance'
+    EXCEPT
+    SELECT min_vehicle_id FROM rental_periods
+    WHERE start_minute < ? AND end_minute > ?
+    """,
+)
+
+FREE_VEHICLES = statement(
+    "availability.free_vehicles",
+    f"""
+    SELECT {columns(Vehicles)}
+    FROM vehicles
+    WHERE status != 'maintenance'
+      AND vehicle_id NOT IN (
+          SELECT min_vehicle_id FROM rental_periods
+          WHERE start_minute < ? AND end_minute > ?
+      )
+    """,
+)
+
+
+SCHEMA = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS rental_periods USING rtree_i32(
+    rental_id,
+    min_vehicle_id, max_vehicle_id,
+    start_minute, end_minute
+);
+CREATE TRIGGER IF NOT EXISTS rental_periods_insert
+AFTER INSERT ON rentals
+WHEN NEW.rental_status IN {RESERVING_STATUSES}
+BEGIN
+    INSERT INTO rental_periods
+    VALUES (NEW.rental_id, NEW.vehicle_id, NEW.vehicle_id, {START_MINUTE}, {END_MINUTE});
+END;
+CREATE TRIGGER IF NOT EXISTS rental_periods_update
+AFTER UPDATE OF vehicle_id, start_date, expected_return_date, rental_status ON rentals
+BEGIN
+    DELETE FROM rental_periods WHERE rental_id = OLD.rental_id;
+    INSERT INTO rental_periods
+    SELECT NEW.rental_id, NEW.vehicle_id, NEW.vehicle_id, {START_MINUTE}, {END_MINUTE}
+    WHERE NEW.rental_status IN {RESERVING_STATUSES};
+END;
+CREATE TRIGGER IF NOT EXISTS rental_periods_delete
+AFTER DELETE ON rentals
+BEGIN
+    DELETE FROM rental_periods WHERE rental_id = OLD.rental_id;
+END;
+"""
+
+# Loads the reservations made before the index existed
+BACKFILL = f"""
+DELETE FROM rental_periods;
+INSERT INTO rental_periods
+SELECT rental_id, vehicle_id, vehicle_id,
+       CAST(strftime('%s', start_date) AS INTEGER) / 60,
+       CAST(strftime('%s', expected_return_date) AS INTEGER) / 60
+FROM rentals
+WHERE rental_status IN {RESERVING_STATUSES};
+"""
+
+
+class AvailabilityRepository:
+    """
+    Date-range reservations of vehicles.
+
+    The ``rental_periods`` R*Tree holds one box per reserving rental, with the
+    vehicle id on one axis and the reserved minutes on the other. Triggers on
+    ``rentals`` keep it in sync, so overlap checks never touch ``rentals``.
+    """
+
+    def __init__(self):
+        self.db = Database()
+
+    def create_table(self):
+        exists = self.db.fetch_one(
+            "SELECT 1 FROM sqlite_master WHERE name = 'rental_periods'"
+        )
+        self.db.execute_script(SCHEMA)
+        if exists is None:
+            self.db.execute_script(BACKFILL)
+
+    def is_available(self, vehicle_id: int, start: datetime, end: datetime) -> bool:
+        """Checks if no reservation of the vehicle overlaps [start, end)."""
+        result = self.db.fetch_one(
+            IS_AVAILABLE, (vehicle_id, vehicle_id, to_minute(end), to_minute(start))
+        )
+        return result is None
+
+    def busy_vehicle_ids(self, start: datetime, end: datetime) -> List[int]:
+        """Retrieves the ids of vehicles with a reservation overlapping [start, end)."""
+        rows = self.db.fetch_all(BUSY_VEHICLE_IDS, (to_minute(end), to_minute(start)))
+        return [row[0] for row in rows]
+
+    def free_vehicle_ids(self, start: datetime, end: datetime) -> List[int]:
+        """Retrieves the ids of vehicles with no reservation overlapping [start, end)."""
+        rows = self.db.fetch_all(FREE_VEHICLE_IDS, (to_minute(end), to_minute(start)))
+        return [row[0] for row in rows]
+
+    def free_vehicles(self, start: datetime, end: datetime) -> List[VehicleRow]:
+        """Retrieves vehicles with no reservation overlapping [start, end)."""
+        return self.db.fetch_all(
+            FREE_VEHICLES, (to_minute(end), to_minute(start)), row=VehicleRow
+        )
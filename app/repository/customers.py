@@ -1,11 +1,15 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Iterator, List, Optional
 
 from db.database import Database
+from db.fts import deferred_index, match_expression
+from db.rows import columns, named_row
+from db.statements import statement, variant
+from util.cache import LRUCache
 
 
-@dataclass
+@dataclass(slots=True)
 class Customers:
     customer_id: Optional[int] = None
     user_id: Optional[int] = None
@@ -14,7 +18,137 @@ class Customers:
     phone: Optional[str] = None
     address: Optional[str] = None
     driver_license: Optional[str] = None
-    create_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+
+# Customers as listed, with the same columns
+CustomerRow = named_row(Customers)
+
+# Customer rows by user id, e.g. the logged-in customer of every /rental book
+customer_cache = LRUCache("customers.get_by_user_id", maxsize=1024, ttl=300)
+
+
+SEARCH_CUSTOMERS = statement(
+    "customers.search_customers",
+    f"""
+    SELECT {columns(Customers, "c")}
+    FROM customers_fts
+    JOIN customers c ON c.customer_id = customers_fts.rowid
+    WHERE customers_fts MATCH ?
+    ORDER BY customers_fts.rank
+    LIMIT ?
+    """,
+)
+
+ADD_CUSTOMER = statement(
+    "customers.add_customer",
+    """
+    INSERT INTO customers(user_id, full_name, email, phone, address, driver_license) VALUES(?, ?, ?, ?, ?, ?)
+    """,
+)
+
+ADD_CUSTOMERS = statement(
+    "customers.add_customers",
+    """
+    INSERT OR IGNORE INTO customers(user_id, full_name, email, phone, address, driver_license) VALUES(?, ?, ?, ?, ?, ?)
+    """,
+)
+
+UPDATE_CUSTOMER_CURRENT = statement(
+    "customers.update_customer.current",
+    f"SELECT {columns(Customers)} FROM customers WHERE customer_id = ?",
+)
+
+UPDATE_CUSTOMER = statement(
+    "customers.update_customer",
+    """
+    UPDATE customers
+    SET full_name = ?,
+        email = ?,
+        phone = ?,
+        address = ?,
+        driver_license = ?
+    where customer_id = ?
+    """,
+)
+
+DELETE_CUSTOMER = statement(
+    "customers.delete_customer",
+    """
+    DELETE FROM customers WHERE customer_id = ?
+    """,
+)
+
+EMAIL_EXITS = statement(
+    "customers.email_exits",
+    """
+    SELECT 1 FROM customers WHERE email = ?
+    """,
+)
+
+DRIVER_LICENSE_EXITS = statement(
+    "customers.driver_license_exits",
+    """
+    SELECT 1 FROM customers WHERE driver_license = ?
+    """,
+)
+
+GET_BY_USER_ID = statement(
+    "customers.get_by_user_id",
+    f"""
+    SELECT {columns(Customers)} FROM customers WHERE user_id = ?
+    """,
+)
+
+GET_BY_CUSTOMER_ID = statement(
+    "customers.get_by_customer_id",
+    f"""
+    SELECT {columns(Customers)} FROM customers WHERE customer_id = ?
+    """,
+)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    full_name TEXT NOT NULL,
+    email TEXT UNIQUE,
+    phone TEXT,
+    address TEXT,
+    driver_license TEXT UNIQUE,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users (user_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_customers_user_id ON customers (user_id);
+
+-- Full-text index over the searchable columns, kept in sync by triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS customers_fts USING fts5(
+    full_name, email, phone, driver_license,
+    content='customers', content_rowid='customer_id', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS customers_fts_insert AFTER INSERT ON customers
+BEGIN
+    INSERT INTO customers_fts(rowid, full_name, email, phone, driver_license)
+    VALUES (NEW.customer_id, NEW.full_name, NEW.email, NEW.phone, NEW.driver_license);
+END;
+CREATE TRIGGER IF NOT EXISTS customers_fts_delete AFTER DELETE ON customers
+BEGIN
+    INSERT INTO customers_fts(customers_fts, rowid, full_name, email, phone, driver_license)
+    VALUES ('delete', OLD.customer_id, OLD.full_name, OLD.email, OLD.phone, OLD.driver_license);
+END;
+CREATE TRIGGER IF NOT EXISTS customers_fts_update AFTER UPDATE ON customers
+BEGIN
+    INSERT INTO customers_fts(customers_fts, rowid, full_name, email, phone, driver_license)
+    VALUES ('delete', OLD.customer_id, OLD.full_name, OLD.email, OLD.phone, OLD.driver_license);
+    INSERT INTO customers_fts(rowid, full_name, email, phone, driver_license)
+    VALUES (NEW.customer_id, NEW.full_name, NEW.email, NEW.phone, NEW.driver_license);
+END;
+"""
+
+# Indexes the customers added before the full-text index existed
+BACKFILL = "INSERT INTO customers_fts(customers_fts) VALUES ('rebuild');"
 
 
 class CustomersRepository:
@@ -24,43 +158,97 @@ class CustomersRepository:
         self.db = Database()
 
     def create_table(self):
-        query = """
-        CREATE TABLE IF NOT EXISTS customers (
-            customer_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            full_name TEXT NOT NULL,
-            email TEXT UNIQUE,
-            phone TEXT,
-            address TEXT,
-            driver_license TEXT UNIQUE,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (user_id)
-        );
+        exists = self.db.fetch_one(
+            "SELECT 1 FROM sqlite_master WHERE name = 'customers_fts'"
+        )
+        self.db.execute_script(SCHEMA)
+        if exists is None:
+            self.db.execute_script(BACKFILL)
+
+    def get_customers(
+        self,
+        search_str,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        stream: bool = False,
+    ):
+        """
+        Retrieves customers from the database
+        Pass the last customer_id of a page as after_id to get the next page.
+        With stream, rows are read from the cursor as they are iterated.
+        """
+        query = f"SELECT {columns(Customers)} FROM customers WHERE customer_id > ?"
+        params = [after_id or 0]
+        if search_str:
+            match = match_expression(search_str)
+            if match is None:
+                return []
+            query += """
+            AND customer_id IN (SELECT rowid FROM customers_fts WHERE customers_fts MATCH ?)
+            """
+            params.append(match)
+        query += " ORDER BY customer_id LIMIT ?"
+        params.append(-1 if limit is None else limit)
+        name = variant("customers.get_customers", match=search_str)
+        fetch = self.db.iter_query if stream else self.db.fetch_all
+        return fetch(statement(name, query), tuple(params), row=CustomerRow)
+
+    def export_customers(
+        self, start: Optional[str] = None, end: Optional[str] = None
+    ) -> Iterator[CustomerRow]:
+        """
+        Reads customers from the cursor as they are iterated. start and end
+        are ISO dates; customers created from start and before end are
+        included.
         """
-        self.db.execute(query)
+        query = f"SELECT {columns(Customers)} FROM customers"
+        conditions, params = [], []
+        if start:
+            conditions.append("created_at >= ?")
+            params.append(start)
+        if end:
+            conditions.append("created_at < ?")
+            params.append(end)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY customer_id"
+        name = variant("customers.export_customers", start=start, end=end)
+        return self.db.iter_query(
+            statement(name, query), tuple(params), row=CustomerRow, raise_errors=True
+        )
 
-    def get_customers(self, search_str):
-        """Retrieves customers from the database"""
-        query = """
-        SELECT * FROM customers WHERE full_name LIKE ? OR email LIKE ? OR phone LIKE ? OR driver_license LIKE ?
+    def search_customers(self, keyword: str, limit: int = 50):
+        """
+        Retrieves the customers that best match the keyword.
+        Every word matches the start of a word in the name, email, phone or
+        driver license, e.g. "jo 0412" finds John with phone 0412 345 678.
         """
-        return self.db.fetch_all(
-            query,
+        match = match_expression(keyword)
+        if match is None:
+            return []
+        return self.db.fetch_all(SEARCH_CUSTOMERS, (match, limit), row=CustomerRow)
+
+    def add_customer(self, customer: Customers) -> int:
+        """Adds a new customer to the database"""
+        cursor = self.db.execute(
+            ADD_CUSTOMER,
             (
-                f"%{search_str}%",
-                f"%{search_str}%",
-                f"%{search_str}%",
-                f"%{search_str}%",
+                customer.user_id,
+                customer.full_name,
+                customer.email,
+                customer.phone,
+                customer.address,
+                customer.driver_license,
             ),
         )
+        return cursor.lastrowid
 
-    def add_customer(self, customer: Customers):
-        """Adds a new customer to the database"""
-        query = """
-        INSERT INTO customers(user_id, full_name, email, phone, address, driver_license) VALUES(?, ?, ?, ?, ?, ?)
+    def add_customers(self, customers: List[Customers]) -> int:
         """
-        self.db.execute(
-            query,
+        Adds many customers with one statement, skipping emails and driver
+        licenses that already exist. Returns the number of customers added.
+        """
+        params = [
             (
                 customer.user_id,
                 customer.full_name,
@@ -68,77 +256,70 @@ class CustomersRepository:
                 customer.phone,
                 customer.address,
                 customer.driver_license,
+            )
+            for customer in customers
+        ]
+        with (
+            self.db.transaction(),
+            deferred_index(
+                self.db,
+                "customers",
+                "customer_id",
+                ("full_name", "email", "phone", "driver_license"),
             ),
-        )
+        ):
+            return self.db.execute_many(ADD_CUSTOMERS, params).rowcount
 
     def update_customer(self, customer: Customers):
         """Updates an existing customer in the database"""
-        query = "SELECT * FROM customers WHERE customer_id = ?"
-        current_customer = self.db.fetch_one(query, (customer.customer_id,))
-        if not current_customer:
+        current = self.db.fetch_one(
+            UPDATE_CUSTOMER_CURRENT, (customer.customer_id,), row=Customers
+        )
+        if not current:
             raise ValueError(f"Customer with ID {customer.customer_id} not found")
-        query = """
-        UPDATE customers
-        SET full_name = ?,
-            email = ?,
-            phone = ?,
-            address = ?,
-            driver_license = ?
-        where customer_id = ?
-        """
         self.db.execute(
-            query,
+            UPDATE_CUSTOMER,
             (
-                customer.full_name or current_customer[1],
-                customer.email or current_customer[2],
-                customer.phone or current_customer[3],
-                customer.address or current_customer[4],
-                customer.driver_license or current_customer[5],
+                customer.full_name or current.full_name,
+                customer.email or current.email,
+                customer.phone or current.phone,
+                customer.address or current.address,
+                customer.driver_license or current.driver_license,
                 customer.customer_id,
             ),
         )
+        user_id = current.user_id
+        self.db.after_transaction(lambda: customer_cache.invalidate(user_id))
 
     def delete_customer(self, id):
         """Deletes a customer from the database"""
-        query = """
-        DELETE FROM customers WHERE customer_id = ?
-        """
-        self.db.execute(query, (id,))
+        self.db.execute(DELETE_CUSTOMER, (id,))
+        self.db.after_transaction(customer_cache.clear)
 
     def email_exits(self, email):
         """Check if the email is exist"""
-        query = """
-        SELECT * FROM customers WHERE email = ?
-        """
-        result = self.db.fetch_one(query, email)
+        result = self.db.fetch_one(EMAIL_EXITS, (email,))
         if result is None:
             return False
         return True
 
     def driver_license_exits(self, driver_license):
         """Check if the driver license is exist"""
-        query = """
-        SELECT * FROM customers WHERE driver_license = ?
-        """
-        result = self.db.fetch_one(query, (driver_license,))
+        result = self.db.fetch_one(DRIVER_LICENSE_EXITS, (driver_license,))
         if result is None:
             return True
         return False
 
     def get_by_user_id(self, user_id) -> Optional[Customers]:
-        query = """
-        SELECT * FROM customers WHERE user_id = ?
-        """
-        result = self.db.fetch_one(query, (user_id,))
+        # The cache keeps immutable rows; callers get their own record
+        result = customer_cache.get_or_load(
+            user_id,
+            lambda: self.db.fetch_one(GET_BY_USER_ID, (user_id,), row=CustomerRow),
+            bypass=self.db.in_transaction(),
+        )
         if result is None:
             return None
         return Customers(*result)
 
     def get_by_customer_id(self, customer_id) -> Optional[Customers]:
-        query = """
-        SELECT * FROM customers WHERE customer_id = ?
-        """
-        result = self.db.fetch_one(query, (customer_id,))
-        if result is None:
-            return None
-        return Customers(*result)
+        return self.db.fetch_one(GET_BY_CUSTOMER_ID, (customer_id,), row=Customers)
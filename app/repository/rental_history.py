@@ -0,0 +1,184 @@
+import json
+import os
+import threading
+from dataclasses import dataclass, fields
+from typing import List, Optional, Sequence
+
+import numpy as np
+from db import config
+from db.database import Database
+from db.statements import statement
+
+# Codes of the rental states in the status column
+STATUSES = ("apply", "active", "reject", "completed", "cancelled")
+# Rentals in these states can still change; the others are final.
+OPEN_STATUSES = (STATUSES.index("apply"), STATUSES.index("active"))
+
+STATUS_CODE = " ".join(
+    f"WHEN '{status}' THEN {code}" for code, status in enumerate(STATUSES)
+)
+
+# One row per rental with the columns of RentalColumns, all integers.
+# Times are minutes since the epoch, like in rental_periods.
+SELECT_COLUMNS = f"""
+SELECT rental_id,
+       COALESCE(vehicle_id, 0),
+       CAST(strftime('%s', start_date) AS INTEGER) / 60,
+       CAST(strftime('%s', COALESCE(actual_return_date, expected_return_date))
+            AS INTEGER) / 60,
+       CASE rental_status {STATUS_CODE} END,
+       CASE WHEN rental_status = 'completed'
+            THEN MAX(COALESCE(return_mileage, 0) - COALESCE(initial_mileage, 0), 0)
+            ELSE 0 END,
+       CAST(ROUND(COALESCE(total_cost, 0) * 100) AS INTEGER)
+FROM rentals
+"""
+
+NEW_RENTALS = statement(
+    "rental_history.new_rentals",
+    SELECT_COLUMNS + "WHERE rental_id > ? ORDER BY rental_id LIMIT ?",
+)
+
+RENTALS_BY_ID = statement(
+    "rental_history.rentals_by_id",
+    SELECT_COLUMNS + "WHERE rental_id IN (SELECT value FROM json_each(?))",
+)
+
+MAX_RENTAL_ID = statement(
+    "rental_history.max_rental_id", "SELECT COALESCE(MAX(rental_id), 0) FROM rentals"
+)
+
+FLEET_SIZE = statement("rental_history.fleet_size", "SELECT COUNT(*) FROM vehicles")
+
+
+@dataclass
+class RentalColumns:
+    """Rentals as NumPy arrays of equal length, one per column."""
+
+    rental_id: np.ndarray
+    vehicle_id: np.ndarray
+    start_minute: np.ndarray
+    end_minute: np.ndarray  # actual return, or expected return if not returned
+    status: np.ndarray  # index in STATUSES
+    distance: np.ndarray  # driven miles of completed rentals
+    cost_cents: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple]) -> "RentalColumns":
+        table = np.array(rows, dtype=np.int64).reshape(len(rows), len(fields(cls)))
+        return cls(*(np.ascontiguousarray(column) for column in table.T))
+
+    @classmethod
+    def concat(cls, parts: List["RentalColumns"]) -> "RentalColumns":
+        return cls(
+            *(
+                np.concatenate([getattr(part, f.name) for part in parts])
+                for f in fields(cls)
+            )
+        )
+
+    def select(self, mask: np.ndarray) -> "RentalColumns":
+        return RentalColumns(*(getattr(self, f.name)[mask] for f in fields(self)))
+
+    def __len__(self) -> int:
+        return len(self.rental_id)
+
+    def save(self, path: str, prefix: str) -> None:
+        for f in fields(self):
+            temp = os.path.join(path, f"{prefix}.{f.name}.tmp.npy")
+            np.save(temp, getattr(self, f.name))
+            os.replace(temp, os.path.join(path, f"{prefix}.{f.name}.npy"))
+
+    @classmethod
+    def load(cls, path: str, prefix: str) -> "RentalColumns":
+        return cls(
+            *(
+                np.load(os.path.join(path, f"{prefix}.{f.name}.npy"))
+                for f in fields(cls)
+            )
+        )
+
+
+EMPTY = RentalColumns.from_rows([])
+
+
+class RentalHistoryRepository:
+    """
+    A columnar snapshot of rentals for analytics.
+
+    The snapshot is kept as .npy files in ``config.analytics_path()`` and
+    refreshed incrementally: final rentals are stored once, while rentals
+    above the rental_id watermark and the open (apply, active) rentals,
+    which can still change, are read again at every refresh.
+    """
+
+    # Rows read per query when the snapshot catches up
+    CHUNK_SIZE = 100000
+
+    def __init__(self, path: Optional[str] = None):
+        self.db = Database()
+        self.path = path or config.analytics_path()
+        self._lock = threading.Lock()
+        self._final: Optional[RentalColumns] = None
+        self._open = EMPTY
+        self._watermark = 0
+
+    def fleet_size(self) -> int:
+        return self.db.fetch_one(FLEET_SIZE)[0]
+
+    def load(self) -> RentalColumns:
+        """Refreshes the snapshot and returns every rental."""
+        with self._lock:
+            if self._final is None:
+                self._read()
+            self._refresh()
+            return RentalColumns.concat([self._final, self._open])
+
+    def _read(self) -> None:
+        try:
+            with open(os.path.join(self.path, "snapshot.json")) as file:
+                meta = json.load(file)
+            # Rows saved after the last complete refresh are read again
+            final = RentalColumns.load(self.path, "final")
+            self._final = final.select(slice(0, meta["final_rows"]))
+            self._open = RentalColumns.load(self.path, "open")
+            self._watermark = meta["watermark"]
+        except (OSError, ValueError, KeyError):
+            # No snapshot yet, or an unreadable one
+            self._final, self._open, self._watermark = EMPTY, EMPTY, 0
+
+    def _refresh(self) -> None:
+        if self.db.fetch_one(MAX_RENTAL_ID)[0] < self._watermark:
+            # Rentals were deleted, e.g. the database was replaced
+            self._final, self._open, self._watermark = EMPTY, EMPTY, 0
+
+        parts = []
+        if len(self._open):
+            ids = json.dumps(self._open.rental_id.tolist())
+            parts.append(self.db.fetch_all(RENTALS_BY_ID, (ids,)))
+        while True:
+            rows = self.db.fetch_all(NEW_RENTALS, (self._watermark, self.CHUNK_SIZE))
+            if not rows:
+                break
+            parts.append(rows)
+            self._watermark = rows[-1][0]
+        if not parts:
+            return
+
+        changed = RentalColumns.concat([RentalColumns.from_rows(p) for p in parts])
+        # An open rental above the old watermark is read twice
+        _, first = np.unique(changed.rental_id, return_index=True)
+        changed = changed.select(first)
+        is_open = np.isin(changed.status, OPEN_STATUSES)
+        final = changed.select(~is_open)
+        self._open = changed.select(is_open)
+
+        os.makedirs(self.path, exist_ok=True)
+        if len(final):
+            self._final = RentalColumns.concat([self._final, final])
+            self._final.save(self.path, "final")
+        self._open.save(self.path, "open")
+        with open(os.path.join(self.path, "snapshot.json"), "w") as file:
+            json.dump(
+                {"watermark": self._watermark, "final_rows": len(self._final)}, file
+            )
@@ -1,11 +1,15 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Iterable, Iterator, List, NamedTuple, Optional
 
 from db.database import Database
+from db.rows import columns
+from db.statements import statement, variant
+from repository.availability import RESERVING_STATUSES
+from repository.vehicles import VehiclesRepository
 
 
-@dataclass
+@dataclass(slots=True)
 class Rentals:
     rental_id: Optional[int] = None
     vehicle_id: Optional[int] = None
@@ -21,6 +25,139 @@ class Rentals:
     created_at: Optional[datetime] = None
 
 
+class RentalDetails(NamedTuple):
+    """A rental with its vehicle and customer names, as listed."""
+
+    rental_id: int
+    make: str
+    model: str
+    customer: str  # full name
+    start_date: str
+    expected_return_date: str
+    actual_return_date: Optional[str]
+    initial_mileage: Optional[int]
+    return_mileage: Optional[int]
+    rental_status: str
+    total_cost: Optional[float]
+
+
+class RentalExport(NamedTuple):
+    """A rental with its vehicle and customer, as exported."""
+
+    rental_id: int
+    start_date: str
+    expected_return_date: str
+    actual_return_date: Optional[str]
+    rental_status: str
+    total_cost: Optional[float]
+    initial_mileage: Optional[int]
+    return_mileage: Optional[int]
+    vehicle_id: int
+    make: str
+    model: str
+    license_plate: str
+    customer_id: int
+    customer: str  # full name
+    email: Optional[str]
+    created_at: str
+
+
+ADD_RENTAL = statement(
+    "rentals.add_rental",
+    """
+    INSERT INTO rentals (
+        vehicle_id, customer_id, staff_id, start_date,
+        expected_return_date, initial_mileage, rental_status, total_cost
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+)
+
+# Reserving rentals must not overlap a reservation of their vehicle in
+# rental_periods, with the minutes computed as its triggers do
+ADD_RENTALS = statement(
+    "rentals.add_rentals",
+    f"""
+    INSERT INTO rentals (
+        vehicle_id, customer_id, staff_id, start_date, expected_return_date,
+        actual_return_date, initial_mileage, return_mileage, rental_status, total_cost
+    )
+    SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10
+    WHERE EXISTS (SELECT 1 FROM vehicles WHERE vehicle_id = ?1)
+      AND EXISTS (SELECT 1 FROM customers WHERE customer_id = ?2)
+      AND NOT (?9 IN {RESERVING_STATUSES} AND EXISTS (
+          SELECT 1 FROM rental_periods
+          WHERE min_vehicle_id <= ?1 AND max_vehicle_id >= ?1
+            AND start_minute < CAST(strftime('%s', ?5) AS INTEGER) / 60
+            AND end_minute > CAST(strftime('%s', ?4) AS INTEGER) / 60
+      ))
+    """,
+)
+
+COMPLETE_RENTAL = statement(
+    "rentals.complete_rental",
+    """
+    UPDATE rentals
+    SET return_mileage = ?,
+        actual_return_date = ?,
+        total_cost = COALESCE(?, total_cost),
+        rental_status = 'completed'
+    WHERE rental_id = ?
+    """,
+)
+
+UPDATE_STATUS = statement(
+    "rentals.update_status",
+    """
+    UPDATE rentals
+    SET rental_status = ?
+    WHERE rental_id = ?
+    """,
+)
+
+GET_BY_ID = statement(
+    "rentals.get_by_id",
+    f"""
+    SELECT {columns(Rentals)} FROM rentals WHERE rental_id = ?
+    """,
+)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rentals (
+    rental_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    vehicle_id INTEGER,
+    customer_id INTEGER,
+    staff_id INTEGER,
+    start_date DATETIME NOT NULL,
+    expected_return_date DATETIME NOT NULL,
+    actual_return_date DATETIME,
+    initial_mileage INTEGER,
+    return_mileage INTEGER,
+    rental_status TEXT CHECK (
+        rental_status IN (
+            'apply',
+            'active',
+            'reject',
+            'completed',
+            'cancelled'
+        )
+    ) DEFAULT 'apply',
+    total_cost DECIMAL(10, 2),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (vehicle_id) REFERENCES vehicles (vehicle_id),
+    FOREIGN KEY (customer_id) REFERENCES customers (customer_id),
+    FOREIGN KEY (staff_id) REFERENCES staff (staff_id)
+);
+
+-- Secondary indexes on hot lookup columns
+CREATE INDEX IF NOT EXISTS idx_rentals_customer_id ON rentals (customer_id);
+CREATE INDEX IF NOT EXISTS idx_rentals_vehicle_id ON rentals (vehicle_id);
+CREATE INDEX IF NOT EXISTS idx_rentals_rental_status ON rentals (rental_status);
+CREATE INDEX IF NOT EXISTS idx_rentals_start_date ON rentals (start_date);
+"""
+
+
 class RentalsRepository:
     """Database operations for rentals table"""
 
@@ -28,39 +165,21 @@ class RentalsRepository:
         self.db = Database()
 
     def create_table(self):
-        query = """
-        CREATE TABLE IF NOT EXISTS rentals (
-            rental_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            vehicle_id INTEGER,
-            customer_id INTEGER,
-            staff_id INTEGER,
-            start_date DATETIME NOT NULL,
-            expected_return_date DATETIME NOT NULL,
-            actual_return_date DATETIME,
-            initial_mileage INTEGER,
-            return_mileage INTEGER,
-            rental_status TEXT CHECK (
-                rental_status IN (
-                    'apply',
-                    'active',
-                    'reject',
-                    'completed',
-                    'cancelled'
-                )
-            ) DEFAULT 'apply',
-            total_cost DECIMAL(10, 2),
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (vehicle_id) REFERENCES vehicles (vehicle_id),
-            FOREIGN KEY (customer_id) REFERENCES customers (customer_id),
-            FOREIGN KEY (staff_id) REFERENCES staff (staff_id)
-        );
-        """
-        self.db.execute(query)
+        self.db.execute_script(SCHEMA)
 
     def get_rental_details(
-        self, status: str = "", customer_id: int = 0
-    ) -> List[Tuple]:
-        """Retrieves rentals from the database."""
+        self,
+        status: str = "",
+        customer_id: int = 0,
+        before_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        stream: bool = False,
+    ) -> Iterable[RentalDetails]:
+        """
+        Retrieves rentals from the database, newest first.
+        Pass the last rental_id of a page as before_id to get the next page.
+        With stream, rows are read from the cursor as they are iterated.
+        """
         query = """
         SELECT r.rental_id, v.make, v.model, c.full_name,
                r.start_date, r.expected_return_date, r.actual_return_date,
@@ -68,32 +187,73 @@ class RentalsRepository:
         FROM rentals r
         JOIN vehicles v ON r.vehicle_id = v.vehicle_id
         JOIN customers c ON r.customer_id = c.customer_id
-        WHERE r.rental_status LIKE ?
         """
+        # Compare the indexed columns directly so the filters can use
+        # idx_rentals_rental_status and idx_rentals_customer_id.
+        conditions, params = [], []
+        if status:
+            conditions.append("r.rental_status = ?")
+            params.append(status)
         if customer_id != 0:
-            query += " AND c.customer_id = ? ORDER BY r.rental_id DESC"
-            return self.db.fetch_all(
-                query,
-                (
-                    f"%{status}%",
-                    customer_id,
-                ),
-            )
-        else:
-            query += " ORDER BY r.rental_id DESC "
-            return self.db.fetch_all(query, (f"%{status}%",))
+            conditions.append("r.customer_id = ?")
+            params.append(customer_id)
+        if before_id is not None:
+            conditions.append("r.rental_id < ?")
+            params.append(before_id)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY r.rental_id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        name = variant(
+            "rentals.get_rental_details",
+            status=status,
+            customer_id=customer_id,
+            before_id=before_id is not None,
+            limit=limit is not None,
+        )
+        fetch = self.db.iter_query if stream else self.db.fetch_all
+        return fetch(statement(name, query), tuple(params), row=RentalDetails)
 
-    def add_rental(self, rental: Rentals) -> None:
-        """Creates a new rental record."""
+    def export_rentals(
+        self, start: Optional[str] = None, end: Optional[str] = None
+    ) -> Iterator[RentalExport]:
+        """
+        Reads rentals with their vehicle and customer from the cursor as they
+        are iterated, in order of start date. start and end are ISO dates;
+        rentals that start from start and before end are included.
+        """
         query = """
-        INSERT INTO rentals (
-            vehicle_id, customer_id, staff_id, start_date,
-            expected_return_date, initial_mileage, rental_status, total_cost
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        SELECT r.rental_id, r.start_date, r.expected_return_date,
+               r.actual_return_date, r.rental_status, r.total_cost,
+               r.initial_mileage, r.return_mileage,
+               v.vehicle_id, v.make, v.model, v.license_plate,
+               c.customer_id, c.full_name, c.email, r.created_at
+        FROM rentals r
+        JOIN vehicles v ON r.vehicle_id = v.vehicle_id
+        JOIN customers c ON r.customer_id = c.customer_id
         """
-        self.db.execute(
-            query,
+        # idx_rentals_start_date serves the range and the order
+        conditions, params = [], []
+        if start:
+            conditions.append("r.start_date >= ?")
+            params.append(start)
+        if end:
+            conditions.append("r.start_date < ?")
+            params.append(end)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY r.start_date, r.rental_id"
+        name = variant("rentals.export_rentals", start=start, end=end)
+        return self.db.iter_query(
+            statement(name, query), tuple(params), row=RentalExport, raise_errors=True
+        )
+
+    def add_rental(self, rental: Rentals) -> int:
+        """Creates a new rental record."""
+        cursor = self.db.execute(
+            ADD_RENTAL,
             (
                 rental.vehicle_id,
                 rental.customer_id,
@@ -105,29 +265,66 @@ class RentalsRepository:
                 rental.total_cost,
             ),
         )
+        return cursor.lastrowid
+
+    def add_rentals(
+        self, rentals: List[Rentals], rejected: Optional[List[int]] = None
+    ) -> int:
+        """
+        Adds many rental records, including finished ones, in one
+        transaction. Rentals of unknown vehicles or customers are skipped,
+        and so are bookings and active rentals of a vehicle that is already
+        reserved for an overlapping period. The vehicles of active rentals
+        are marked rented. The positions of skipped rentals are appended to
+        rejected. Returns the number of rentals added.
+        """
+        params = [
+            (
+                rental.vehicle_id,
+                rental.customer_id,
+                rental.staff_id,
+                rental.start_date,
+                rental.expected_return_date,
+                rental.actual_return_date,
+                rental.initial_mileage,
+                rental.return_mileage,
+                rental.rental_status,
+                rental.total_cost,
+            )
+            for rental in rentals
+        ]
+        with self.db.transaction():
+            # One execution per rental, so each is checked against the
+            # reservations of the rentals added before it
+            counts = self.db.execute_each(ADD_RENTALS, params)
+            VehiclesRepository().mark_rented(
+                rental.vehicle_id
+                for rental, count in zip(rentals, counts, strict=True)
+                if count and rental.rental_status == "active"
+            )
+        if rejected is not None:
+            rejected.extend(index for index, count in enumerate(counts) if not count)
+        return sum(counts)
 
     def complete_rental(
-        self, rental_id: int, return_mileage: int, actual_return_date: datetime
+        self,
+        rental_id: int,
+        return_mileage: int,
+        actual_return_date: datetime,
+        total_cost: Optional[float] = None,
     ) -> None:
-        """Completes a rental by updating return information."""
-        query = """
-        UPDATE rentals
-        SET return_mileage = ?,
-            actual_return_date = ?,
-            rental_status = 'completed'
-        WHERE rental_id = ?
         """
-        self.db.execute(query, (return_mileage, actual_return_date, rental_id))
+        Completes a rental by updating return information, and the total
+        cost if given.
+        """
+        self.db.execute(
+            COMPLETE_RENTAL, (return_mileage, actual_return_date, total_cost, rental_id)
+        )
 
     def update_status(self, rental_id: int, status: str) -> None:
         """Update rental status."""
-        query = """
-        UPDATE rentals
-        SET rental_status = ?
-        WHERE rental_id = ?
-        """
         self.db.execute(
-            query,
+            UPDATE_STATUS,
             (
                 status,
                 rental_id,
@@ -136,12 +333,4 @@ class RentalsRepository:
 
     def get_by_id(self, rental_id: int) -> Optional[Rentals]:
         """Retrieves a rental record by ID."""
-        query = """
-        SELECT * FROM rentals WHERE rental_id = ?
-        """
-        result = self.db.fetch_one(query, (rental_id,))
-
-        if result is None:
-            return None
-        else:
-            return Rentals(*result)
+        return self.db.fetch_one(GET_BY_ID, (rental_id,), row=Rentals)
@@ -0,0 +1,339 @@
+from datetime import date, timedelta
+from typing import List, Tuple
+
+from db.database import Database
+from db.statements import statement
+
+# Rentals in these states earn their total cost and occupy their vehicle.
+EARNING_STATUSES = "('active', 'completed')"
+
+
+def cents(row: str) -> str:
+    return f"CAST(ROUND(COALESCE({row}.total_cost, 0) * 100) AS INTEGER)"
+
+
+# Rentals are spread over at most this many days, from the day they start
+MAX_DAYS = 3660
+
+
+def minute(expr: str) -> str:
+    """Whole minutes since the julian day epoch of a date or timestamp."""
+    return f"CAST(ROUND(julianday({expr}) * 1440) AS INTEGER)"
+
+
+def start_minute(row: str) -> str:
+    return minute(f"{row}.start_date")
+
+
+def end_minute(row: str) -> str:
+    """The return, or the expected return, capped at MAX_DAYS days."""
+    end = f"COALESCE({row}.actual_return_date, {row}.expected_return_date)"
+    cap = minute(f"date({row}.start_date, '+{MAX_DAYS} days')")
+    return f"MIN({minute(end)}, {cap})"
+
+
+def last_day(row: str) -> str:
+    """Days from the start day to the last day the rental covers, at least 0."""
+    first = minute(f"date({row}.start_date)")
+    return f"MAX(({end_minute(row)} - {first} - 1) / 1440, 0)"
+
+
+def rented_minutes(row: str, first: str, after: str) -> str:
+    """Minutes of the rental from the minute first until the minute after."""
+    return (
+        f"MAX(MIN({end_minute(row)}, {after}) - MAX({start_minute(row)}, {first}), 0)"
+    )
+
+
+def day_minutes(row: str, day: str) -> str:
+    return rented_minutes(row, minute(day), f"{minute(day)} + 1440")
+
+
+def month_minutes(row: str, month: str) -> str:
+    first = f"{month} || '-01'"
+    return rented_minutes(row, minute(first), minute(f"date({first}, '+1 month')"))
+
+
+def day_rows(row: str, source: str = "rental_report_days") -> str:
+    """
+    A row for every day the rental in row (NEW, OLD or a rentals alias)
+    covers, if it earns: the rental and its revenue count for the day it
+    starts, its minutes for every day. source joins rental_report_days.
+    """
+    day = f"date({row}.start_date, '+' || n || ' days')"
+    return f"""
+        SELECT {day} AS day, {row}.vehicle_id AS vehicle_id, n = 0 AS rentals,
+               CASE WHEN n = 0 THEN {cents(row)} ELSE 0 END AS revenue_cents,
+               {day_minutes(row, day)} AS rented_minutes
+        FROM {source}
+        WHERE n <= {last_day(row)} AND {row}.rental_status IN {EARNING_STATUSES}
+    """
+
+
+def month_rows(row: str) -> str:
+    """
+    A row for every month the rental in row covers, if it earns. The
+    minutes of a month are the sum of its day_rows(), computed at once.
+    """
+    end_day = f"date({row}.start_date, '+' || {last_day(row)} || ' days')"
+    last_month = (
+        f"(strftime('%Y', {end_day}) * 12 + strftime('%m', {end_day}))"
+        f" - (strftime('%Y', {row}.start_date) * 12 + strftime('%m', {row}.start_date))"
+    )
+    month = (
+        f"strftime('%Y-%m', {row}.start_date, 'start of month', '+' || n || ' months')"
+    )
+    return f"""
+        SELECT {month} AS month, {row}.vehicle_id AS vehicle_id, n = 0 AS rentals,
+               CASE WHEN n = 0 THEN {cents(row)} ELSE 0 END AS revenue_cents,
+               {month_minutes(row, month)} AS rented_minutes
+        FROM rental_report_days
+        WHERE n <= {last_month} AND {row}.rental_status IN {EARNING_STATUSES}
+    """
+
+
+def add_summary(row: str) -> str:
+    """Adds the rental in row (NEW or OLD) to the summary tables."""
+    return f"""
+        INSERT INTO rental_daily_summary
+        SELECT * FROM ({day_rows(row)}) WHERE true
+        ON CONFLICT (day, vehicle_id) DO UPDATE SET
+            rentals = rentals + excluded.rentals,
+            revenue_cents = revenue_cents + excluded.revenue_cents,
+            rented_minutes = rented_minutes + excluded.rented_minutes;
+        INSERT INTO rental_monthly_summary
+        SELECT * FROM ({month_rows(row)}) WHERE true
+        ON CONFLICT (month, vehicle_id) DO UPDATE SET
+            rentals = rentals + excluded.rentals,
+            revenue_cents = revenue_cents + excluded.revenue_cents,
+            rented_minutes = rented_minutes + excluded.rented_minutes;
+        INSERT INTO rental_status_summary (rental_status, rentals)
+        VALUES ({row}.rental_status, 1)
+        ON CONFLICT (rental_status) DO UPDATE SET rentals = rentals + 1;
+        """
+
+
+def remove_summary(row: str) -> str:
+    """Removes the rental in row (NEW or OLD) from the summary tables."""
+    start_day = f"date({row}.start_date)"
+    end_day = f"date({row}.start_date, '+' || {last_day(row)} || ' days')"
+    start_month = f"strftime('%Y-%m', {row}.start_date)"
+    return f"""
+        UPDATE rental_daily_summary
+        SET rentals = rentals - (day = {start_day}),
+            revenue_cents = revenue_cents
+                - CASE WHEN day = {start_day} THEN {cents(row)} ELSE 0 END,
+            rented_minutes = rented_minutes - {day_minutes(row, "day")}
+        WHERE vehicle_id = {row}.vehicle_id
+          AND day BETWEEN {start_day} AND {end_day}
+          AND {row}.rental_status IN {EARNING_STATUSES};
+        UPDATE rental_monthly_summary
+        SET rentals = rentals - (month = {start_month}),
+            revenue_cents = revenue_cents
+                - CASE WHEN month = {start_month} THEN {cents(row)} ELSE 0 END,
+            rented_minutes = rented_minutes - {month_minutes(row, "month")}
+        WHERE vehicle_id = {row}.vehicle_id
+          AND month BETWEEN {start_month} AND strftime('%Y-%m', {end_day})
+          AND {row}.rental_status IN {EARNING_STATUSES};
+        UPDATE rental_status_summary SET rentals = rentals - 1
+        WHERE rental_status = {row}.rental_status;
+        """
+
+
+def split_period(start: date, end: date) -> Tuple[str, ...]:
+    """
+    Splits start to end into the days before the first whole month, the
+    whole months and the days after the last whole month, as the bounds
+    of three BETWEEN ranges. Empty parts get empty ranges.
+    """
+    first_month = start.replace(day=1)
+    if start.day != 1:
+        first_month = (first_month + timedelta(days=32)).replace(day=1)
+    after_months = (end + timedelta(days=1)).replace(day=1)
+    if first_month >= after_months:
+        return (start.isoformat(), end.isoformat(), "", "", "", "")
+    return (
+        start.isoformat(),
+        (first_month - timedelta(days=1)).isoformat(),
+        first_month.strftime("%Y-%m"),
+        (after_months - timedelta(days=1)).strftime("%Y-%m"),
+        after_months.isoformat(),
+        end.isoformat(),
+    )
+
+
+# Summary rows of the period split by split_period(), parameters ?1 to ?6
+PERIOD_ROWS = """
+    SELECT vehicle_id, rentals, revenue_cents, rented_minutes
+    FROM rental_daily_summary WHERE day BETWEEN ?1 AND ?2
+    UNION ALL
+    SELECT vehicle_id, rentals, revenue_cents, rented_minutes
+    FROM rental_monthly_summary WHERE month BETWEEN ?3 AND ?4
+    UNION ALL
+    SELECT vehicle_id, rentals, revenue_cents, rented_minutes
+    FROM rental_daily_summary WHERE day BETWEEN ?5 AND ?6
+"""
+
+
+REVENUE_BY_VEHICLE = statement(
+    "reports.revenue_by_vehicle",
+    f"""
+    SELECT v.vehicle_id, v.make, v.model, v.license_plate,
+           SUM(s.rentals), SUM(s.revenue_cents) / 100.0
+    FROM ({PERIOD_ROWS}) s
+    JOIN vehicles v ON v.vehicle_id = s.vehicle_id
+    GROUP BY s.vehicle_id
+    HAVING SUM(s.rentals) > 0
+    ORDER BY SUM(s.revenue_cents) DESC, s.vehicle_id
+    """,
+)
+
+UTILIZATION_BY_MAKE = statement(
+    "reports.utilization_by_make",
+    f"""
+    SELECT v.make, COUNT(*), COALESCE(SUM(s.rentals), 0),
+           COALESCE(SUM(s.rented_minutes), 0) / (COUNT(*) * ?7 * 1440.0)
+    FROM vehicles v
+    LEFT JOIN (
+        SELECT vehicle_id, SUM(rentals) AS rentals, SUM(rented_minutes) AS rented_minutes
+        FROM ({PERIOD_ROWS})
+        GROUP BY vehicle_id
+    ) s ON s.vehicle_id = v.vehicle_id
+    GROUP BY v.make
+    ORDER BY 4 DESC, v.make
+    """,
+)
+
+STATUS_COUNTS = statement(
+    "reports.status_counts",
+    """
+    SELECT rental_status, rentals FROM rental_status_summary
+    WHERE rentals > 0
+    ORDER BY rental_status
+    """,
+)
+
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS rental_daily_summary (
+    day TEXT NOT NULL,
+    vehicle_id INTEGER NOT NULL,
+    rentals INTEGER NOT NULL,
+    revenue_cents INTEGER NOT NULL,
+    rented_minutes INTEGER NOT NULL,
+    PRIMARY KEY (day, vehicle_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rental_monthly_summary (
+    month TEXT NOT NULL,
+    vehicle_id INTEGER NOT NULL,
+    rentals INTEGER NOT NULL,
+    revenue_cents INTEGER NOT NULL,
+    rented_minutes INTEGER NOT NULL,
+    PRIMARY KEY (month, vehicle_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rental_status_summary (
+    rental_status TEXT PRIMARY KEY,
+    rentals INTEGER NOT NULL
+);
+-- Day offsets 0 to MAX_DAYS - 1, to spread a rental over the days it covers
+CREATE TABLE IF NOT EXISTS rental_report_days (n INTEGER PRIMARY KEY);
+INSERT OR IGNORE INTO rental_report_days
+WITH RECURSIVE days(n) AS (
+    SELECT 0 UNION ALL SELECT n + 1 FROM days WHERE n < {MAX_DAYS - 1}
+)
+SELECT n FROM days;
+
+CREATE TRIGGER IF NOT EXISTS rental_summary_insert
+AFTER INSERT ON rentals
+BEGIN
+    {add_summary("NEW")}
+END;
+CREATE TRIGGER IF NOT EXISTS rental_summary_update
+AFTER UPDATE OF vehicle_id, start_date, expected_return_date,
+    actual_return_date, rental_status, total_cost ON rentals
+BEGIN
+    {remove_summary("OLD")}
+    {add_summary("NEW")}
+END;
+CREATE TRIGGER IF NOT EXISTS rental_summary_delete
+AFTER DELETE ON rentals
+BEGIN
+    {remove_summary("OLD")}
+END;
+"""
+
+# Summarizes the rentals made before the summary tables existed
+BACKFILL = f"""
+DELETE FROM rental_daily_summary;
+INSERT INTO rental_daily_summary
+SELECT day, vehicle_id, SUM(rentals), SUM(revenue_cents), SUM(rented_minutes)
+FROM ({day_rows("r", "rentals r, rental_report_days")})
+GROUP BY day, vehicle_id;
+DELETE FROM rental_monthly_summary;
+INSERT INTO rental_monthly_summary
+SELECT strftime('%Y-%m', day), vehicle_id, SUM(rentals), SUM(revenue_cents),
+       SUM(rented_minutes)
+FROM rental_daily_summary
+GROUP BY 1, 2;
+DELETE FROM rental_status_summary;
+INSERT INTO rental_status_summary
+SELECT rental_status, COUNT(*) FROM rentals GROUP BY rental_status;
+"""
+
+# Replaces the triggers that counted all minutes of a rental for the day it
+# starts, and summarizes the rentals again
+RESUMMARIZE = (
+    """
+DROP TRIGGER IF EXISTS rental_summary_insert;
+DROP TRIGGER IF EXISTS rental_summary_update;
+DROP TRIGGER IF EXISTS rental_summary_delete;
+"""
+    + SCHEMA
+    + BACKFILL
+)
+
+
+class ReportsRepository:
+    """
+    Summary tables for reports.
+
+    ``rental_daily_summary`` and ``rental_monthly_summary`` hold the rentals
+    and revenue of every vehicle per day and month its earning rentals
+    start, and the minutes it was rented on each day and month. Monthly
+    rows are the sums of their days. ``rental_status_summary`` holds the
+    number of rentals in each state. Triggers on ``rentals`` update them in the
+    transaction of every write, so reports never scan ``rentals``. Reports
+    read whole months of their period from the monthly table.
+    """
+
+    def __init__(self):
+        self.db = Database()
+
+    def create_table(self):
+        exists = self.db.fetch_one(
+            "SELECT 1 FROM sqlite_master WHERE name = 'rental_daily_summary'"
+        )
+        self.db.execute_script(SCHEMA)
+        if exists is None:
+            self.db.execute_script(BACKFILL)
+
+    def revenue_by_vehicle(self, start: date, end: date) -> List[Tuple]:
+        """
+        Retrieves the rentals and revenue of every vehicle with rentals
+        starting from start to end, both included, highest revenue first.
+        """
+        return self.db.fetch_all(REVENUE_BY_VEHICLE, split_period(start, end))
+
+    def utilization_by_make(self, start: date, end: date) -> List[Tuple]:
+        """
+        Retrieves the vehicles, rentals and utilization of every make from
+        start to end, both included. Utilization is the share of the time
+        its vehicles were rented, counting only the minutes of each rental
+        that fall into the period.
+        """
+        days = (end - start).days + 1
+        return self.db.fetch_all(UTILIZATION_BY_MAKE, (*split_period(start, end), days))
+
+    def status_counts(self) -> List[Tuple]:
+        """Retrieves the number of rentals in each state."""
+        return self.db.fetch_all(STATUS_COUNTS)
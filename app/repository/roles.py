@@ -1,41 +1,54 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
 from db.database import Database
+from db.rows import columns
+from db.statements import statement
 
 
-@dataclass
+@dataclass(slots=True)
 class Roles:
     role_id: Optional[int] = None
     role_name: Optional[str] = None
     created_at: Optional[datetime] = None
 
 
+GET_ROLE = statement(
+    "roles.get_role",
+    f"""
+    SELECT {columns(Roles)} FROM roles WHERE role_id = ?
+    """,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS roles (
+    role_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    role_name TEXT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+INSERT OR IGNORE INTO roles VALUES(1,'staff','2024-12-31 09:45:50');
+INSERT OR IGNORE INTO roles VALUES(2,'customer','2024-12-31 09:45:50');
+"""
+
+
 class RoleRepository:
+    # Roles loaded by load_roles(), by role_id
+    _roles: Dict[int, Roles] = {}
+
     def __init__(self):
         self.db = Database()
 
     def create_table(self):
-        query = """
-        CREATE TABLE IF NOT EXISTS roles (
-            role_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            role_name TEXT NOT NULL,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-        """
-        self.db.execute(query)
-
-        q1 = "INSERT OR IGNORE INTO roles VALUES(1,'staff','2024-12-31 09:45:50')"
-        self.db.execute(q1)
-        q2 = "INSERT OR IGNORE INTO roles VALUES(2,'customer','2024-12-31 09:45:50')"
-        self.db.execute(q2)
+        self.db.execute_script(SCHEMA)
+
+    def load_roles(self) -> None:
+        """Loads the roles table, which never changes at runtime, into memory."""
+        roles = self.db.fetch_all(f"SELECT {columns(Roles)} FROM roles", row=Roles)
+        RoleRepository._roles = {role.role_id: role for role in roles}
 
     def get_role(self, role_id) -> Optional[Roles]:
-        query = """
-        SELECT * FROM roles WHERE role_id = ?
-        """
-        result = self.db.fetch_one(query, (role_id,))
-        if result is None:
-            return None
-        return Roles(*result)
+        role = RoleRepository._roles.get(role_id)
+        if role is not None:
+            return role
+        return self.db.fetch_one(GET_ROLE, (role_id,), row=Roles)
@@ -0,0 +1,52 @@
+from typing import Dict, List, Optional
+
+from db.database import Database
+from db.migrations import migrate
+from repository import (
+    availability,
+    customers,
+    rentals,
+    reports,
+    roles,
+    sessions,
+    staff,
+    users,
+    vehicles,
+)
+
+# Increase with every schema change and add the script that upgrades the
+# previous version to UPGRADES, e.g. UPGRADES[2] = "ALTER TABLE ...".
+# SCHEMA always creates the latest version.
+SCHEMA_VERSION = 3
+
+UPGRADES: Dict[int, str] = {
+    # Rental exports read a range of start dates
+    2: "CREATE INDEX IF NOT EXISTS idx_rentals_start_date ON rentals (start_date);",
+    # Utilization spreads the minutes of a rental over the days it covers
+    3: reports.RESUMMARIZE,
+}
+
+# The tables of every repository, then their derived tables filled from the
+# existing rows, for databases made before schema versions were kept
+SCHEMA = "".join(
+    (
+        roles.SCHEMA,
+        users.SCHEMA,
+        staff.SCHEMA,
+        customers.SCHEMA,
+        vehicles.SCHEMA,
+        rentals.SCHEMA,
+        sessions.SCHEMA,
+        availability.SCHEMA,
+        reports.SCHEMA,
+        customers.BACKFILL,
+        vehicles.BACKFILL,
+        availability.BACKFILL,
+        reports.BACKFILL,
+    )
+)
+
+
+def migrate_schema(db: Optional[Database] = None) -> List[int]:
+    """Creates or upgrades the application schema; see db.migrations.migrate."""
+    return migrate(db or Database(), SCHEMA, SCHEMA_VERSION, UPGRADES)
@@ -0,0 +1,41 @@
+from db.database import Database
+from db.statements import statement
+
+REVOKE = statement(
+    "sessions.revoke", "INSERT OR REPLACE INTO session_revocations VALUES(?, ?)"
+)
+
+IS_REVOKED = statement(
+    "sessions.is_revoked",
+    "SELECT 1 FROM session_revocations WHERE user_id = ? AND revoked_at >= ?",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS session_revocations (
+    user_id INTEGER PRIMARY KEY,
+    revoked_at REAL NOT NULL
+);
+"""
+
+
+class SessionsRepository:
+    """
+    Revoked sessions.
+
+    A session token is valid only if it was issued after the last revocation
+    of its user, so one row per user invalidates every outstanding token.
+    """
+
+    def __init__(self):
+        self.db = Database()
+
+    def create_table(self):
+        self.db.execute_script(SCHEMA)
+
+    def revoke(self, user_id: int, revoked_at: float) -> None:
+        """Invalidates the sessions of a user issued up to revoked_at (epoch seconds)."""
+        self.db.execute(REVOKE, (user_id, revoked_at))
+
+    def is_revoked(self, user_id: int, issued_at: float) -> bool:
+        """Checks if a session of the user issued at issued_at was revoked."""
+        return self.db.fetch_one(IS_REVOKED, (user_id, issued_at)) is not None
@@ -1,11 +1,14 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from db.database import Database
+from db.rows import columns, named_row
+from db.statements import statement
+from util.cache import LRUCache
 
 
-@dataclass
+@dataclass(slots=True)
 class Staff:
     staff_id: Optional[int] = None
     user_id: Optional[int] = None
@@ -14,6 +17,79 @@ class Staff:
     created_at: Optional[datetime] = None
 
 
+# Staff as listed, with the same columns
+StaffRow = named_row(Staff)
+
+# Staff rows by user id, e.g. the logged-in staff member of every /rental add
+staff_cache = LRUCache("staff.get_by_user_id", maxsize=256, ttl=300)
+
+
+GET_STAFFS = statement(
+    "staff.get_staffs",
+    f"""
+    SELECT {columns(Staff)} FROM staff
+    WHERE (full_name LIKE ? OR email LIKE ?) AND staff_id > ?
+    ORDER BY staff_id
+    LIMIT ?
+    """,
+)
+
+ADD_STAFF = statement(
+    "staff.add_staff",
+    """
+    INSERT INTO staff(user_id, full_name, email) VALUES(?, ?, ?)
+    """,
+)
+
+ADD_STAFFS = statement(
+    "staff.add_staffs",
+    """
+    INSERT OR IGNORE INTO staff(user_id, full_name, email) VALUES(?, ?, ?)
+    """,
+)
+
+UPDATE_STAFF_CURRENT = statement(
+    "staff.update_staff.current",
+    f"SELECT {columns(Staff)} FROM staff WHERE staff_id = ?",
+)
+
+UPDATE_STAFF = statement(
+    "staff.update_staff",
+    """
+    UPDATE staff
+    SET full_name = ?,
+        email = ?
+    WHERE staff_id = ?
+    """,
+)
+
+DELETE_STAFF = statement("staff.delete_staff", "DELETE FROM staff WHERE staff_id = ?")
+
+GET_BY_USER_ID = statement(
+    "staff.get_by_user_id", f"SELECT {columns(Staff)} FROM staff WHERE user_id = ?"
+)
+
+GET_BY_STAFF_ID = statement(
+    "staff.get_by_staff_id", f"SELECT {columns(Staff)} FROM staff WHERE staff_id = ?"
+)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS staff (
+    staff_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    full_name TEXT NOT NULL,
+    email TEXT UNIQUE,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users (user_id)
+);
+INSERT OR IGNORE INTO staff VALUES(1, 1, 'admin', 'admin@example.com', '2025-01-27 17:27:37.235554');
+
+-- Secondary indexes on hot lookup columns
+CREATE INDEX IF NOT EXISTS idx_staff_user_id ON staff (user_id);
+"""
+
+
 class StaffRepository:
     """Database operations for staff table"""
 
@@ -21,76 +97,84 @@ class StaffRepository:
         self.db = Database()
 
     def create_table(self):
-        query = """
-        CREATE TABLE IF NOT EXISTS staff (
-            staff_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            full_name TEXT NOT NULL,
-            email TEXT UNIQUE,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (user_id)
-        );
+        self.db.execute_script(SCHEMA)
+
+    def get_staffs(
+        self,
+        keyword="",
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        stream: bool = False,
+    ):
         """
-        self.db.execute(query)
-
-        q = "INSERT OR IGNORE INTO staff VALUES(1, 1, 'admin', 'admin@example.com', '2025-01-27 17:27:37.235554')"
-        self.db.execute(q)
-
-    def get_staffs(self, keyword=""):
-        """Retrieve staffs from the database"""
-        query = """
-        SELECT staff_id, user_id, full_name, email, created_at FROM staff WHERE full_name LIKE ? OR email LIKE ?
+        Retrieve staffs from the database
+        Pass the last staff_id of a page as after_id to get the next page.
+        With stream, rows are read from the cursor as they are iterated.
         """
-        return self.db.fetch_all(query, (f"%{keyword}%", f"%{keyword}%"))
+        fetch = self.db.iter_query if stream else self.db.fetch_all
+        return fetch(
+            GET_STAFFS,
+            (
+                f"%{keyword}%",
+                f"%{keyword}%",
+                after_id or 0,
+                -1 if limit is None else limit,
+            ),
+            row=StaffRow,
+        )
 
-    def add_staff(self, staff: Staff):
+    def add_staff(self, staff: Staff) -> int:
         """Adds a new staff to the database"""
-        query = """
-        INSERT INTO staff(user_id, full_name, email) VALUES(?, ?, ?)
-        """
-        self.db.execute(
-            query,
+        cursor = self.db.execute(
+            ADD_STAFF,
             (staff.user_id, staff.full_name, staff.email),
         )
+        return cursor.lastrowid
+
+    def add_staffs(self, staffs: List[Staff]) -> int:
+        """
+        Adds many staff with one statement, skipping emails that already
+        exist. Returns the number of staff added.
+        """
+        cursor = self.db.execute_many(
+            ADD_STAFFS,
+            [(staff.user_id, staff.full_name, staff.email) for staff in staffs],
+        )
+        return cursor.rowcount
 
     def update_staff(self, staff: Staff):
         """Updates an existing staff in the database"""
-        query = "SELECT * FROM staff WHERE staff_id = ?"
-        current_staff = self.db.fetch_one(query, (staff.staff_id,))
+        current = self.db.fetch_one(UPDATE_STAFF_CURRENT, (staff.staff_id,), row=Staff)
 
-        if not current_staff:
+        if not current:
             raise ValueError(f"Staff with ID {staff.staff_id} not found")
 
-        query = """
-        UPDATE staff
-        SET full_name = ?,
-            email = ?
-        WHERE staff_id = ?
-        """
         self.db.execute(
-            query,
+            UPDATE_STAFF,
             (
-                staff.full_name or current_staff[1],
-                staff.email or current_staff[2],
+                staff.full_name or current.full_name,
+                staff.email or current.email,
                 staff.staff_id,
             ),
         )
+        user_id = current.user_id
+        self.db.after_transaction(lambda: staff_cache.invalidate(user_id))
 
     def delete_staff(self, staff_id) -> None:
         """Deletes a staff from the database"""
-        query = "DELETE FROM staff WHERE staff_id = ?"
-        self.db.execute(query, (staff_id,))
+        self.db.execute(DELETE_STAFF, (staff_id,))
+        self.db.after_transaction(staff_cache.clear)
 
     def get_by_user_id(self, user_id) -> Optional[Staff]:
-        query = "SELECT * from STAFF WHERE user_id = ?"
-        result = self.db.fetch_one(query, (user_id,))
+        # The cache keeps immutable rows; callers get their own record
+        result = staff_cache.get_or_load(
+            user_id,
+            lambda: self.db.fetch_one(GET_BY_USER_ID, (user_id,), row=StaffRow),
+            bypass=self.db.in_transaction(),
+        )
         if result is None:
             return None
         return Staff(*result)
 
     def get_by_staff_id(self, staff_id) -> Optional[Staff]:
-        query = "SELECT * from STAFF WHERE staff_id = ?"
-        result = self.db.fetch_one(query, (staff_id,))
-        if result is None:
-            return None
-        return Staff(*result)
+        return self.db.fetch_one(GET_BY_STAFF_ID, (staff_id,), row=Staff)
@@ -1,12 +1,17 @@
-from dataclasses import dataclass
+import json
+import time
+from dataclasses import dataclass, replace
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
-import bcrypt
 from db.database import Database
+from db.rows import columns
+from db.statements import statement
+from repository.sessions import SessionsRepository
+from util.passwords import hash_password, hash_passwords
 
 
-@dataclass
+@dataclass(slots=True)
 class Users:
     user_id: Optional[int] = None
     username: Optional[str] = None
@@ -15,63 +20,174 @@ class Users:
     last_login: Optional[datetime] = None
 
 
+GET_BY_USERNAME = statement(
+    "users.get_by_username", f"SELECT {columns(Users)} FROM users WHERE username = ?"
+)
+
+GET_WITH_ROLE = statement(
+    "users.get_with_role",
+    f"""
+    SELECT {columns(Users, "users")}, roles.role_name FROM users
+    JOIN roles ON roles.role_id = users.role_id
+    WHERE users.username = ?
+    """,
+)
+
+ADD_USER = statement(
+    "users.add_user", "INSERT INTO users(username, password, role_id) VALUES(?, ?, ?)"
+)
+
+PREPARE_USERS = statement(
+    "users.prepare_users",
+    """
+    SELECT username FROM users
+    WHERE username IN (SELECT value FROM json_each(?))
+    """,
+)
+
+ADD_USERS = statement(
+    "users.add_users",
+    "INSERT OR IGNORE INTO users(username, password, role_id) VALUES(?, ?, ?)",
+)
+
+MAX_USER_ID = statement(
+    "users.max_user_id", "SELECT COALESCE(MAX(user_id), 0) FROM users"
+)
+
+USERS_AFTER = statement(
+    "users.users_after", "SELECT username, user_id FROM users WHERE user_id > ?"
+)
+
+DELETE_USERS_WITHOUT_PROFILE = statement(
+    "users.delete_users_without_profile",
+    """
+    DELETE FROM users
+    WHERE user_id >= ?
+      AND user_id NOT IN (SELECT user_id FROM customers WHERE user_id >= ?)
+      AND user_id NOT IN (SELECT user_id FROM staff WHERE user_id >= ?)
+    """,
+)
+
+UPDATE_LAST_LOGIN = statement(
+    "users.update_last_login", "UPDATE users SET last_login = ? WHERE user_id = ?"
+)
+
+GET_BY_USER_ID = statement(
+    "users.get_by_user_id", f"SELECT {columns(Users)} FROM users WHERE user_id = ?"
+)
+
+UPDATE_PASSWORD = statement(
+    "users.update_password", "UPDATE users SET password = ? WHERE user_id = ?"
+)
+
+DELETE_USER = statement("users.delete_user", "DELETE FROM users WHERE user_id = ?")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT UNIQUE NOT NULL,
+    password TEXT NOT NULL,
+    role_id INTEGER,
+    last_login DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (role_id) REFERENCES roles (role_id)
+);
+INSERT OR IGNORE INTO users VALUES(1,'admin','$2b$12$LWdTnqauV6Qxv2wcKl306ehLM0zUCKlvFKJiY5NF7qLySZD6qBxQS',1,'2025-01-27 17:27:37.235554');
+"""
+
+
 class UsersRepository:
     def __init__(self):
         self.db = Database()
+        self.sessions_repo = SessionsRepository()
 
     def create_table(self):
-        query = """
-        CREATE TABLE IF NOT EXISTS users (
-            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            role_id INTEGER,
-            last_login DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (role_id) REFERENCES roles (role_id)
-        );
-        """
-        self.db.execute(query)
-
-        q = "INSERT OR IGNORE INTO users VALUES(1,'admin','$2b$12$LWdTnqauV6Qxv2wcKl306ehLM0zUCKlvFKJiY5NF7qLySZD6qBxQS',1,'2025-01-27 17:27:37.235554')"
-        self.db.execute(q)
+        self.db.execute_script(SCHEMA)
 
     def get_by_username(self, username) -> Optional[Users]:
-        query = "SELECT * FROM users WHERE username = ?"
-        result = self.db.fetch_one(query, (username,))
+        return self.db.fetch_one(GET_BY_USERNAME, (username,), row=Users)
+
+    def get_with_role(self, username) -> Optional[Tuple[Users, str]]:
+        """Retrieves a user and the name of their role with one query."""
+        result = self.db.fetch_one(GET_WITH_ROLE, (username,))
         if result is None:
             return None
-        return Users(*result)
+        return Users(*result[:-1]), result[-1]
 
     def username_exists(self, username):
-        query = "SELECT * FROM users WHERE username = ?"
-        result = self.db.fetch_one(query, (username,))
+        result = self.db.fetch_one(GET_BY_USERNAME, (username,))
         if result is None:
             return True
         return False
 
     def add_user(self, users: Users):
-        password = bcrypt.hashpw(users.password.encode("utf-8"), bcrypt.gensalt())
-        query = "INSERT INTO users(username, password, role_id) VALUES(?, ?, ?)"
-        cursor = self.db.execute(
-            query, (users.username, password.decode("utf-8"), users.role_id)
-        )
+        password = hash_password(users.password)
+        cursor = self.db.execute(ADD_USER, (users.username, password, users.role_id))
         return cursor.lastrowid
 
+    def prepare_users(self, users: List[Users]) -> List[Users]:
+        """
+        Returns the users whose username is not taken yet, with their
+        passwords hashed in a process pool. Hashing is slow, so call this
+        before starting the transaction that adds them.
+        """
+        names = json.dumps([user.username for user in users])
+        taken = {row[0] for row in self.db.fetch_all(PREPARE_USERS, (names,))}
+        new_users = []
+        for user in users:
+            if user.username not in taken:
+                taken.add(user.username)
+                new_users.append(user)
+
+        passwords = hash_passwords([user.password for user in new_users])
+        return [
+            replace(user, password=password)
+            for user, password in zip(new_users, passwords, strict=True)
+        ]
+
+    def add_users(self, users: List[Users]) -> Dict[str, int]:
+        """
+        Adds users returned by prepare_users with one statement, skipping
+        usernames taken in the meantime.
+        Returns the user_id of every added user by username.
+        """
+        with self.db.transaction():
+            last_id = self.db.fetch_one(MAX_USER_ID)[0]
+            self.db.execute_many(
+                ADD_USERS,
+                [(user.username, user.password, user.role_id) for user in users],
+            )
+            rows = self.db.fetch_all(USERS_AFTER, (last_id,))
+        return dict(rows)
+
+    def delete_users_without_profile(self, first_user_id: int) -> int:
+        """
+        Deletes users from first_user_id on that have neither a customer nor
+        a staff profile, e.g. after their profile was rejected as a duplicate.
+        Returns the number of deleted users.
+        """
+        cursor = self.db.execute(DELETE_USERS_WITHOUT_PROFILE, (first_user_id,) * 3)
+        return cursor.rowcount
+
     def update_last_login(self, user_id):
-        query = "UPDATE users SET last_login = ? WHERE user_id = ?"
-        self.db.execute(query, (datetime.now(), user_id))
+        self.db.execute(UPDATE_LAST_LOGIN, (datetime.now(), user_id))
+
+    def update_last_logins(self, logins: Dict[int, datetime]) -> None:
+        """Stores the last login time of many users with one statement."""
+        self.db.execute_many(
+            UPDATE_LAST_LOGIN, [(login, user_id) for user_id, login in logins.items()]
+        )
 
     def get_by_user_id(self, user_id) -> Optional[Users]:
-        query = "SELECT * FROM users WHERE user_id = ?"
-        result = self.db.fetch_one(query, (user_id,))
-        if result is None:
-            return None
-        return Users(*result)
+        return self.db.fetch_one(GET_BY_USER_ID, (user_id,), row=Users)
 
     def update_password(self, user_id, new_password):
-        query = "UPDATE users SET password = ? WHERE user_id = ?"
-        self.db.execute(query, (new_password, user_id))
+        with self.db.transaction():
+            self.db.execute(UPDATE_PASSWORD, (new_password, user_id))
+            # Saved sessions must log in again with the new password
+            self.sessions_repo.revoke(user_id, time.time())
 
     def delete_user(self, user_id):
-        query = "DELETE FROM users WHERE user_id = ?"
-        self.db.execute(query, (user_id,))
+        with self.db.transaction():
+            self.db.execute(DELETE_USER, (user_id,))
+            if user_id is not None:
+                self.sessions_repo.revoke(user_id, time.time())
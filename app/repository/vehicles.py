@@ -1,10 +1,15 @@
+import json
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional
 
 from db.database import Database
+from db.fts import deferred_index, match_expression
+from db.rows import columns, named_row
+from db.statements import statement, variant
+from util.cache import LRUCache
 
 
-@dataclass
+@dataclass(slots=True)
 class Vehicles:
     vehicle_id: Optional[int] = None
     make: str = ""
@@ -17,6 +22,153 @@ class Vehicles:
     status: str = "available"  # available or rented or maintenance
 
 
+# Vehicles as listed, with the same columns
+VehicleRow = named_row(Vehicles)
+
+# Vehicle rows by id, shared by every repository instance
+vehicle_cache = LRUCache("vehicles.get_by_id", maxsize=4096, ttl=60)
+
+
+ADD_VEHICLE = statement(
+    "vehicles.add_vehicle",
+    """
+    INSERT INTO vehicles (make, model, year, license_plate, mileage, daily_rate, description, status)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+)
+
+ADD_VEHICLES = statement(
+    "vehicles.add_vehicles",
+    """
+    INSERT OR IGNORE INTO vehicles (make, model, year, license_plate, mileage, daily_rate, description, status)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+)
+
+UPDATE_VEHICLE_CURRENT = statement(
+    "vehicles.update_vehicle.current",
+    f"SELECT {columns(Vehicles)} FROM vehicles WHERE vehicle_id = ?",
+)
+
+UPDATE_VEHICLE = statement(
+    "vehicles.update_vehicle",
+    """
+    UPDATE vehicles
+    SET make = ?,
+        model = ?,
+        year = ?,
+        license_plate = ?,
+        mileage = ?,
+        daily_rate = ?,
+        description = ?,
+        status = ?
+    WHERE vehicle_id = ?
+    """,
+)
+
+DELETE_VEHICLE = statement(
+    "vehicles.delete_vehicle", "DELETE FROM vehicles WHERE vehicle_id = ?"
+)
+
+UPDATE_STATUS = statement(
+    "vehicles.update_status", "UPDATE vehicles SET status = ? WHERE vehicle_id = ?"
+)
+
+GET_BY_ID = statement(
+    "vehicles.get_by_id",
+    f"""
+    SELECT {columns(Vehicles)}
+    FROM vehicles
+    WHERE vehicle_id = ?
+    """,
+)
+
+EXPORT_VEHICLES = statement(
+    "vehicles.export_vehicles",
+    f"SELECT {columns(Vehicles)} FROM vehicles ORDER BY vehicle_id",
+)
+
+DAILY_RATES = statement(
+    "vehicles.daily_rates",
+    """
+    SELECT vehicle_id, daily_rate FROM vehicles
+    WHERE vehicle_id IN (SELECT value FROM json_each(?))
+    """,
+)
+
+MARK_RENTED = statement(
+    "vehicles.mark_rented",
+    """
+    UPDATE vehicles SET status = 'rented'
+    WHERE status = 'available' AND vehicle_id IN (SELECT value FROM json_each(?))
+    """,
+)
+
+UPDATE_AFTER_RETURN = statement(
+    "vehicles.update_after_return",
+    """
+    UPDATE vehicles
+    SET mileage = ?,
+        status = 'available'
+    WHERE vehicle_id = ?
+    """,
+)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vehicles (
+    vehicle_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    make TEXT NOT NULL,
+    model TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    license_plate TEXT UNIQUE NOT NULL,
+    mileage INTEGER DEFAULT 0,
+    daily_rate DECIMAL(10, 2) NOT NULL,
+    description TEXT,
+    status TEXT CHECK (status IN ('available', 'rented', 'maintenance')) DEFAULT 'available'
+);
+INSERT OR IGNORE INTO vehicles VALUES(1,'Toyota','Camry',2022,'ABC123',15000,45,'Comfortable midsize sedan with excellent fuel economy','available'),
+(2,'Honda','CR-V',2021,'XYZ789',25000,55,'Popular compact SUV with plenty of cargo space','available'),
+(3,'Ford','Mustang',2023,'MUS555',5000,75,'Sporty muscle car with powerful engine','available'),
+(4,'BMW','3 Series',2022,'BMW444',20000,85,'Luxury sedan with premium features','available'),
+(5,'Tesla','Model 3',2023,'TSL789',10000,95,'Electric vehicle with advanced autopilot','available'),
+(6,'Mercedes','C-Class',2021,'MRC123',30000,80,'Elegant luxury sedan requiring scheduled service','available'),
+(7,'Audi','Q5',2022,'AUD456',18000,75,'Premium SUV under routine maintenance','available'),
+(8,'Volkswagen','Golf',2022,'VWG123',12000,40,'Compact hatchback with great handling','available'),
+(9,'Hyundai','Tucson',2023,'HYN789',8100,50,'Modern SUV with latest safety features','available'),
+(10,'Chevrolet','Malibu',2022,'CHV456',22000,45,'Reliable family sedan with good fuel efficiency','available');
+
+CREATE INDEX IF NOT EXISTS idx_vehicles_status ON vehicles (status);
+
+-- Full-text index over the searchable columns, kept in sync by triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS vehicles_fts USING fts5(
+    make, model, description,
+    content='vehicles', content_rowid='vehicle_id', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS vehicles_fts_insert AFTER INSERT ON vehicles
+BEGIN
+    INSERT INTO vehicles_fts(rowid, make, model, description)
+    VALUES (NEW.vehicle_id, NEW.make, NEW.model, NEW.description);
+END;
+CREATE TRIGGER IF NOT EXISTS vehicles_fts_delete AFTER DELETE ON vehicles
+BEGIN
+    INSERT INTO vehicles_fts(vehicles_fts, rowid, make, model, description)
+    VALUES ('delete', OLD.vehicle_id, OLD.make, OLD.model, OLD.description);
+END;
+CREATE TRIGGER IF NOT EXISTS vehicles_fts_update
+AFTER UPDATE OF make, model, description ON vehicles
+BEGIN
+    INSERT INTO vehicles_fts(vehicles_fts, rowid, make, model, description)
+    VALUES ('delete', OLD.vehicle_id, OLD.make, OLD.model, OLD.description);
+    INSERT INTO vehicles_fts(rowid, make, model, description)
+    VALUES (NEW.vehicle_id, NEW.make, NEW.model, NEW.description);
+END;
+"""
+
+# Indexes the vehicles added before the full-text index existed
+BACKFILL = "INSERT INTO vehicles_fts(vehicles_fts) VALUES ('rebuild');"
+
+
 class VehiclesRepository:
     """Database operations for vehicles table"""
 
@@ -24,56 +176,83 @@ class VehiclesRepository:
         self.db = Database()
 
     def create_table(self):
-        query = """
-        CREATE TABLE IF NOT EXISTS vehicles (
-                vehicle_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                make TEXT NOT NULL,
-                model TEXT NOT NULL,
-                year INTEGER NOT NULL,
-                license_plate TEXT UNIQUE NOT NULL,
-                mileage INTEGER DEFAULT 0,
-                daily_rate DECIMAL(10, 2) NOT NULL,
-                description TEXT,
-                status TEXT CHECK (status IN ('available', 'rented', 'maintenance')) DEFAULT 'available'
-        ); 
+        exists = self.db.fetch_one(
+            "SELECT 1 FROM sqlite_master WHERE name = 'vehicles_fts'"
+        )
+        self.db.execute_script(SCHEMA)
+        if exists is None:
+            self.db.execute_script(BACKFILL)
+
+    def get_vehicles(
+        self,
+        search_str: str = "",
+        status: str = "",
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        stream: bool = False,
+    ) -> Iterable[VehicleRow]:
         """
-        self.db.execute(query)
-
-        q1 = """
-            INSERT OR IGNORE INTO vehicles VALUES(1,'Toyota','Camry',2022,'ABC123',15000,45,'Comfortable midsize sedan with excellent fuel economy','available'),
-            (2,'Honda','CR-V',2021,'XYZ789',25000,55,'Popular compact SUV with plenty of cargo space','available'),
-            (3,'Ford','Mustang',2023,'MUS555',5000,75,'Sporty muscle car with powerful engine','available'),
-            (4,'BMW','3 Series',2022,'BMW444',20000,85,'Luxury sedan with premium features','available'),
-            (5,'Tesla','Model 3',2023,'TSL789',10000,95,'Electric vehicle with advanced autopilot','available'),
-            (6,'Mercedes','C-Class',2021,'MRC123',30000,80,'Elegant luxury sedan requiring scheduled service','available'),
-            (7,'Audi','Q5',2022,'AUD456',18000,75,'Premium SUV under routine maintenance','available'),
-            (8,'Volkswagen','Golf',2022,'VWG123',12000,40,'Compact hatchback with great handling','available'),
-            (9,'Hyundai','Tucson',2023,'HYN789',8100,50,'Modern SUV with latest safety features','available'),
-            (10,'Chevrolet','Malibu',2022,'CHV456',22000,45,'Reliable family sedan with good fuel efficiency','available')
+        Retrieves vehicles from the database.
+        Pass the last vehicle_id of a page as after_id to get the next page.
+        With stream, rows are read from the cursor as they are iterated.
         """
-        self.db.execute(q1)
-
-    def get_vehicles(self, search_str: str = "", status: str = "") -> List[Tuple]:
-        """Retrieves vehicles from the database."""
-        query = """
-        SELECT vehicle_id, make, model, year, license_plate, mileage, daily_rate, description, status
+        query = f"""
+        SELECT {columns(Vehicles)}
         FROM vehicles
-        WHERE make LIKE ?
+        WHERE vehicle_id > ?
         """
+        params = [after_id or 0]
+        if search_str:
+            match = match_expression(search_str)
+            if match is None:
+                return []
+            query += """
+            AND vehicle_id IN (SELECT rowid FROM vehicles_fts WHERE vehicles_fts MATCH ?)
+            """
+            params.append(match)
         if status:
             query += " and status = ?"
-            return self.db.fetch_all(query, (f"%{search_str}%", status))
-        else:
-            return self.db.fetch_all(query, (f"%{search_str}%",))
+            params.append(status)
+        query += " ORDER BY vehicle_id LIMIT ?"
+        params.append(-1 if limit is None else limit)
+        name = variant("vehicles.get_vehicles", match=search_str, status=status)
+        fetch = self.db.iter_query if stream else self.db.fetch_all
+        return fetch(statement(name, query), tuple(params), row=VehicleRow)
 
-    def add_vehicle(self, vehicle: Vehicles) -> None:
-        """Adds a new vehicle to the database."""
-        query = """
-        INSERT INTO vehicles (make, model, year, license_plate, mileage, daily_rate, description, status)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    def export_vehicles(self) -> Iterator[VehicleRow]:
+        """Reads every vehicle from the cursor as it is iterated."""
+        return self.db.iter_query(EXPORT_VEHICLES, row=VehicleRow, raise_errors=True)
+
+    def search_vehicles(
+        self, keyword: str, status: str = "", limit: int = 50
+    ) -> List[VehicleRow]:
         """
-        self.db.execute(
-            query,
+        Retrieves the vehicles that best match the keyword.
+        Every word matches the start of a word in the make, model or
+        description, e.g. "toy cam" finds the Toyota Camry.
+        """
+        match = match_expression(keyword)
+        if match is None:
+            return []
+        query = f"""
+        SELECT {columns(Vehicles, "v")}
+        FROM vehicles_fts
+        JOIN vehicles v ON v.vehicle_id = vehicles_fts.rowid
+        WHERE vehicles_fts MATCH ?
+        """
+        params = [match]
+        if status:
+            query += " AND v.status = ?"
+            params.append(status)
+        query += " ORDER BY vehicles_fts.rank LIMIT ?"
+        params.append(limit)
+        name = variant("vehicles.search_vehicles", status=status)
+        return self.db.fetch_all(statement(name, query), tuple(params), row=VehicleRow)
+
+    def add_vehicle(self, vehicle: Vehicles) -> int:
+        """Adds a new vehicle to the database."""
+        cursor = self.db.execute(
+            ADD_VEHICLE,
             (
                 vehicle.make,
                 vehicle.model,
@@ -85,73 +264,104 @@ class VehiclesRepository:
                 vehicle.status,
             ),
         )
+        return cursor.lastrowid
+
+    def add_vehicles(self, vehicles: List[Vehicles]) -> int:
+        """
+        Adds many vehicles with one statement, skipping license plates that
+        already exist. Returns the number of vehicles added.
+        """
+        params = [
+            (
+                vehicle.make,
+                vehicle.model,
+                vehicle.year,
+                vehicle.license_plate,
+                vehicle.mileage,
+                vehicle.daily_rate,
+                vehicle.description,
+                vehicle.status,
+            )
+            for vehicle in vehicles
+        ]
+        with (
+            self.db.transaction(),
+            deferred_index(
+                self.db, "vehicles", "vehicle_id", ("make", "model", "description")
+            ),
+        ):
+            return self.db.execute_many(ADD_VEHICLES, params).rowcount
 
     def update_vehicle(self, vehicle: Vehicles) -> None:
         """Updates an existing vehicle in the database."""
-        query = "SELECT * FROM vehicles WHERE vehicle_id = ?"
-        current_vehicle = self.db.fetch_one(query, (vehicle.vehicle_id,))
+        current = self.db.fetch_one(
+            UPDATE_VEHICLE_CURRENT, (vehicle.vehicle_id,), row=Vehicles
+        )
 
-        if not current_vehicle:
+        if not current:
             raise ValueError(f"Vehicle with ID {vehicle.vehicle_id} not found")
 
         # Update only the fields that were provided
-        query = """
-        UPDATE vehicles
-        SET make = ?,
-            model = ?,
-            year = ?,
-            license_plate = ?,
-            mileage = ?,
-            daily_rate = ?,
-            description = ?,
-            status = ?
-        WHERE vehicle_id = ?
-        """
-
         self.db.execute(
-            query,
+            UPDATE_VEHICLE,
             (
-                vehicle.make or current_vehicle[1],
-                vehicle.model or current_vehicle[2],
-                vehicle.year or current_vehicle[3],
-                vehicle.license_plate or current_vehicle[4],
-                vehicle.mileage or current_vehicle[5],
-                vehicle.daily_rate or current_vehicle[6],
-                vehicle.description or current_vehicle[7],
-                vehicle.status or current_vehicle[8],
+                vehicle.make or current.make,
+                vehicle.model or current.model,
+                vehicle.year or current.year,
+                vehicle.license_plate or current.license_plate,
+                vehicle.mileage or current.mileage,
+                vehicle.daily_rate or current.daily_rate,
+                vehicle.description or current.description,
+                vehicle.status or current.status,
                 vehicle.vehicle_id,
             ),
         )
+        self._invalidate(vehicle.vehicle_id)
 
     def delete_vehicle(self, vehicle_id: int) -> None:
         """Deletes a vehicle from the database."""
-        query = "DELETE FROM vehicles WHERE vehicle_id = ?"
-        self.db.execute(query, (vehicle_id,))
+        self.db.execute(DELETE_VEHICLE, (vehicle_id,))
+        self._invalidate(vehicle_id)
 
     def update_status(self, vehicle_id: int, status: str) -> None:
         """Updates the status of a vehicle."""
-        query = "UPDATE vehicles SET status = ? WHERE vehicle_id = ?"
-        self.db.execute(query, (status, vehicle_id))
+        self.db.execute(UPDATE_STATUS, (status, vehicle_id))
+        self._invalidate(vehicle_id)
 
     def get_by_id(self, vehicle_id: int) -> Optional[Vehicles]:
         """Retrieves a vehicle by ID."""
-        query = """
-        SELECT vehicle_id, make, model, year, license_plate, mileage, daily_rate, description, status
-        FROM vehicles
-        WHERE vehicle_id = ?
-        """
-        result = self.db.fetch_one(query, (vehicle_id,))
+        # Reads inside a transaction go to the database, so checks made
+        # before a write see the committed row.
+        # The cache keeps immutable rows; callers get their own record
+        result = vehicle_cache.get_or_load(
+            vehicle_id,
+            lambda: self.db.fetch_one(GET_BY_ID, (vehicle_id,), row=VehicleRow),
+            bypass=self.db.in_transaction(),
+        )
         if result is None:
             return None
         else:
             return Vehicles(*result)
 
+    def get_daily_rates(self, vehicle_ids: Iterable[int]) -> Dict[int, float]:
+        """Retrieves the daily rate of many vehicles with one query."""
+        ids = json.dumps(sorted(set(vehicle_ids)))
+        return dict(self.db.fetch_all(DAILY_RATES, (ids,)))
+
+    def mark_rented(self, vehicle_ids: Iterable[int]) -> None:
+        """Marks the available vehicles of vehicle_ids as rented."""
+        ids = sorted(set(vehicle_ids))
+        if not ids:
+            return
+        self.db.execute(MARK_RENTED, (json.dumps(ids),))
+        for vehicle_id in ids:
+            self._invalidate(vehicle_id)
+
     def update_after_return(self, vehicle_id: int, return_mileage: int) -> None:
         """Updates vehicle mileage after a rental is completed."""
-        query = """
-        UPDATE vehicles
-        SET mileage = ?,
-            status = 'available'
-        WHERE vehicle_id = ?
-        """
-        self.db.execute(query, (return_mileage, vehicle_id))
+        self.db.execute(UPDATE_AFTER_RETURN, (return_mileage, vehicle_id))
+        self._invalidate(vehicle_id)
+
+    def _invalidate(self, vehicle_id: int) -> None:
+        """Drops the cached vehicle once the write is committed or rolled back."""
+        self.db.after_transaction(lambda: vehicle_cache.invalidate(vehicle_id))
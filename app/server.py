@@ -0,0 +1,500 @@
+"""
+HTTP/JSON API for concurrent clients, over the same services as the CLI.
+
+Clients log in with POST /login and send the returned token as
+``Authorization: Bearer <token>``. Every request runs as the user of its
+token, on a pool of worker threads, so one process serves many users.
+
+Usage: python app/server.py [--host HOST] [--port PORT] [--workers N]
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from http import HTTPStatus
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from db import config
+from db.database import Database
+from globals import CurrentUser
+from repository.customers import Customers
+from repository.staff import Staff
+from repository.vehicles import Vehicles
+from rich import print
+from service.auth import AuthService
+from service.customers import CustomerService
+from service.errors import NotFound, PermissionDenied, ServiceError
+from service.profile import ProfileService
+from service.rentals import RentalService
+from service.staff import StaffService
+from service.vehicles import VehicleService
+from util.pagination import PAGE_SIZE
+from util.session import issue_token, verify_token
+
+MAX_BODY_SIZE = 1024 * 1024
+MAX_PAGE_SIZE = 1000
+MAX_QUOTES = 10000
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclasses.dataclass
+class Request:
+    method: str
+    path: str
+    query: Dict[str, str]
+    body: dict
+    user: Optional[CurrentUser] = None
+    params: Tuple[str, ...] = ()
+
+    def id(self) -> int:
+        """The record id in the path, e.g. 7 for /vehicles/7."""
+        return int(self.params[0])
+
+    def int_arg(self, name: str, default: Optional[int] = None) -> Optional[int]:
+        value = self.query.get(name, self.body.get(name))
+        if value is None or value == "":
+            return default
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"{name} is not a number") from None
+
+    def limit(self) -> int:
+        return min(max(self.int_arg("limit", PAGE_SIZE), 1), MAX_PAGE_SIZE)
+
+
+def rows(result: List[NamedTuple]) -> List[dict]:
+    """The named rows of a list operation as JSON objects."""
+    return [row._asdict() for row in result]
+
+
+def record(cls, body: dict, **extra):
+    """Builds a dataclass from the known fields of a JSON body."""
+    names = {field.name for field in dataclasses.fields(cls)}
+    unknown = set(body) - names
+    if unknown:
+        raise HTTPError(
+            HTTPStatus.BAD_REQUEST, f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return cls(**{**body, **extra})
+
+
+def account(body: dict) -> Tuple[dict, str, str]:
+    """Splits a JSON body into profile fields, username and password."""
+    body = dict(body)
+    return body, body.pop("username", ""), body.pop("password", "")
+
+
+class Api:
+    """Routes requests to the services."""
+
+    def __init__(self):
+        self.vehicles = VehicleService()
+        self.customers = CustomerService()
+        self.rentals = RentalService()
+        self.staff = StaffService()
+        self.profile = ProfileService()
+        # (method, path pattern, handler), the pattern groups are the params
+        self.routes: List[Tuple[str, re.Pattern, Callable[[Request], object]]] = []
+        for method, pattern, handler in [
+            ("GET", r"/vehicles", self.list_vehicles),
+            ("GET", r"/vehicles/search", self.search_vehicles),
+            ("GET", r"/vehicles/free", self.free_vehicles),
+            ("GET", r"/vehicles/(\d+)", self.get_vehicle),
+            ("POST", r"/vehicles", self.add_vehicle),
+            ("PATCH", r"/vehicles/(\d+)", self.update_vehicle),
+            ("DELETE", r"/vehicles/(\d+)", self.delete_vehicle),
+            ("GET", r"/customers", self.list_customers),
+            ("GET", r"/customers/search", self.search_customers),
+            ("POST", r"/customers", self.add_customer),
+            ("PATCH", r"/customers/(\d+)", self.update_customer),
+            ("DELETE", r"/customers/(\d+)", self.delete_customer),
+            ("GET", r"/rentals", self.list_rentals),
+            ("GET", r"/rentals/(\d+)", self.get_rental),
+            ("POST", r"/rentals", self.add_rental),
+            ("POST", r"/quotes", self.quote_rentals),
+            ("POST", r"/rentals/(\d+)/complete", self.complete_rental),
+            ("POST", r"/rentals/(\d+)/cancel", self.cancel_rental),
+            ("POST", r"/rentals/(\d+)/audit", self.audit_rental),
+            ("GET", r"/staff", self.list_staff),
+            ("POST", r"/staff", self.add_staff),
+            ("PATCH", r"/staff/(\d+)", self.update_staff),
+            ("DELETE", r"/staff/(\d+)", self.delete_staff),
+            ("GET", r"/profile", self.get_profile),
+            ("PATCH", r"/profile", self.update_profile),
+            ("POST", r"/profile/password", self.change_password),
+        ]:
+            self.routes.append((method, re.compile(pattern + "/?"), handler))
+
+    def find(self, method: str, path: str) -> Tuple[Callable, Tuple[str, ...]]:
+        path_found = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.fullmatch(path)
+            if match:
+                path_found = True
+                if route_method == method:
+                    return handler, match.groups()
+        if path_found:
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Method not allowed")
+        raise HTTPError(HTTPStatus.NOT_FOUND, "Not found")
+
+    def list_vehicles(self, request: Request):
+        result = self.vehicles.list_vehicles(
+            request.user,
+            request.query.get("status", ""),
+            request.int_arg("after_id"),
+            request.limit(),
+        )
+        return rows(result)
+
+    def search_vehicles(self, request: Request):
+        result = self.vehicles.search_vehicles(
+            request.user, request.query.get("q", ""), request.limit()
+        )
+        return rows(result)
+
+    def free_vehicles(self, request: Request):
+        try:
+            start = date.fromisoformat(request.query.get("start", ""))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "start is not a date") from None
+        days = request.int_arg("days", 1)
+        result = self.vehicles.free_vehicles(
+            datetime.combine(start, datetime.min.time()), days
+        )
+        quotes = self.rentals.pricing.quote_many(
+            (row.daily_rate, start, days) for row in result
+        )
+        return [
+            {**vehicle, "total_cost": quote and float(quote.total)}
+            for vehicle, quote in zip(rows(result), quotes, strict=True)
+        ]
+
+    def get_vehicle(self, request: Request):
+        return self.vehicles.get_vehicle(request.user, request.id())
+
+    def add_vehicle(self, request: Request):
+        vehicle = record(Vehicles, request.body)
+        return {"vehicle_id": self.vehicles.add_vehicle(request.user, vehicle)}
+
+    def update_vehicle(self, request: Request):
+        vehicle = record(Vehicles, request.body, vehicle_id=request.id())
+        vehicle.status = vehicle.status if "status" in request.body else ""
+        self.vehicles.update_vehicle(request.user, vehicle)
+
+    def delete_vehicle(self, request: Request):
+        self.vehicles.delete_vehicle(request.user, request.id())
+
+    def list_customers(self, request: Request):
+        result = self.customers.list_customers(
+            request.user, request.int_arg("after_id"), request.limit()
+        )
+        return rows(result)
+
+    def search_customers(self, request: Request):
+        result = self.customers.search_customers(
+            request.user, request.query.get("q", ""), request.limit()
+        )
+        return rows(result)
+
+    def add_customer(self, request: Request):
+        fields, username, password = account(request.body)
+        customer = record(Customers, fields)
+        customer_id = self.customers.add_customer(
+            request.user, customer, username, password
+        )
+        return {"customer_id": customer_id}
+
+    def update_customer(self, request: Request):
+        customer = record(Customers, request.body, customer_id=request.id())
+        self.customers.update_customer(request.user, customer)
+
+    def delete_customer(self, request: Request):
+        self.customers.delete_customer(request.user, request.id())
+
+    def list_rentals(self, request: Request):
+        result = self.rentals.list_rentals(
+            request.user,
+            request.query.get("status", ""),
+            request.int_arg("before_id"),
+            request.limit(),
+        )
+        return rows(result)
+
+    def get_rental(self, request: Request):
+        return self.rentals.get_rental(request.user, request.id())
+
+    def add_rental(self, request: Request):
+        vehicle_id = request.int_arg("vehicle_id")
+        days = request.int_arg("days")
+        if vehicle_id is None or days is None:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "vehicle_id and days are required")
+        if request.user.role_name == "customer":
+            start_date = request.body.get("start_date")
+            try:
+                start = date.fromisoformat(start_date) if start_date else None
+            except (TypeError, ValueError):
+                raise HTTPError(
+                    HTTPStatus.BAD_REQUEST, "start_date is not a date"
+                ) from None
+            rental_id = self.rentals.book_rental(request.user, vehicle_id, days, start)
+        else:
+            customer_id = request.int_arg("customer_id")
+            if customer_id is None:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "customer_id is required")
+            rental_id = self.rentals.add_rental(
+                request.user, vehicle_id, customer_id, days
+            )
+        return {"rental_id": rental_id}
+
+    def quote_rentals(self, request: Request):
+        """Prices {"vehicle_id", "start_date", "days"} candidates in "quotes"."""
+        items = request.body.get("quotes")
+        if not isinstance(items, list) or len(items) > MAX_QUOTES:
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST, f"quotes should be a list of up to {MAX_QUOTES}"
+            )
+        try:
+            candidates = [
+                (
+                    int(item["vehicle_id"]),
+                    date.fromisoformat(item["start_date"]),
+                    int(item["days"]),
+                )
+                for item in items
+            ]
+        except (KeyError, TypeError, ValueError):
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST,
+                "Every quote needs a vehicle_id, start_date and days",
+            ) from None
+        quotes = self.rentals.quote_rentals(candidates)
+        return [
+            {
+                "vehicle_id": vehicle_id,
+                "start_date": start,
+                "days": days,
+                "total_cost": quote and float(quote.total),
+            }
+            for (vehicle_id, start, days), quote in zip(candidates, quotes, strict=True)
+        ]
+
+    def complete_rental(self, request: Request):
+        return_mileage = request.int_arg("return_mileage")
+        if return_mileage is None:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "return_mileage is required")
+        self.rentals.complete_rental(request.user, request.id(), return_mileage)
+
+    def cancel_rental(self, request: Request):
+        self.rentals.cancel_rental(request.user, request.id())
+
+    def audit_rental(self, request: Request):
+        status = request.body.get("status", "")
+        self.rentals.audit_rental(request.user, request.id(), status)
+
+    def list_staff(self, request: Request):
+        result = self.staff.list_staff(
+            request.user, request.int_arg("after_id"), request.limit()
+        )
+        return rows(result)
+
+    def add_staff(self, request: Request):
+        fields, username, password = account(request.body)
+        staff = record(Staff, fields)
+        return {
+            "staff_id": self.staff.add_staff(request.user, staff, username, password)
+        }
+
+    def update_staff(self, request: Request):
+        staff = record(Staff, request.body, staff_id=request.id())
+        self.staff.update_staff(request.user, staff)
+
+    def delete_staff(self, request: Request):
+        self.staff.delete_staff(request.user, request.id())
+
+    def get_profile(self, request: Request):
+        return self.profile.get_profile(request.user)
+
+    def update_profile(self, request: Request):
+        cls = Customers if request.user.role_name == "customer" else Staff
+        self.profile.update_profile(request.user, record(cls, request.body))
+
+    def change_password(self, request: Request):
+        self.profile.change_password(
+            request.user,
+            request.body.get("current_password", ""),
+            request.body.get("new_password", ""),
+        )
+
+
+def to_json(value) -> bytes:
+    if dataclasses.is_dataclass(value):
+        value = dataclasses.asdict(value)
+    return json.dumps(value, default=str).encode("utf-8")
+
+
+# Services refuse operations with these statuses
+ERROR_STATUSES = [
+    (NotFound, HTTPStatus.NOT_FOUND),
+    (PermissionDenied, HTTPStatus.FORBIDDEN),
+    (ServiceError, HTTPStatus.BAD_REQUEST),
+]
+
+
+class ApiServer:
+    """A small HTTP/1.1 server with keep-alive connections on asyncio streams."""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.api = Api()
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers or config.pool_size(), thread_name_prefix="api"
+        )
+        self.auth: Optional[AuthService] = None
+
+    async def serve(self, host: str, port: int, ready: Optional[Callable] = None):
+        async with AuthService() as self.auth:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+            if ready is not None:
+                ready(server)
+            async with server:
+                await server.serve_forever()
+
+    async def handle_connection(self, reader, writer) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_SIZE:
+                    await self.respond(
+                        writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, b"", False
+                    )
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.dispatch(method, target, headers, body)
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    and version == "HTTP/1.1"
+                )
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status: HTTPStatus, payload: bytes, keep_alive):
+        head = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            f"Content-Length: {len(payload)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if payload:
+            head.append("Content-Type: application/json")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+        await writer.drain()
+
+    async def dispatch(
+        self, method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Tuple[HTTPStatus, bytes]:
+        try:
+            url = urlsplit(target)
+            try:
+                data = json.loads(body) if body else {}
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Body is not JSON") from None
+            if not isinstance(data, dict):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Body is not a JSON object")
+
+            if url.path == "/login" and method == "POST":
+                return HTTPStatus.OK, to_json(await self.login(data))
+
+            handler, params = self.api.find(method, url.path)
+            request = Request(method, url.path, dict(parse_qsl(url.query)), data)
+            request.params = params
+            request.user = await self.authenticate(headers)
+
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, handler, request)
+            if result is None:
+                return HTTPStatus.NO_CONTENT, b""
+            status = HTTPStatus.CREATED if method == "POST" else HTTPStatus.OK
+            return status, to_json(result)
+        except HTTPError as e:
+            return e.status, to_json({"error": str(e)})
+        except ServiceError as e:
+            status = next(s for cls, s in ERROR_STATUSES if isinstance(e, cls))
+            return status, to_json({"error": str(e)})
+        except (TypeError, ValueError):
+            return HTTPStatus.BAD_REQUEST, to_json({"error": "Invalid request"})
+        except Exception as e:
+            print(f"[red]Internal error: {e!r}[/red]")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, to_json(
+                {"error": "Internal error"}
+            )
+
+    async def login(self, data: dict) -> dict:
+        user = await self.auth.login(
+            str(data.get("username", "")), str(data.get("password", ""))
+        )
+        if user is None:
+            raise HTTPError(HTTPStatus.UNAUTHORIZED, "Invalid username or password")
+        return {"token": issue_token(user), "role_name": user.role_name}
+
+    async def authenticate(self, headers: Dict[str, str]) -> CurrentUser:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise HTTPError(HTTPStatus.UNAUTHORIZED, "Missing bearer token")
+        loop = asyncio.get_running_loop()
+        user = await loop.run_in_executor(self.executor, verify_token, token)
+        if user is None:
+            raise HTTPError(HTTPStatus.UNAUTHORIZED, "Invalid or expired token")
+        return user
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Car Rental System API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="worker threads (default: CRS_DB_POOL_SIZE)",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    from main import initialize
+
+    args = parse_args()
+    initialize()
+    print(f"Listening on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(ApiServer(args.workers).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        Database.close_all()
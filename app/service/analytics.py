@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import Dict, Optional
+
+import numpy as np
+from globals import CurrentUser
+from repository.availability import to_minute
+from repository.rental_history import STATUSES, RentalColumns, RentalHistoryRepository
+from service.errors import require_staff
+from service.reports import report_period
+
+MINUTES_PER_DAY = 24 * 60
+# Rentals in these states occupy their vehicle and earn their cost
+EARNING = (STATUSES.index("active"), STATUSES.index("completed"))
+COMPLETED = STATUSES.index("completed")
+
+
+@dataclass
+class FleetReport:
+    start: date
+    end: date
+    fleet_size: int
+    rentals: int  # earning rentals starting in the period
+    daily_utilization: np.ndarray  # share of the fleet rented on each day
+    average_days: float  # duration of completed rentals
+    median_days: float
+    mileage_per_day: Dict[str, float]  # percentiles of completed rentals
+    revenue: Dict[str, float]  # total and percentiles per rental
+
+
+def rented_minutes_until(columns: RentalColumns, times: np.ndarray) -> np.ndarray:
+    """
+    Returns the minutes all rentals in columns were rented before each of
+    times: every rental that started before t adds t - start, minus t - end
+    if it also ended before t.
+    """
+    starts = np.sort(columns.start_minute)
+    ends = np.sort(columns.end_minute)
+    start_sums = np.concatenate(([0], np.cumsum(starts)))
+    end_sums = np.concatenate(([0], np.cumsum(ends)))
+    started = np.searchsorted(starts, times)
+    ended = np.searchsorted(ends, times)
+    return (times * started - start_sums[started]) - (times * ended - end_sums[ended])
+
+
+def percentiles(values: np.ndarray, points=(10, 50, 90)) -> Dict[str, float]:
+    if not len(values):
+        return {f"p{point}": 0.0 for point in points}
+    return {
+        f"p{point}": float(value)
+        for point, value in zip(points, np.percentile(values, points), strict=True)
+    }
+
+
+class FleetAnalyticsService:
+    """Fleet planning metrics over the whole rental history, for staff."""
+
+    def __init__(self):
+        self.history_repo = RentalHistoryRepository()
+
+    def fleet_report(
+        self,
+        current_user: CurrentUser,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> FleetReport:
+        require_staff(current_user)
+        start, end = report_period(start, end)
+        return self.compute(
+            self.history_repo.load(), self.history_repo.fleet_size(), start, end
+        )
+
+    @staticmethod
+    def compute(
+        columns: RentalColumns, fleet_size: int, start: date, end: date
+    ) -> FleetReport:
+        first = to_minute(datetime.combine(start, time()))
+        days = (end - start).days + 1
+        bounds = first + MINUTES_PER_DAY * np.arange(days + 1, dtype=np.int64)
+
+        earning = columns.select(np.isin(columns.status, EARNING))
+        rented = np.diff(rented_minutes_until(earning, bounds))
+        utilization = rented / (max(fleet_size, 1) * MINUTES_PER_DAY)
+
+        in_period = (earning.start_minute >= bounds[0]) & (
+            earning.start_minute < bounds[-1]
+        )
+        period = earning.select(in_period)
+        completed = period.select(period.status == COMPLETED)
+        minutes = completed.end_minute - completed.start_minute
+        durations = minutes / MINUTES_PER_DAY
+        # Rentals are charged by started day
+        charged_days = np.maximum(np.ceil(durations), 1)
+        revenue = period.cost_cents / 100
+
+        return FleetReport(
+            start=start,
+            end=end,
+            fleet_size=fleet_size,
+            rentals=len(period),
+            daily_utilization=utilization,
+            average_days=float(durations.mean()) if len(durations) else 0.0,
+            median_days=float(np.median(durations)) if len(durations) else 0.0,
+            mileage_per_day=percentiles(completed.distance / charged_days),
+            revenue={
+                "total": float(revenue.sum()),
+                **percentiles(revenue, (50, 90, 99)),
+            },
+        )
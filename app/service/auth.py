@@ -0,0 +1,102 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional
+
+from globals import CurrentUser
+from repository.users import UsersRepository
+from rich import print
+from util.passwords import check_password, hash_password
+
+# Seconds between two writes of the collected last_login times
+FLUSH_INTERVAL = 1.0
+
+
+class AuthService:
+    """
+    Non-blocking login for asyncio front ends.
+
+    bcrypt releases the GIL, so password checks run in a thread pool with
+    one worker per CPU core while the event loop keeps serving requests.
+    last_login times are collected in memory and written in one batch every
+    flush_interval seconds, and when the service is closed.
+
+    Use it as an async context manager::
+
+        async with AuthService() as auth:
+            current_user = await auth.login(username, password)
+    """
+
+    def __init__(self, workers: Optional[int] = None, flush_interval=FLUSH_INTERVAL):
+        self.users_repo = UsersRepository()
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers or os.cpu_count() or 1,
+            thread_name_prefix="auth",
+        )
+        self.flush_interval = flush_interval
+        self._logins: Dict[int, datetime] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        # Unknown usernames are checked against this hash, so they take as
+        # long to reject as a wrong password
+        self._dummy_hash = hash_password("")
+
+    async def __aenter__(self) -> "AuthService":
+        self._flusher = asyncio.create_task(self._flush_periodically())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, func, *args
+        )
+
+    async def login(self, username: str, password: str) -> Optional[CurrentUser]:
+        """Checks the credentials and returns the logged-in user, or None."""
+        result = await self._run(self.users_repo.get_with_role, username)
+        hashed = result[0].password if result else self._dummy_hash
+        if not await self._run(check_password, password, hashed) or result is None:
+            return None
+
+        user, role_name = result
+        self._logins[user.user_id] = datetime.now()
+        return CurrentUser(
+            user_id=user.user_id, username=user.username, role_name=role_name
+        )
+
+    async def flush(self) -> None:
+        """Writes the last_login times collected since the previous flush."""
+        if not self._logins:
+            return
+        logins, self._logins = self._logins, {}
+        try:
+            await self._run(self.users_repo.update_last_logins, logins)
+        except BaseException:
+            # Keep the times for the next flush, unless the user logged in again
+            self._logins = {**logins, **self._logins}
+            raise
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            # A failed write must not stop the flushes that follow it
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[red]Could not write last login times: {e!r}[/red]")
+
+    async def close(self) -> None:
+        """Stops the periodic flush, writes pending logins and stops the workers."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        try:
+            await self.flush()
+        finally:
+            self.executor.shutdown()
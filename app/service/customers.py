@@ -0,0 +1,109 @@
+import sqlite3
+from typing import Iterable, List, Optional, Tuple
+
+from globals import CurrentUser
+from repository.customers import Customers, CustomersRepository
+from repository.users import Users, UsersRepository
+from service.errors import NotFound, ServiceError, require_staff
+from util.pagination import PAGE_SIZE
+from util.validation import validate_email, validate_phone
+
+CUSTOMER_ROLE_ID = 2
+
+
+def validate_contact(email: Optional[str], phone: Optional[str]) -> None:
+    """Raises ServiceError if the email or phone number is set but not valid."""
+    if email and not validate_email(email):
+        raise ServiceError("The email is not valid")
+    if phone and not validate_phone(phone):
+        raise ServiceError("The phone number is not valid")
+
+
+class CustomerService:
+    """Customer records and accounts, managed by staff."""
+
+    def __init__(self):
+        self.customer_repo = CustomersRepository()
+        self.users_repo = UsersRepository()
+
+    def list_customers(
+        self,
+        current_user: CurrentUser,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = PAGE_SIZE,
+        stream: bool = False,
+    ) -> Iterable[Tuple]:
+        require_staff(current_user)
+        return self.customer_repo.get_customers(
+            "", after_id=after_id, limit=limit, stream=stream
+        )
+
+    def search_customers(
+        self, current_user: CurrentUser, keyword: str, limit: int = PAGE_SIZE
+    ) -> List[Tuple]:
+        require_staff(current_user)
+        return self.customer_repo.search_customers(keyword, limit=limit)
+
+    def add_customer(
+        self,
+        current_user: CurrentUser,
+        customer: Customers,
+        username: str,
+        password: str,
+    ) -> int:
+        """Creates a customer with a user account and returns the customer id."""
+        require_staff(current_user)
+        return self.register(customer, username, password)
+
+    def register(self, customer: Customers, username: str, password: str) -> int:
+        """
+        Creates a customer with a user account, e.g. for /register, and
+        returns the customer id.
+        """
+        if not customer.full_name:
+            raise ServiceError("Full name can not be null")
+        if not username or not password:
+            raise ServiceError("The username and password are required")
+        if not customer.email:
+            raise ServiceError("The email is not valid")
+        validate_contact(customer.email, customer.phone)
+        if self.users_repo.get_by_username(username) is not None:
+            raise ServiceError("The username has exist, please try again.")
+        if customer.driver_license and not self.customer_repo.driver_license_exits(
+            customer.driver_license
+        ):
+            raise ServiceError("The driver license has exist.")
+
+        try:
+            with self.users_repo.db.transaction():
+                user = Users(
+                    username=username, password=password, role_id=CUSTOMER_ROLE_ID
+                )
+                customer.user_id = self.users_repo.add_user(user)
+                return self.customer_repo.add_customer(customer)
+        except sqlite3.IntegrityError:
+            raise ServiceError(
+                "The username, email or driver license already exists"
+            ) from None
+
+    def update_customer(self, current_user: CurrentUser, customer: Customers) -> None:
+        """Updates the fields of a customer that are set."""
+        require_staff(current_user)
+        validate_contact(customer.email, customer.phone)
+        try:
+            self.customer_repo.update_customer(customer)
+        except ValueError:
+            raise NotFound("Can not find the customer") from None
+        except sqlite3.IntegrityError:
+            raise ServiceError("The email or driver license already exists") from None
+
+    def delete_customer(self, current_user: CurrentUser, customer_id: int) -> None:
+        """Deletes a customer and their user account."""
+        require_staff(current_user)
+        customer = self.customer_repo.get_by_customer_id(customer_id)
+        if customer is None:
+            raise NotFound("Can not find the customer")
+
+        with self.customer_repo.db.transaction():
+            self.customer_repo.delete_customer(customer_id)
+            self.users_repo.delete_user(customer.user_id)
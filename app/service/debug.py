@@ -0,0 +1,26 @@
+from typing import List
+
+from db.metrics import METRICS, QueryStats
+from globals import CurrentUser
+from service.errors import ServiceError, require_staff
+
+
+class DebugService:
+    """Query statistics of this process, for staff."""
+
+    def query_stats(self, current_user: CurrentUser) -> List[QueryStats]:
+        """Returns the statistics of every query, slowest in total first."""
+        require_staff(current_user)
+        return METRICS.snapshot()
+
+    def export_stats(self, current_user: CurrentUser, path: str) -> None:
+        """Writes the statistics to path in the Prometheus text format."""
+        require_staff(current_user)
+        try:
+            METRICS.export(path)
+        except OSError as e:
+            raise ServiceError(f"Can not write {path}: {e.strerror}") from None
+
+    def reset_stats(self, current_user: CurrentUser) -> None:
+        require_staff(current_user)
+        METRICS.reset()
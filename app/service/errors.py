@@ -0,0 +1,19 @@
+from globals import CurrentUser
+
+
+class ServiceError(Exception):
+    """An operation was refused. The message can be shown to the user."""
+
+
+class NotFound(ServiceError):
+    """The requested record does not exist."""
+
+
+class PermissionDenied(ServiceError):
+    """The current user may not run the operation."""
+
+
+def require_staff(current_user: CurrentUser) -> None:
+    """Raises PermissionDenied unless the current user is a staff member."""
+    if current_user.role_name != "staff":
+        raise PermissionDenied("Only staff can do this")
@@ -0,0 +1,237 @@
+import calendar
+import json
+import math
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from itertools import accumulate
+from typing import Iterable, List, Optional, Tuple
+
+from service.errors import ServiceError
+
+# Rates are scaled in basis points, so 10000 is 100% of the daily rate
+BASIS = 10000
+# Days the compiled day table covers
+FIRST_DAY = date(2000, 1, 1)
+LAST_DAY = date(2100, 1, 1)
+
+
+def to_cents(amount) -> int:
+    """Converts an amount like 45.5 or "45.50" to cents, rounding half up."""
+    return int((Decimal(str(amount)) * 100).quantize(Decimal(1), ROUND_HALF_UP))
+
+
+def to_amount(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+
+def scale(cents: int, basis_points: int) -> int:
+    """Returns cents * basis_points / BASIS, rounded half up."""
+    return (2 * cents * basis_points + BASIS) // (2 * BASIS)
+
+
+@dataclass(frozen=True)
+class Season:
+    start: str  # MM-DD, the season may wrap around the new year
+    end: str  # MM-DD, included
+    percent: float  # added to the daily rate, negative for a discount
+
+    def contains(self, month_day: str) -> bool:
+        if self.start <= self.end:
+            return self.start <= month_day <= self.end
+        return month_day >= self.start or month_day <= self.end
+
+
+@dataclass(frozen=True)
+class RateTable:
+    """Pricing rules on top of the daily rate of each vehicle."""
+
+    weekend_percent: float = 0  # added to the rate on Saturdays and Sundays
+    seasons: Tuple[Season, ...] = ()
+    # (minimum days, discount percent) of long rentals; the longest that applies wins
+    long_term: Tuple[Tuple[int, float], ...] = ()
+    late_fee_percent: float = 100  # of the rate per started day of a late return
+    grace_minutes: int = 60
+    included_mileage_per_day: Optional[int] = None  # None is unlimited
+    overage_cents: int = 0  # per mile above the included mileage
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RateTable":
+        data = dict(data)
+        data["seasons"] = tuple(Season(**season) for season in data.get("seasons", ()))
+        data["long_term"] = tuple(tuple(item) for item in data.get("long_term", ()))
+        return cls(**data)
+
+
+@dataclass
+class Quote:
+    """The price of a rental in cents."""
+
+    days: int
+    base_cents: int  # the daily rate with weekend and season rates
+    discount_cents: int = 0  # long-term discount
+    late_fee_cents: int = 0
+    overage_cents: int = 0
+    late_days: int = 0
+
+    @property
+    def total_cents(self) -> int:
+        return (
+            self.base_cents
+            - self.discount_cents
+            + self.late_fee_cents
+            + self.overage_cents
+        )
+
+    @property
+    def total(self) -> Decimal:
+        return to_amount(self.total_cents)
+
+
+def _month_days(leap: bool) -> List[str]:
+    """Returns MM-DD of every day of a leap or common year."""
+    first = date(2000 if leap else 2001, 1, 1)
+    return [
+        (first + timedelta(days=i)).strftime("%m-%d")
+        for i in range(366 if leap else 365)
+    ]
+
+
+class PricingEngine:
+    """
+    Prices rentals with a RateTable compiled into lookup tables: the running
+    sum of the rate factor of every calendar day, and the long-term discount
+    of every rental length. A quote costs a few lookups for any number of days.
+    """
+
+    def __init__(self, rates: Optional[RateTable] = None):
+        if rates is None:
+            rates = RateTable()
+        self.rates = rates
+        self._first = FIRST_DAY.toordinal()
+        # The same month and day have the same season rate in every year
+        season_rates = {
+            leap: [
+                sum(s.percent for s in rates.seasons if s.contains(month_day))
+                for month_day in _month_days(leap)
+            ]
+            for leap in (False, True)
+        }
+        factors = []
+        for year in range(FIRST_DAY.year, LAST_DAY.year):
+            ordinal = date(year, 1, 1).toordinal()
+            for percent in season_rates[calendar.isleap(year)]:
+                if (ordinal + 6) % 7 >= 5:  # date.weekday() of Saturday, Sunday
+                    percent += rates.weekend_percent
+                factors.append(max(BASIS + round(percent * 100), 0))
+                ordinal += 1
+        # _factor_sums[i] is the sum of the factors of the first i days
+        self._factor_sums = list(accumulate(factors, initial=0))
+
+        longest = max((days for days, _ in rates.long_term), default=0)
+        self._discounts = [0] * (longest + 1)
+        for min_days, percent in sorted(rates.long_term):
+            for days in range(min_days, longest + 1):
+                self._discounts[days] = round(percent * 100)
+
+    def _day_index(self, day: date, days: int) -> int:
+        index = day.toordinal() - self._first
+        if index < 0 or index + days >= len(self._factor_sums):
+            raise ServiceError("The rental dates are outside of the rate table")
+        return index
+
+    def _day_factors(self, day: date, days: int) -> int:
+        index = self._day_index(day, days)
+        return self._factor_sums[index + days] - self._factor_sums[index]
+
+    def quote(self, daily_rate, start: date, days: int) -> Quote:
+        """Prices days from the start day at the daily rate."""
+        return self._quote(to_cents(daily_rate), start, days)
+
+    def _quote(self, rate_cents: int, start: date, days: int) -> Quote:
+        if days < 1:
+            raise ServiceError("The rental duration should be at least one day")
+        if isinstance(start, datetime):
+            start = start.date()
+        base = scale(rate_cents, self._day_factors(start, days))
+        discount = self._discounts[min(days, len(self._discounts) - 1)]
+        return Quote(days=days, base_cents=base, discount_cents=scale(base, discount))
+
+    def quote_many(
+        self, candidates: Iterable[Tuple[Optional[float], date, int]]
+    ) -> List[Optional[Quote]]:
+        """
+        Prices (daily rate, start day, days) candidates. Candidates without
+        a rate or with invalid dates get None.
+        """
+        quotes = []
+        cents = {}
+        for daily_rate, start, days in candidates:
+            quote = None
+            if daily_rate is not None:
+                rate_cents = cents.get(daily_rate)
+                if rate_cents is None:
+                    rate_cents = cents[daily_rate] = to_cents(daily_rate)
+                try:
+                    quote = self._quote(rate_cents, start, days)
+                except ServiceError:
+                    pass
+            quotes.append(quote)
+        return quotes
+
+    def final_quote(
+        self,
+        daily_rate,
+        start: datetime,
+        expected_return: datetime,
+        actual_return: datetime,
+        mileage: int,
+    ) -> Quote:
+        """
+        Prices a returned rental: the booked days, plus late fees for every
+        started day after the grace period and mileage above the allowance.
+        """
+        days = max(math.ceil((expected_return - start) / timedelta(days=1)), 1)
+        quote = self.quote(daily_rate, start, days)
+
+        late = actual_return - expected_return
+        if late > timedelta(minutes=self.rates.grace_minutes):
+            quote.late_days = math.ceil(late / timedelta(days=1))
+            factors = self._day_factors(expected_return.date(), quote.late_days)
+            quote.late_fee_cents = scale(
+                scale(to_cents(daily_rate), factors),
+                round(self.rates.late_fee_percent * 100),
+            )
+
+        included = self.rates.included_mileage_per_day
+        if included is not None:
+            extra = mileage - included * (days + quote.late_days)
+            quote.overage_cents = max(extra, 0) * self.rates.overage_cents
+        return quote
+
+
+def pricing_path() -> Optional[str]:
+    """JSON file with the RateTable fields (``CRS_PRICING_PATH``)."""
+    return os.environ.get("CRS_PRICING_PATH") or None
+
+
+def load_rate_table(path: Optional[str] = None) -> RateTable:
+    path = path or pricing_path()
+    if path is None:
+        return RateTable()
+    with open(path, encoding="utf-8") as file:
+        return RateTable.from_dict(json.load(file))
+
+
+# Engines by rate table file, compiled once
+_engines = {}
+
+
+def pricing_engine() -> PricingEngine:
+    """Returns the engine of the configured rate table."""
+    path = pricing_path()
+    engine = _engines.get(path)
+    if engine is None:
+        engine = _engines[path] = PricingEngine(load_rate_table(path))
+    return engine
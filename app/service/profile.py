@@ -0,0 +1,63 @@
+import sqlite3
+from typing import Union
+
+from globals import CurrentUser
+from repository.customers import Customers, CustomersRepository
+from repository.staff import Staff, StaffRepository
+from repository.users import UsersRepository
+from service.customers import validate_contact
+from service.errors import NotFound, ServiceError
+from util.passwords import check_password, hash_password
+
+
+class ProfileService:
+    """The current user's own customer or staff details and password."""
+
+    def __init__(self):
+        self.user_repo = UsersRepository()
+        self.customer_repo = CustomersRepository()
+        self.staff_repo = StaffRepository()
+
+    def get_profile(self, current_user: CurrentUser) -> Union[Customers, Staff]:
+        if current_user.role_name == "customer":
+            profile = self.customer_repo.get_by_user_id(current_user.user_id)
+        else:
+            profile = self.staff_repo.get_by_user_id(current_user.user_id)
+        if profile is None:
+            raise NotFound("Can not find your data")
+        return profile
+
+    def update_profile(
+        self, current_user: CurrentUser, profile: Union[Customers, Staff]
+    ) -> None:
+        """Updates the fields of the current user's details that are set."""
+        current = self.get_profile(current_user)
+        try:
+            if isinstance(current, Customers):
+                validate_contact(profile.email, getattr(profile, "phone", None))
+                profile.customer_id = current.customer_id
+                self.customer_repo.update_customer(profile)
+            else:
+                validate_contact(profile.email, None)
+                self.staff_repo.update_staff(
+                    Staff(
+                        staff_id=current.staff_id,
+                        full_name=profile.full_name,
+                        email=profile.email,
+                    )
+                )
+        except sqlite3.IntegrityError:
+            raise ServiceError("The email or driver license already exists") from None
+
+    def change_password(
+        self, current_user: CurrentUser, current_password: str, new_password: str
+    ) -> None:
+        """Changes the password, which also signs out all saved sessions."""
+        if not new_password:
+            raise ServiceError("The password is invalid")
+        user = self.user_repo.get_by_user_id(current_user.user_id)
+        if user is None:
+            raise NotFound("Can not find your user details.")
+        if not check_password(current_password, user.password):
+            raise ServiceError("Your current password is incorrect.")
+        self.user_repo.update_password(user.user_id, hash_password(new_password))
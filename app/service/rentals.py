@@ -0,0 +1,260 @@
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from globals import CurrentUser
+from repository.availability import AvailabilityRepository
+from repository.customers import Customers, CustomersRepository
+from repository.rentals import Rentals, RentalsRepository
+from repository.staff import StaffRepository
+from repository.vehicles import VehiclesRepository
+from service.errors import NotFound, PermissionDenied, ServiceError, require_staff
+from service.pricing import Quote, pricing_engine, to_amount, to_cents
+from util.pagination import PAGE_SIZE
+
+AUDIT_STATUSES = ("active", "reject")
+
+
+def as_datetime(value) -> datetime:
+    """Rental dates are read from the database as text."""
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+class RentalService:
+    """
+    Rentals: staff rent vehicles out at the counter and manage every rental,
+    customers book vehicles and see their own rentals.
+    """
+
+    def __init__(self):
+        self.rental_repo = RentalsRepository()
+        self.customer_repo = CustomersRepository()
+        self.staff_repo = StaffRepository()
+        self.vehicle_repo = VehiclesRepository()
+        self.availability_repo = AvailabilityRepository()
+        self.pricing = pricing_engine()
+
+    def current_customer(self, current_user: CurrentUser) -> Customers:
+        """Retrieves the customer record of the current user."""
+        customer = self.customer_repo.get_by_user_id(current_user.user_id)
+        if customer is None or customer.customer_id is None:
+            raise NotFound("Can not find your information")
+        return customer
+
+    def list_rentals(
+        self,
+        current_user: CurrentUser,
+        status: str = "",
+        before_id: Optional[int] = None,
+        limit: Optional[int] = PAGE_SIZE,
+        stream: bool = False,
+    ) -> Iterable[Tuple]:
+        """
+        Retrieves a page of rentals, newest first. Customers see their own.
+        With stream and no limit, every rental is read as it is iterated.
+        """
+        customer_id = 0
+        if current_user.role_name == "customer":
+            customer_id = self.current_customer(current_user).customer_id
+        return self.rental_repo.get_rental_details(
+            status, customer_id, before_id=before_id, limit=limit, stream=stream
+        )
+
+    def get_rental(self, current_user: CurrentUser, rental_id: int) -> Rentals:
+        rental = self.rental_repo.get_by_id(rental_id)
+        if rental is None:
+            raise NotFound("Can not find this rental data")
+        if current_user.role_name == "customer":
+            if rental.customer_id != self.current_customer(current_user).customer_id:
+                raise NotFound("Can not find this rental data")
+        return rental
+
+    def add_rental(
+        self, current_user: CurrentUser, vehicle_id: int, customer_id: int, days: int
+    ) -> int:
+        """Rents a vehicle out from now on and returns the rental id."""
+        require_staff(current_user)
+        staff = self.staff_repo.get_by_user_id(current_user.user_id)
+        if staff is None or staff.staff_id is None:
+            raise NotFound("Can not find your information")
+
+        rental = Rentals(
+            vehicle_id=vehicle_id,
+            customer_id=customer_id,
+            staff_id=staff.staff_id,
+            start_date=datetime.now(),
+            rental_status="active",
+        )
+        return self.create_rental(rental, days)
+
+    def book_rental(
+        self,
+        current_user: CurrentUser,
+        vehicle_id: int,
+        days: int,
+        start_date: Optional[date] = None,
+    ) -> int:
+        """
+        Books a vehicle for the current customer, from now or from a later
+        day, and returns the rental id. Staff audit the booking.
+        """
+        if current_user.role_name != "customer":
+            raise PermissionDenied("Only customers can book a rental")
+        if start_date is not None and start_date < date.today():
+            raise ServiceError("The date is not valid or in the past")
+
+        rental = Rentals(
+            vehicle_id=vehicle_id,
+            customer_id=self.current_customer(current_user).customer_id,
+            start_date=(
+                datetime.combine(start_date, datetime.min.time())
+                if start_date
+                else datetime.now()
+            ),
+        )
+        return self.create_rental(rental, days)
+
+    def create_rental(self, rental: Rentals, days: int) -> int:
+        """
+        Checks that the vehicle is free for the rental dates and inserts the
+        rental in one transaction, so two bookings can not overlap.
+        Returns the rental id.
+        """
+        if days < 1:
+            raise ServiceError("The rental duration should be at least one day")
+        rental.expected_return_date = rental.start_date + timedelta(days=days)
+
+        with self.rental_repo.db.transaction():
+            # Get vehicle information for initial mileage and cost calculation
+            vehicle = self.vehicle_repo.get_by_id(rental.vehicle_id)
+            if not vehicle:
+                raise NotFound("Vehicle not found")
+
+            # A rented vehicle may be overdue, so only later bookings are allowed
+            starts_today = rental.start_date.date() <= date.today()
+            if vehicle.status == "maintenance" or (
+                vehicle.status == "rented" and starts_today
+            ):
+                raise ServiceError("Vehicle is not available for rent")
+
+            if not self.availability_repo.is_available(
+                rental.vehicle_id, rental.start_date, rental.expected_return_date
+            ):
+                raise ServiceError("Vehicle is already booked for these dates")
+
+            if vehicle.mileage is None:
+                raise ServiceError(
+                    "Vehicle mileage is not set, consider checking the vehicle before rental"
+                )
+            rental.initial_mileage = vehicle.mileage  # mileage from vehicle record
+
+            if vehicle.daily_rate is None:
+                raise ServiceError("Vehicle daily rate is not set")
+
+            quote = self.pricing.quote(vehicle.daily_rate, rental.start_date, days)
+            rental.total_cost = float(quote.total)
+
+            # The vehicle leaves the lot now for rentals created at the counter
+            if rental.rental_status == "active":
+                self.vehicle_repo.update_status(rental.vehicle_id, "rented")
+
+            return self.rental_repo.add_rental(rental)
+
+    def complete_rental(
+        self, current_user: CurrentUser, rental_id: int, return_mileage: int
+    ) -> None:
+        """Records the return of a rented vehicle."""
+        require_staff(current_user)
+        with self.rental_repo.db.transaction():
+            rental = self.rental_repo.get_by_id(rental_id)
+            if not rental:
+                raise NotFound("Rental not found")
+            # Only a vehicle that is out can come back, and only once
+            if rental.rental_status != "active":
+                raise ServiceError("Only active rentals can be completed")
+            if return_mileage < rental.initial_mileage:
+                raise ServiceError("Return mileage cannot be less than initial mileage")
+            if not rental.vehicle_id:
+                raise NotFound("Vehicle not found")
+
+            returned = datetime.now()
+            total_cost = self.final_cost(rental, return_mileage, returned)
+            self.rental_repo.complete_rental(
+                rental_id, return_mileage, returned, total_cost
+            )
+            self.vehicle_repo.update_after_return(rental.vehicle_id, return_mileage)
+
+    def final_cost(
+        self, rental: Rentals, return_mileage: int, returned: datetime
+    ) -> Optional[float]:
+        """
+        Returns the booked cost of a rental plus its late fees and mileage
+        overage, or None to keep the booked cost.
+        """
+        vehicle = self.vehicle_repo.get_by_id(rental.vehicle_id)
+        if vehicle is None or vehicle.daily_rate is None:
+            return None
+        quote = self.pricing.final_quote(
+            vehicle.daily_rate,
+            as_datetime(rental.start_date),
+            as_datetime(rental.expected_return_date),
+            returned,
+            return_mileage - rental.initial_mileage,
+        )
+        booked = (
+            quote.base_cents - quote.discount_cents
+            if rental.total_cost is None
+            else to_cents(rental.total_cost)
+        )
+        return float(to_amount(booked + quote.late_fee_cents + quote.overage_cents))
+
+    def quote_rental(self, vehicle_id: int, start_date: date, days: int) -> Quote:
+        """Prices a rental of the vehicle without booking it."""
+        vehicle = self.vehicle_repo.get_by_id(vehicle_id)
+        if vehicle is None:
+            raise NotFound("Vehicle not found")
+        if vehicle.daily_rate is None:
+            raise ServiceError("Vehicle daily rate is not set")
+        return self.pricing.quote(vehicle.daily_rate, start_date, days)
+
+    def quote_rentals(
+        self, candidates: Sequence[Tuple[int, date, int]]
+    ) -> List[Optional[Quote]]:
+        """
+        Prices many (vehicle_id, start day, days) candidates, e.g. for search
+        results, with one query. Unknown vehicles and invalid periods get None.
+        """
+        rates = self.vehicle_repo.get_daily_rates(c[0] for c in candidates)
+        return self.pricing.quote_many(
+            (rates.get(vehicle_id), start, days)
+            for vehicle_id, start, days in candidates
+        )
+
+    def cancel_rental(self, current_user: CurrentUser, rental_id: int) -> None:
+        """Cancels a booking that staff have not audited yet."""
+        with self.rental_repo.db.transaction():
+            rental = self.get_rental(current_user, rental_id)
+            if rental.rental_status != "apply":
+                raise ServiceError(
+                    "This rental status has been changed, please check its details"
+                )
+            # Cancelling also releases the reserved dates of the vehicle
+            self.rental_repo.update_status(rental_id, "cancelled")
+
+    def audit_rental(
+        self, current_user: CurrentUser, rental_id: int, status: str
+    ) -> None:
+        """Accepts (active) or rejects (reject) a booking."""
+        require_staff(current_user)
+        if status not in AUDIT_STATUSES:
+            raise ServiceError("The status is not valid")
+        with self.rental_repo.db.transaction():
+            rental = self.get_rental(current_user, rental_id)
+            if rental.rental_status != "apply":
+                raise ServiceError(
+                    "This rental status has been changed, please check its details"
+                )
+            # Rejecting also releases the reserved dates of the vehicle
+            self.rental_repo.update_status(rental_id, status)
+            # An accepted booking that has started takes the vehicle off the lot
+            if status == "active" and as_datetime(rental.start_date) <= datetime.now():
+                self.vehicle_repo.update_status(rental.vehicle_id, "rented")
@@ -0,0 +1,46 @@
+from datetime import date
+from typing import List, Optional, Tuple
+
+from globals import CurrentUser
+from repository.reports import ReportsRepository
+from service.errors import ServiceError, require_staff
+
+
+def report_period(
+    start: Optional[date] = None, end: Optional[date] = None
+) -> Tuple[date, date]:
+    """Defaults to the current month up to today."""
+    end = end or date.today()
+    start = start or end.replace(day=1)
+    if start > end:
+        raise ServiceError("The start date should not be after the end date")
+    return start, end
+
+
+class ReportService:
+    """Revenue, utilization and rental reports, for staff."""
+
+    def __init__(self):
+        self.reports_repo = ReportsRepository()
+
+    def revenue_by_vehicle(
+        self,
+        current_user: CurrentUser,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> List[Tuple]:
+        require_staff(current_user)
+        return self.reports_repo.revenue_by_vehicle(*report_period(start, end))
+
+    def utilization_by_make(
+        self,
+        current_user: CurrentUser,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> List[Tuple]:
+        require_staff(current_user)
+        return self.reports_repo.utilization_by_make(*report_period(start, end))
+
+    def status_counts(self, current_user: CurrentUser) -> List[Tuple]:
+        require_staff(current_user)
+        return self.reports_repo.status_counts()
@@ -0,0 +1,85 @@
+import sqlite3
+from typing import Iterable, Optional, Tuple
+
+from globals import CurrentUser
+from repository.staff import Staff, StaffRepository
+from repository.users import Users, UsersRepository
+from service.errors import NotFound, ServiceError, require_staff
+from util.pagination import PAGE_SIZE
+from util.validation import validate_email
+
+STAFF_ROLE_ID = 1
+
+
+class StaffService:
+    """Staff records and accounts, managed by staff."""
+
+    def __init__(self):
+        self.staff_repo = StaffRepository()
+        self.users_repo = UsersRepository()
+
+    def list_staff(
+        self,
+        current_user: CurrentUser,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = PAGE_SIZE,
+        stream: bool = False,
+    ) -> Iterable[Tuple]:
+        require_staff(current_user)
+        return self.staff_repo.get_staffs(after_id=after_id, limit=limit, stream=stream)
+
+    def current_staff(self, current_user: CurrentUser) -> Staff:
+        """Retrieves the staff record of the current user."""
+        require_staff(current_user)
+        staff = self.staff_repo.get_by_user_id(current_user.user_id)
+        if staff is None or staff.staff_id is None:
+            raise NotFound("Can not find your information")
+        return staff
+
+    def add_staff(
+        self, current_user: CurrentUser, staff: Staff, username: str, password: str
+    ) -> int:
+        """Creates a staff member with a user account and returns the staff id."""
+        require_staff(current_user)
+        if not staff.full_name:
+            raise ServiceError("The full name cannot be empty")
+        if not staff.email or not validate_email(staff.email):
+            raise ServiceError("The email is not valid")
+        if not username or not password:
+            raise ServiceError("The username and password are required")
+        if self.users_repo.get_by_username(username) is not None:
+            raise ServiceError("The username has exist, please try another one.")
+
+        try:
+            with self.users_repo.db.transaction():
+                user = Users(
+                    username=username, password=password, role_id=STAFF_ROLE_ID
+                )
+                staff.user_id = self.users_repo.add_user(user)
+                return self.staff_repo.add_staff(staff)
+        except sqlite3.IntegrityError:
+            raise ServiceError("The username or email already exists") from None
+
+    def update_staff(self, current_user: CurrentUser, staff: Staff) -> None:
+        """Updates the fields of a staff member that are set."""
+        require_staff(current_user)
+        if staff.email and not validate_email(staff.email):
+            raise ServiceError("The email is not valid")
+        try:
+            self.staff_repo.update_staff(staff)
+        except ValueError:
+            raise NotFound("Can not find the staff.") from None
+        except sqlite3.IntegrityError:
+            raise ServiceError("The email already exists") from None
+
+    def delete_staff(self, current_user: CurrentUser, staff_id: int) -> None:
+        """Deletes a staff member and their user account."""
+        if staff_id == self.current_staff(current_user).staff_id:
+            raise ServiceError("You cannot delete yourself.")
+        staff = self.staff_repo.get_by_staff_id(staff_id)
+        if staff is None or staff.user_id is None:
+            raise NotFound("Can not find the staff.")
+
+        with self.staff_repo.db.transaction():
+            self.staff_repo.delete_staff(staff_id)
+            self.users_repo.delete_user(staff.user_id)
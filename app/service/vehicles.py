@@ -0,0 +1,101 @@
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from globals import CurrentUser
+from repository.availability import AvailabilityRepository
+from repository.vehicles import Vehicles, VehiclesRepository
+from service.errors import NotFound, ServiceError, require_staff
+from util.pagination import PAGE_SIZE
+from util.validation import validate_price, validate_year
+
+VEHICLE_STATUSES = ("available", "rented", "maintenance")
+
+
+class VehicleService:
+    """Vehicle operations. Customers only see available vehicles."""
+
+    def __init__(self):
+        self.vehicles_repo = VehiclesRepository()
+        self.availability_repo = AvailabilityRepository()
+
+    def list_vehicles(
+        self,
+        current_user: CurrentUser,
+        status: str = "",
+        after_id: Optional[int] = None,
+        limit: Optional[int] = PAGE_SIZE,
+        stream: bool = False,
+    ) -> Iterable[Tuple]:
+        """
+        Retrieves a page of vehicles, optionally only those with a status.
+        With stream and no limit, every vehicle is read as it is iterated.
+        """
+        if current_user.role_name == "customer":
+            status = "available"
+        return self.vehicles_repo.get_vehicles(
+            status=status, after_id=after_id, limit=limit, stream=stream
+        )
+
+    def search_vehicles(
+        self, current_user: CurrentUser, keyword: str, limit: int = PAGE_SIZE
+    ) -> List[Tuple]:
+        """Retrieves the vehicles that best match the keyword."""
+        status = "available" if current_user.role_name == "customer" else ""
+        return self.vehicles_repo.search_vehicles(keyword, status=status, limit=limit)
+
+    def free_vehicles(self, start: datetime, days: int) -> List[Tuple]:
+        """Retrieves the vehicles that are not booked for days from start."""
+        if days < 1:
+            raise ServiceError("The rental duration should be at least one day")
+        return self.availability_repo.free_vehicles(start, start + timedelta(days=days))
+
+    def get_vehicle(self, current_user: CurrentUser, vehicle_id: int) -> Vehicles:
+        """Retrieves a vehicle; customers only see the available ones."""
+        vehicle = self.vehicles_repo.get_by_id(vehicle_id)
+        if vehicle is None or (
+            current_user.role_name == "customer" and vehicle.status != "available"
+        ):
+            raise NotFound("Vehicle not found")
+        return vehicle
+
+    def add_vehicle(self, current_user: CurrentUser, vehicle: Vehicles) -> int:
+        """Adds a vehicle and returns its id."""
+        require_staff(current_user)
+        if not vehicle.make or not vehicle.model or not vehicle.license_plate:
+            raise ServiceError("The make, model and license plate are required")
+        if vehicle.year is None or vehicle.daily_rate is None:
+            raise ServiceError("The year and daily rate are required")
+        self._validate(vehicle)
+        try:
+            return self.vehicles_repo.add_vehicle(vehicle)
+        except sqlite3.IntegrityError:
+            raise ServiceError("The license plate already exists") from None
+
+    def update_vehicle(self, current_user: CurrentUser, vehicle: Vehicles) -> None:
+        """Updates the fields of a vehicle that are set."""
+        require_staff(current_user)
+        self._validate(vehicle)
+        try:
+            self.vehicles_repo.update_vehicle(vehicle)
+        except ValueError:
+            raise NotFound("Vehicle not found") from None
+        except sqlite3.IntegrityError:
+            raise ServiceError("The license plate already exists") from None
+
+    def delete_vehicle(self, current_user: CurrentUser, vehicle_id: int) -> None:
+        require_staff(current_user)
+        self.get_vehicle(current_user, vehicle_id)
+        self.vehicles_repo.delete_vehicle(vehicle_id)
+
+    def _validate(self, vehicle: Vehicles) -> None:
+        if vehicle.year is not None and not validate_year(str(vehicle.year)):
+            raise ServiceError("The year is not valid")
+        if vehicle.mileage is not None and vehicle.mileage < 0:
+            raise ServiceError("The mileage is not valid")
+        if vehicle.daily_rate is not None and not validate_price(
+            f"{vehicle.daily_rate:.2f}"
+        ):
+            raise ServiceError("The daily rate is not valid")
+        if vehicle.status and vehicle.status not in VEHICLE_STATUSES:
+            raise ServiceError("The status is not valid")
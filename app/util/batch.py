@@ -0,0 +1,279 @@
+import shlex
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from globals import CurrentUser
+from repository.customers import Customers
+from repository.staff import Staff
+from repository.vehicles import Vehicles
+from rich import print
+from service.customers import CustomerService
+from service.errors import ServiceError
+from service.profile import ProfileService
+from service.rentals import RentalService
+from service.staff import StaffService
+from service.vehicles import VehicleService
+from util.importer import MAX_ERRORS, to_customer, to_vehicle
+from util.validation import validate_digit, validate_price
+
+VEHICLE_FIELDS = (
+    "make",
+    "model",
+    "year",
+    "license_plate",
+    "mileage",
+    "daily_rate",
+    "description",
+    "status",
+)
+CUSTOMER_FIELDS = ("full_name", "email", "phone", "address", "driver_license")
+STAFF_FIELDS = ("full_name", "email")
+ACCOUNT_FIELDS = ("username", "password")
+
+
+@dataclass
+class BatchResult:
+    commands: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def commands_per_second(self) -> float:
+        return self.commands / self.seconds if self.seconds else 0.0
+
+
+def parse_line(line: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Splits a batch line like ``/vehicle delete vehicle_id=7`` into the
+    command name ("vehicle delete") and its arguments. Values with spaces
+    are quoted like in a shell.
+    """
+    words = shlex.split(line)
+    if len(words) < 2:
+        raise ValueError(f"Incomplete command: {line.strip()}")
+    args = {}
+    for word in words[2:]:
+        name, sep, value = word.partition("=")
+        if not sep:
+            raise ValueError(f"Argument is not name=value: {word}")
+        args[name] = value
+    return f"{words[0].lstrip('/')} {words[1]}", args
+
+
+def _integer(args: Dict[str, str], name: str, required: bool = True):
+    text = args.get(name, "")
+    if not text:
+        if required:
+            raise ValueError(f"{name} is missing")
+        return None
+    if not validate_digit(text):
+        raise ValueError(f"{name} is not valid: {text}")
+    return int(text)
+
+
+def _price(args: Dict[str, str], name: str) -> Optional[float]:
+    text = args.get(name, "")
+    if not text:
+        return None
+    if not validate_price(text):
+        raise ValueError(f"{name} is not valid: {text}")
+    return float(text)
+
+
+def _date(args: Dict[str, str], name: str) -> Optional[date]:
+    text = args.get(name, "")
+    try:
+        return date.fromisoformat(text) if text else None
+    except ValueError:
+        raise ValueError(f"{name} is not valid: {text}") from None
+
+
+class BatchRunner:
+    """
+    Runs CLI commands from a file without prompts, through the same
+    services as the interactive commands. Each command is one line of
+    ``/command subcommand name=value ...``.
+    """
+
+    def __init__(self):
+        self.vehicles = VehicleService()
+        self.customers = CustomerService()
+        self.staff = StaffService()
+        self.rentals = RentalService()
+        self.profile = ProfileService()
+        # Command name: (accepted arguments, handler)
+        self.commands: Dict[str, Tuple[Tuple[str, ...], Callable]] = {
+            "vehicle add": (VEHICLE_FIELDS, self.add_vehicle),
+            "vehicle update": (("vehicle_id",) + VEHICLE_FIELDS, self.update_vehicle),
+            "vehicle delete": (("vehicle_id",), self.delete_vehicle),
+            "customer add": (CUSTOMER_FIELDS + ACCOUNT_FIELDS, self.add_customer),
+            "customer update": (
+                ("customer_id",) + CUSTOMER_FIELDS,
+                self.update_customer,
+            ),
+            "customer delete": (("customer_id",), self.delete_customer),
+            "staff add": (STAFF_FIELDS + ACCOUNT_FIELDS, self.add_staff),
+            "staff update": (("staff_id",) + STAFF_FIELDS, self.update_staff),
+            "staff delete": (("staff_id",), self.delete_staff),
+            "rental add": (("vehicle_id", "customer_id", "days"), self.add_rental),
+            "rental book": (("vehicle_id", "days", "start_date"), self.book_rental),
+            "rental complete": (
+                ("rental_id", "return_mileage"),
+                self.complete_rental,
+            ),
+            "rental cancel": (("rental_id",), self.cancel_rental),
+            "rental audit": (("rental_id", "status"), self.audit_rental),
+            "profile update": (CUSTOMER_FIELDS, self.update_profile),
+            "profile password": (
+                ("current_password", "new_password"),
+                self.change_password,
+            ),
+        }
+
+    def run(self, current_user: CurrentUser, line: str) -> None:
+        """Runs one batch line. Raises ValueError or ServiceError on failure."""
+        name, args = parse_line(line)
+        if name not in self.commands:
+            raise ValueError(f"Unknown command: /{name}")
+        accepted, handler = self.commands[name]
+        unknown = set(args) - set(accepted)
+        if unknown:
+            raise ValueError(f"Unknown arguments: {', '.join(sorted(unknown))}")
+        handler(current_user, args)
+
+    def run_lines(self, current_user: CurrentUser, lines: Iterable[str]) -> BatchResult:
+        """
+        Runs every line that is not blank or a # comment. A failed command
+        is reported and skipped, the remaining commands still run.
+        """
+        result = BatchResult()
+        started = time.perf_counter()
+        for number, line in enumerate(lines, 1):
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            result.commands += 1
+            try:
+                self.run(current_user, line)
+                result.succeeded += 1
+            except (ValueError, ServiceError, sqlite3.Error) as e:
+                result.failed += 1
+                if len(result.errors) < MAX_ERRORS:
+                    result.errors.append(f"Line {number}: {e}")
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def run_file(self, current_user: CurrentUser, path: str) -> BatchResult:
+        with open(path, encoding="utf-8") as file:
+            return self.run_lines(current_user, file)
+
+    def add_vehicle(self, current_user: CurrentUser, args: Dict[str, str]):
+        self.vehicles.add_vehicle(current_user, to_vehicle(args))
+
+    def update_vehicle(self, current_user: CurrentUser, args: Dict[str, str]):
+        vehicle = Vehicles(
+            vehicle_id=_integer(args, "vehicle_id"),
+            make=args.get("make", ""),
+            model=args.get("model", ""),
+            year=_integer(args, "year", required=False),
+            license_plate=args.get("license_plate", ""),
+            mileage=_integer(args, "mileage", required=False),
+            daily_rate=_price(args, "daily_rate"),
+            description=args.get("description", ""),
+            status=args.get("status", ""),
+        )
+        self.vehicles.update_vehicle(current_user, vehicle)
+
+    def delete_vehicle(self, current_user: CurrentUser, args: Dict[str, str]):
+        self.vehicles.delete_vehicle(current_user, _integer(args, "vehicle_id"))
+
+    def add_customer(self, current_user: CurrentUser, args: Dict[str, str]):
+        self.customers.add_customer(
+            current_user,
+            to_customer(args),
+            args.get("username", ""),
+            args.get("password", ""),
+        )
+
+    def update_customer(self, current_user: CurrentUser, args: Dict[str, str]):
+        customer = Customers(
+            customer_id=_integer(args, "customer_id"),
+            **{name: args.get(name) for name in CUSTOMER_FIELDS},
+        )
+        self.customers.update_customer(current_user, customer)
+
+    def delete_customer(self, current_user: CurrentUser, args: Dict[str, str]):
+        self.customers.delete_customer(current_user, _integer(args, "customer_id"))
+
+    def add_staff(self, current_user: CurrentUser, args: Dict[str, str]):
+        staff = Staff(full_name=args.get("full_name"), email=args.get("email"))
+        self.staff.add_staff(
+            current_user, staff, args.get("username", ""), args.get("password", "")
+        )
+
+    def update_staff(self, current_user: CurrentUser, args: Dict[str, str]):
+        staff = Staff(
+            staff_id=_integer(args, "staff_id"),
+            full_name=args.get("full_name"),
+            email=args.get("email"),
+        )
+        self.staff.update_staff(current_user, staff)
+
+    def delete_staff(self, current_user: CurrentUser, args: Dict[str, str]):
+        self.staff.delete_staff(current_user, _integer(args, "staff_id"))
+
+    def add_rental(self, current_user: CurrentUser, args: Dict[str, str]):
+        self.rentals.add_rental(
+            current_user,
+            _integer(args, "vehicle_id"),
+            _integer(args, "customer_id"),
+            _integer(args, "days"),
+        )
+
+    def book_rental(self, current_user: CurrentUser, args: Dict[str, str]):
+        self.rentals.book_rental(
+            current_user,
+            _integer(args, "vehicle_id"),
+            _integer(args, "days"),
+            _date(args, "start_date"),
+        )
+
+    def complete_rental(self, current_user: CurrentUser, args: Dict[str, str]):
+        self.rentals.complete_rental(
+            current_user, _integer(args, "rental_id"), _integer(args, "return_mileage")
+        )
+
+    def cancel_rental(self, current_user: CurrentUser, args: Dict[str, str]):
+        self.rentals.cancel_rental(current_user, _integer(args, "rental_id"))
+
+    def audit_rental(self, current_user: CurrentUser, args: Dict[str, str]):
+        self.rentals.audit_rental(
+            current_user, _integer(args, "rental_id"), args.get("status", "")
+        )
+
+    def update_profile(self, current_user: CurrentUser, args: Dict[str, str]):
+        if current_user.role_name == "customer":
+            profile = Customers(**{name: args.get(name) for name in CUSTOMER_FIELDS})
+        else:
+            profile = Staff(full_name=args.get("full_name"), email=args.get("email"))
+        self.profile.update_profile(current_user, profile)
+
+    def change_password(self, current_user: CurrentUser, args: Dict[str, str]):
+        self.profile.change_password(
+            current_user, args.get("current_password", ""), args.get("new_password", "")
+        )
+
+
+def print_result(result: BatchResult) -> None:
+    """Prints the summary of a batch run."""
+    for error in result.errors:
+        print(f"[yellow]{error}[/yellow]")
+    print(
+        f"[green]Ran {result.succeeded} of {result.commands} commands "
+        f"({result.failed} failed) in {result.seconds:.2f}s, "
+        f"{result.commands_per_second:,.0f} commands/s[/green]"
+    )
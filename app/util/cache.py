@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable
+
+MISSING = object()
+
+
+class LRUCache:
+    """A thread-safe, size-bounded LRU cache whose entries expire after ttl seconds."""
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 60.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        CACHES[name] = self
+
+    def get(self, key: Hashable):
+        """Returns the cached value, or MISSING if absent or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return MISSING
+
+    def get_or_load(self, key: Hashable, load: Callable[[], object], bypass=False):
+        """
+        Returns the cached value, calling load() on a miss.
+        None results are not cached, so a later insert is seen at once.
+        With bypass=True the cache is neither read nor filled.
+        """
+        if bypass:
+            return load()
+        value = self.get(key)
+        if value is MISSING:
+            value = load()
+            if value is not None:
+                self.set(key, value)
+        return value
+
+    def set(self, key: Hashable, value) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+# Every cache by name, for statistics
+CACHES: Dict[str, LRUCache] = {}
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Returns the hit/miss counters and size of every cache."""
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+
+def clear_caches() -> None:
+    """Empties every cache, e.g. after switching to another database."""
+    for cache in CACHES.values():
+        cache.clear()
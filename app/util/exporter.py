@@ -0,0 +1,172 @@
+import gzip
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import IO, Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from repository.customers import CustomerRow, CustomersRepository
+from repository.rentals import RentalExport, RentalsRepository
+from repository.vehicles import VehicleRow, VehiclesRepository
+from rich import print
+from util.output import write_rows
+from util.validation import get_validated_input, validate_day
+
+# Formats by file extension; a further .gz compresses the file
+EXPORT_FORMATS = {".csv": "csv", ".jsonl": "jsonl"}
+
+# The level of the gzip command, a fraction of the time of the maximum 9
+GZIP_LEVEL = 6
+
+
+@dataclass
+class ExportResult:
+    path: str
+    rows: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.bytes / 2**20 / self.seconds if self.seconds else 0.0
+
+
+def _rentals(start: Optional[str], end: Optional[str]) -> Iterable[Tuple]:
+    return RentalsRepository().export_rentals(start, end)
+
+
+def _customers(start: Optional[str], end: Optional[str]) -> Iterable[Tuple]:
+    return CustomersRepository().export_customers(start, end)
+
+
+def _vehicles(start: Optional[str], end: Optional[str]) -> Iterable[Tuple]:
+    if start or end:
+        raise ValueError("Vehicles have no date to filter by")
+    return VehiclesRepository().export_vehicles()
+
+
+# Rows and field names of every exportable table. Rentals are filtered by
+# start date and customers by the date they were created.
+EXPORTERS: Dict[
+    str, Tuple[Callable[[Optional[str], Optional[str]], Iterable[Tuple]], Sequence]
+] = {
+    "rentals": (_rentals, RentalExport._fields),
+    "vehicles": (_vehicles, VehicleRow._fields),
+    "customers": (_customers, CustomerRow._fields),
+}
+
+
+def export_format(path: str) -> str:
+    """The format of an export file by its extension, e.g. csv for x.csv.gz."""
+    name = path[: -len(".gz")] if path.endswith(".gz") else path
+    extension = os.path.splitext(name)[1].lower()
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(f"Export files end with .csv or .jsonl, not: {path}")
+    return EXPORT_FORMATS[extension]
+
+
+def open_export(path: str, compress: bool) -> IO[str]:
+    if compress:
+        return gzip.open(
+            path, "wt", compresslevel=GZIP_LEVEL, encoding="utf-8", newline=""
+        )
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def _counted(rows: Iterable[Tuple], result: ExportResult) -> Iterator[Tuple]:
+    for row in rows:
+        result.rows += 1
+        yield row
+
+
+def export_file(
+    table: str,
+    path: str,
+    first: Optional[date] = None,
+    last: Optional[date] = None,
+) -> ExportResult:
+    """
+    Exports one of the EXPORTERS tables to a CSV or JSONL file, gzipped if
+    the path ends with .gz, from first to last (both included). Rows are
+    written as they are read from the cursor, so memory use does not grow
+    with the table. The file only appears once it is complete; a database
+    error while reading raises sqlite3.Error and leaves no file behind.
+    """
+    if table not in EXPORTERS:
+        raise ValueError(f"Unknown export table: {table}")
+    output = export_format(path)
+    read, fields = EXPORTERS[table]
+    rows = read(
+        first.isoformat() if first else None,
+        (last + timedelta(days=1)).isoformat() if last else None,
+    )
+    result = ExportResult(path)
+    started = time.perf_counter()
+    partial = path + ".part"
+    try:
+        with open_export(partial, path.endswith(".gz")) as file:
+            write_rows(_counted(rows, result), fields, output, file)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    result.seconds = time.perf_counter() - started
+    result.bytes = os.path.getsize(path)
+    return result
+
+
+def _is_export_path(path: str) -> bool:
+    try:
+        export_format(path)
+    except ValueError:
+        return False
+    return True
+
+
+def prompt_export(table: str) -> None:
+    """Asks for the file and dates of an export, then runs it."""
+    path = get_validated_input(
+        "Enter the CSV or JSONL file path, add .gz to compress it",
+        "The file should end with .csv, .jsonl, .csv.gz or .jsonl.gz",
+        _is_export_path,
+    )
+    first = last = ""
+    if table != "vehicles":
+        first = get_validated_input(
+            "Enter the first date (YYYY-MM-DD), or nothing for all",
+            "The date is not valid",
+            validate_day,
+            optional=True,
+        )
+        last = get_validated_input(
+            "Enter the last date (YYYY-MM-DD), or nothing for all",
+            "The date is not valid",
+            validate_day,
+            optional=True,
+        )
+    try:
+        result = export_file(
+            table,
+            path,
+            date.fromisoformat(first) if first else None,
+            date.fromisoformat(last) if last else None,
+        )
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"[red]{e}[/red]")
+        return
+    print_result(result)
+
+
+def print_result(result: ExportResult) -> None:
+    """Prints the summary of an export."""
+    print(
+        f"[green]Exported {result.rows} rows to {result.path} "
+        f"({result.bytes / 2**20:.1f} MiB) in {result.seconds:.2f}s, "
+        f"{result.rows_per_second:,.0f} rows/s, "
+        f"{result.megabytes_per_second:.1f} MiB/s[/green]"
+    )
@@ -0,0 +1,277 @@
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from repository.accounts import AccountsRepository
+from repository.customers import Customers, CustomersRepository
+from repository.rentals import Rentals, RentalsRepository
+from repository.staff import Staff
+from repository.users import Users
+from repository.vehicles import Vehicles, VehiclesRepository
+from rich import print
+from util.validation import (
+    validate_digit,
+    validate_email,
+    validate_phone,
+    validate_price,
+    validate_year,
+)
+
+CHUNK_SIZE = 5000
+
+# Only the first few bad rows are reported, a large file may have thousands
+MAX_ERRORS = 10
+
+VEHICLE_STATUSES = ("available", "rented", "maintenance")
+RENTAL_STATUSES = ("apply", "active", "reject", "completed", "cancelled")
+
+# Role ids of the seeded roles table
+ROLE_IDS = {"staff": 1, "customer": 2}
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    imported: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def read_records(path: str) -> Iterator[Tuple[int, Union[str, Dict[str, object]]]]:
+    """
+    Yields the line number and record of every row of a CSV file with a
+    header line, or of a JSONL file. JSONL lines are yielded as text and
+    decoded by to_record(), so a bad line only skips its own row.
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.endswith((".jsonl", ".json")):
+            for number, line in enumerate(file, 1):
+                if line.strip():
+                    yield number, line
+        else:
+            reader = csv.DictReader(file)
+            for record in reader:
+                yield reader.line_num, record
+
+
+def to_record(row: Union[str, Dict[str, object]]) -> Dict[str, object]:
+    """The record of a CSV row, or of a JSONL line, which must be an object."""
+    if isinstance(row, str):
+        try:
+            row = json.loads(row)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"not valid JSON: {e}") from None
+    if not isinstance(row, dict):
+        raise ValueError("not a JSON object")
+    return row
+
+
+def chunked(records: Iterable, size: int) -> Iterator[list]:
+    """Splits records into lists of at most size items."""
+    iterator = iter(records)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _text(record: Dict[str, object], name: str, required: bool = True) -> str:
+    value = record.get(name)
+    text = "" if value is None else str(value).strip()
+    if required and not text:
+        raise ValueError(f"{name} is missing")
+    return text
+
+
+def _integer(record: Dict[str, object], name: str, default: Optional[int] = None):
+    text = _text(record, name, required=default is None)
+    if not text:
+        return default
+    if not validate_digit(text):
+        raise ValueError(f"{name} is not valid: {text}")
+    return int(text)
+
+
+def _price(record: Dict[str, object], name: str) -> float:
+    value = record.get(name)
+    # JSON numbers lose their trailing zeros, e.g. 45.50 is read as 45.5
+    text = f"{value:.2f}" if isinstance(value, (int, float)) else _text(record, name)
+    if not validate_price(text):
+        raise ValueError(f"{name} is not valid: {text}")
+    return float(text)
+
+
+def _datetime(record: Dict[str, object], name: str, required: bool = True):
+    text = _text(record, name, required)
+    if not text:
+        return None
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"{name} is not valid: {text}") from None
+
+
+def _choice(record: Dict[str, object], name: str, choices, default: str) -> str:
+    text = _text(record, name, required=False) or default
+    if text not in choices:
+        raise ValueError(f"{name} is not valid: {text}")
+    return text
+
+
+def to_vehicle(record: Dict[str, object]) -> Vehicles:
+    year = _text(record, "year")
+    if not validate_year(year):
+        raise ValueError(f"year is not valid: {year}")
+    return Vehicles(
+        make=_text(record, "make"),
+        model=_text(record, "model"),
+        year=int(year),
+        license_plate=_text(record, "license_plate"),
+        mileage=_integer(record, "mileage", default=0),
+        daily_rate=_price(record, "daily_rate"),
+        description=_text(record, "description", required=False),
+        status=_choice(record, "status", VEHICLE_STATUSES, "available"),
+    )
+
+
+def to_customer(record: Dict[str, object]) -> Customers:
+    email = _text(record, "email", required=False)
+    if email and not validate_email(email):
+        raise ValueError(f"email is not valid: {email}")
+    phone = _text(record, "phone", required=False)
+    if phone and not validate_phone(phone):
+        raise ValueError(f"phone is not valid: {phone}")
+    return Customers(
+        full_name=_text(record, "full_name"),
+        email=email or None,
+        phone=phone or None,
+        address=_text(record, "address", required=False) or None,
+        driver_license=_text(record, "driver_license", required=False) or None,
+    )
+
+
+def to_rental(record: Dict[str, object]) -> Rentals:
+    rental = Rentals(
+        vehicle_id=_integer(record, "vehicle_id"),
+        customer_id=_integer(record, "customer_id"),
+        staff_id=_integer(record, "staff_id", default=0) or None,
+        start_date=_datetime(record, "start_date"),
+        expected_return_date=_datetime(record, "expected_return_date"),
+        actual_return_date=_datetime(record, "actual_return_date", required=False),
+        initial_mileage=_integer(record, "initial_mileage", default=0),
+        return_mileage=_integer(record, "return_mileage", default=0) or None,
+    )
+    if rental.expected_return_date <= rental.start_date:
+        raise ValueError("expected_return_date is not after start_date")
+    # A rental with a return date has already finished
+    rental.rental_status = _choice(
+        record,
+        "rental_status",
+        RENTAL_STATUSES,
+        "completed" if rental.actual_return_date else "active",
+    )
+    if _text(record, "total_cost", required=False):
+        rental.total_cost = _price(record, "total_cost")
+    return rental
+
+
+def to_account(record: Dict[str, object]) -> Tuple[Users, Union[Customers, Staff]]:
+    role = _choice(record, "role", ROLE_IDS, "customer")
+    user = Users(
+        username=_text(record, "username"),
+        password=_text(record, "password"),
+        role_id=ROLE_IDS[role],
+    )
+    if role == "staff":
+        email = _text(record, "email")
+        if not validate_email(email):
+            raise ValueError(f"email is not valid: {email}")
+        return user, Staff(full_name=_text(record, "full_name"), email=email)
+    return user, to_customer(record)
+
+
+# Row converter, repository and bulk insert method of every importable table,
+# and the error of the rows it rejects if it reports them
+IMPORTERS = {
+    "vehicles": (to_vehicle, VehiclesRepository, "add_vehicles", None),
+    "customers": (to_customer, CustomersRepository, "add_customers", None),
+    "rentals": (
+        to_rental,
+        RentalsRepository,
+        "add_rentals",
+        "unknown vehicle or customer, or the vehicle is booked for these dates",
+    ),
+    "accounts": (to_account, AccountsRepository, "add_accounts", None),
+}
+
+
+def import_records(
+    records: Iterable[Tuple[int, Union[str, Dict[str, object]]]],
+    convert: Callable[[Dict[str, object]], object],
+    insert: Callable[..., int],
+    chunk_size: int = CHUNK_SIZE,
+    rejection: Optional[str] = None,
+) -> ImportResult:
+    """
+    Validates records, given with their line numbers as by read_records(),
+    and inserts them chunk by chunk. The bulk insert methods of the
+    repositories run each chunk in its own transaction. Invalid rows and
+    rows that already exist are skipped. With a rejection error, insert
+    also reports the positions of the rows it rejects, which are listed
+    with that error.
+    """
+    result = ImportResult()
+    started = time.perf_counter()
+
+    def error(number: int, message: object) -> None:
+        if len(result.errors) < MAX_ERRORS:
+            result.errors.append(f"Line {number}: {message}")
+
+    for chunk in chunked(records, chunk_size):
+        rows, numbers = [], []
+        for number, record in chunk:
+            result.rows += 1
+            try:
+                rows.append(convert(to_record(record)))
+                numbers.append(number)
+            except (ValueError, TypeError) as e:
+                error(number, e)
+        if not rows:
+            continue
+        if rejection is None:
+            result.imported += insert(rows)
+            continue
+        rejected: List[int] = []
+        result.imported += insert(rows, rejected)
+        for index in rejected:
+            error(numbers[index], rejection)
+    result.skipped = result.rows - result.imported
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def import_file(table: str, path: str, chunk_size: int = CHUNK_SIZE) -> ImportResult:
+    """Imports a CSV or JSONL file into one of the IMPORTERS tables."""
+    if table not in IMPORTERS:
+        raise ValueError(f"Unknown import table: {table}")
+    convert, repo_class, method, rejection = IMPORTERS[table]
+    insert = getattr(repo_class(), method)
+    return import_records(read_records(path), convert, insert, chunk_size, rejection)
+
+
+def print_result(result: ImportResult) -> None:
+    """Prints the summary of an import."""
+    for error in result.errors:
+        print(f"[yellow]{error}[/yellow]")
+    print(
+        f"[green]Imported {result.imported} of {result.rows} rows "
+        f"({result.skipped} skipped) in {result.seconds:.2f}s, "
+        f"{result.rows_per_second:,.0f} rows/s[/green]"
+    )
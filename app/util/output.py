@@ -0,0 +1,66 @@
+import csv
+import json
+import sys
+from typing import IO, Iterable, Optional, Sequence, Tuple
+
+# Output formats of the list commands. "table" renders a rich table one
+# page at a time; the others stream every row as one line of text.
+FORMATS = ("table", "plain", "csv", "jsonl")
+TABLE = "table"
+
+
+def split_format(command: str) -> Tuple[str, str]:
+    """
+    Removes a ``--format NAME`` or ``--format=NAME`` option from a command
+    line such as "/rental list --format csv" and returns the rest of the
+    line and the format, "table" if there is none.
+    """
+    words = command.split()
+    output = TABLE
+    rest = []
+    i = 0
+    while i < len(words):
+        word = words[i]
+        if word == "--format":
+            if i + 1 == len(words):
+                raise ValueError("--format needs one of: " + ", ".join(FORMATS))
+            output = words[i + 1]
+            i += 2
+            continue
+        if word.startswith("--format="):
+            output = word.partition("=")[2]
+        else:
+            rest.append(word)
+        i += 1
+    if output not in FORMATS:
+        raise ValueError(f"Unknown format: {output}, use one of: " + ", ".join(FORMATS))
+    return " ".join(rest), output
+
+
+def _jsonl(fields: Sequence[str], rows: Iterable[Sequence]) -> Iterable[str]:
+    encode = json.JSONEncoder(default=str).encode
+    for row in rows:
+        yield encode(dict(zip(fields, row, strict=True))) + "\n"
+
+
+def write_rows(
+    rows: Iterable[Sequence],
+    fields: Sequence[str],
+    output: str,
+    file: Optional[IO[str]] = None,
+) -> None:
+    """
+    Writes rows as they are read, so a whole table takes constant memory:
+    plain is tab-separated values, csv has a header line and jsonl is one
+    JSON object per row with the fields as keys.
+    """
+    file = file or sys.stdout
+    if output == "jsonl":
+        file.writelines(_jsonl(fields, rows))
+        return
+    if output == "csv":
+        writer = csv.writer(file, lineterminator="\n")
+        writer.writerow(fields)
+    else:
+        writer = csv.writer(file, delimiter="\t", lineterminator="\n")
+    writer.writerows(rows)
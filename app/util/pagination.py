@@ -0,0 +1,77 @@
+import shutil
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from rich.prompt import Confirm
+
+PAGE_SIZE = 50
+
+# Lines of a table page that are not rows: borders, header and the prompt
+TABLE_LINES = 6
+
+
+def keyset_pages(
+    fetch_page: Callable[[Optional[int], int], List[Tuple]],
+    page_size: int = PAGE_SIZE,
+) -> Iterator[Tuple[List[Tuple], bool]]:
+    """
+    Yields (rows, has_more) pages from fetch_page(last_key, limit).
+    last_key is the first column of the last row of the previous page,
+    or None for the first page, so each page is a single index seek.
+    """
+    last_key = None
+    while True:
+        # Fetch one extra row to know whether there is another page
+        rows = fetch_page(last_key, page_size + 1)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        yield rows, has_more
+        if not has_more:
+            return
+        last_key = rows[-1][0]
+
+
+def viewport_size() -> int:
+    """
+    The number of table rows that fit the terminal, at most PAGE_SIZE.
+    Rich measures every cell of a table before it prints any, so tables are
+    never larger than a screen.
+    """
+    lines = shutil.get_terminal_size().lines - TABLE_LINES
+    return max(1, min(PAGE_SIZE, lines))
+
+
+def _show(
+    pages: Iterable[Tuple[List[Tuple], bool]], display: Callable[[List[Tuple]], None]
+) -> None:
+    for rows, has_more in pages:
+        display(rows)
+        if not has_more or not Confirm.ask("Show more?", default=True):
+            return
+
+
+def show_pages(
+    fetch_page: Callable[[Optional[int], int], List[Tuple]],
+    display: Callable[[List[Tuple]], None],
+    page_size: Optional[int] = None,
+) -> None:
+    """
+    Displays pages one at a time and only fetches the next one on request.
+    Pages fit the terminal unless page_size is given.
+    """
+    _show(keyset_pages(fetch_page, page_size or viewport_size()), display)
+
+
+def show_rows(
+    rows: Sequence,
+    display: Callable[[Sequence], None],
+    page_size: Optional[int] = None,
+) -> None:
+    """Displays rows that are already loaded one page at a time."""
+    size = page_size or viewport_size()
+    _show(
+        (
+            (rows[start : start + size], start + size < len(rows))
+            for start in range(0, max(len(rows), 1), size)
+        ),
+        display,
+    )
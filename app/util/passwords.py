@@ -0,0 +1,51 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Optional, Sequence
+
+import bcrypt
+
+DEFAULT_ROUNDS = 12
+
+
+def bcrypt_rounds() -> int:
+    """
+    Work factor of new password hashes, from ``CRS_BCRYPT_ROUNDS``.
+    Each extra round doubles the time to hash or check a password.
+    """
+    rounds = int(os.environ.get("CRS_BCRYPT_ROUNDS", DEFAULT_ROUNDS))
+    if not 4 <= rounds <= 31:
+        raise ValueError(f"CRS_BCRYPT_ROUNDS must be between 4 and 31: {rounds}")
+    return rounds
+
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    """Hashes a password with a new salt."""
+    salt = bcrypt.gensalt(rounds or bcrypt_rounds())
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+def check_password(password: str, hashed: str) -> bool:
+    """Checks a password against its hash."""
+    return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+def hash_passwords(
+    passwords: Sequence[str], workers: Optional[int] = None
+) -> List[str]:
+    """
+    Hashes many passwords in a pool of worker processes, one per CPU core by
+    default. With a single password or CPU core, they are hashed in this
+    process instead.
+    """
+    rounds = bcrypt_rounds()
+    workers = workers or os.cpu_count() or 1
+    if len(passwords) < 2 or workers == 1:
+        return [hash_password(password, rounds) for password in passwords]
+
+    # A few tasks per worker keeps the pool busy without one message per hash
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(
+            pool.map(hash_password, passwords, repeat(rounds), chunksize=chunksize)
+        )
@@ -0,0 +1,129 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from typing import Dict, Optional
+
+from db import config
+from globals import CurrentUser
+from repository.sessions import SessionsRepository
+
+# Saved sessions last one shift by default
+DEFAULT_TTL = 8 * 60 * 60
+
+# Signing keys read from key files, by path
+_keys: Dict[str, bytes] = {}
+
+
+def session_ttl() -> int:
+    """Seconds a saved session stays valid (``CRS_SESSION_TTL``)."""
+    return int(os.environ.get("CRS_SESSION_TTL", DEFAULT_TTL))
+
+
+def session_path() -> str:
+    """File that keeps the session token between runs (``CRS_SESSION_PATH``)."""
+    return os.environ.get("CRS_SESSION_PATH", os.path.expanduser("~/.crs_session"))
+
+
+def _write_private(path: str, data: bytes) -> None:
+    # Only the owner may read tokens and keys
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as file:
+        file.write(data)
+
+
+def _secret() -> bytes:
+    """
+    Signing key of session tokens: ``CRS_SESSION_SECRET``, or a random key
+    kept next to the database file and created on first use.
+    """
+    secret = os.environ.get("CRS_SESSION_SECRET")
+    if secret:
+        return secret.encode("utf-8")
+    path = config.db_path() + ".key"
+    if path not in _keys:
+        try:
+            with open(path, "rb") as file:
+                _keys[path] = file.read()
+        except FileNotFoundError:
+            _keys[path] = secrets.token_bytes(32)
+            _write_private(path, _keys[path])
+    return _keys[path]
+
+
+def _encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload: str) -> bytes:
+    return hmac.new(_secret(), payload.encode("ascii"), hashlib.sha256).digest()
+
+
+def issue_token(user: CurrentUser, now: Optional[float] = None) -> str:
+    """Creates a signed token for the user that expires after session_ttl()."""
+    now = time.time() if now is None else now
+    claims = {
+        "uid": user.user_id,
+        "name": user.username,
+        "role": user.role_name,
+        "iat": now,
+        "exp": now + session_ttl(),
+    }
+    payload = _encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_encode(_sign(payload))}"
+
+
+def verify_token(token: str, now: Optional[float] = None) -> Optional[CurrentUser]:
+    """
+    Returns the user of a token, or None if its signature is wrong or it has
+    expired or been revoked.
+    """
+    payload, _, signature = token.strip().partition(".")
+    try:
+        if not hmac.compare_digest(_decode(signature), _sign(payload)):
+            return None
+        claims = json.loads(_decode(payload))
+    except (ValueError, UnicodeError):
+        return None
+
+    now = time.time() if now is None else now
+    if claims["exp"] <= now:
+        return None
+    if SessionsRepository().is_revoked(claims["uid"], claims["iat"]):
+        return None
+    return CurrentUser(
+        user_id=claims["uid"], username=claims["name"], role_name=claims["role"]
+    )
+
+
+def save_session(user: CurrentUser) -> None:
+    """Saves a token for the user, so the next run can skip the login."""
+    _write_private(session_path(), issue_token(user).encode("ascii"))
+
+
+def resume_session() -> Optional[CurrentUser]:
+    """Returns the user of the saved session, if it is still valid."""
+    try:
+        with open(session_path(), encoding="ascii") as file:
+            token = file.read()
+    except (OSError, UnicodeError):
+        return None
+    user = verify_token(token)
+    if user is None:
+        end_session()
+    return user
+
+
+def end_session() -> None:
+    """Removes the saved session."""
+    try:
+        os.remove(session_path())
+    except FileNotFoundError:
+        pass
@@ -27,9 +27,7 @@ def validate_phone(phone):
     return False
 
 
-def get_validated_input(
-    prompt, error, validator=None, optional=False, password=False
-):
+def get_validated_input(prompt, error, validator=None, optional=False, password=False):
     """Validates input with validator"""
     while True:
         value = Prompt.ask(prompt, password=password)
@@ -65,3 +63,21 @@ def validate_year(year: str) -> bool:
         return True
     except ValueError:
         return False
+
+
+def validate_date(value: str) -> bool:
+    """Validates if the given string is a YYYY-MM-DD date that is not in the past."""
+    try:
+        day = datetime.datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        return False
+    return day >= datetime.date.today()
+
+
+def validate_day(value: str) -> bool:
+    """Validates if the given string is a YYYY-MM-DD date."""
+    try:
+        datetime.datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return False
+    return True
@@ -0,0 +1,155 @@
+"""
+/report fleet over a large rental history: the columnar NumPy snapshot
+against the same metrics computed in Python loops over fetch_all tuples.
+
+Usage: python benchmarks/bench_analytics.py [vehicles] [rentals]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from db.database import Database  # noqa: E402
+from main import initialize  # noqa: E402
+from repository.rental_history import RentalHistoryRepository  # noqa: E402
+from service.analytics import FleetAnalyticsService  # noqa: E402
+
+PERIOD = (date(2025, 6, 1), date(2025, 6, 30))
+
+PYTHON_QUERY = """
+SELECT start_date, COALESCE(actual_return_date, expected_return_date),
+       rental_status, initial_mileage, return_mileage, total_cost
+FROM rentals
+"""
+
+
+def populate(db, vehicles, rentals):
+    random.seed(1)
+    db.execute_many(
+        "INSERT INTO vehicles (make, model, year, license_plate, mileage, daily_rate) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [("Make", "Model", 2022, f"BENCH{i}", 1000, 50) for i in range(vehicles)],
+    )
+    origin = datetime(2023, 1, 1)
+    batch = []
+    for _ in range(rentals):
+        start = origin + timedelta(minutes=random.randrange(3 * 365 * 24 * 60))
+        days = random.randint(1, 14)
+        # Only rentals of the last two weeks can still be active
+        if start > origin + timedelta(days=3 * 365 - 14):
+            status = random.choice(("active", "apply"))
+        else:
+            status = random.choice(("completed", "completed", "completed", "cancelled"))
+        batch.append(
+            (
+                random.randint(11, vehicles + 10),
+                1,
+                start,
+                start + timedelta(days=days),
+                status,
+                1000,
+                1000 + days * random.randint(20, 200),
+                days * 50,
+            )
+        )
+        if len(batch) == 100000:
+            insert_rentals(db, batch)
+            batch = []
+    insert_rentals(db, batch)
+
+
+def insert_rentals(db, batch):
+    with db.transaction():
+        db.execute_many(
+            "INSERT INTO rentals (vehicle_id, customer_id, start_date, "
+            "expected_return_date, rental_status, initial_mileage, return_mileage, "
+            "total_cost) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+
+
+def python_report(db, fleet_size):
+    """The fleet metrics with loops over fetch_all tuples."""
+    first = datetime.combine(PERIOD[0], datetime.min.time())
+    days = (PERIOD[1] - PERIOD[0]).days + 1
+    rented = [0.0] * days
+    durations, mileage, revenue = [], [], []
+    for start, end, status, initial, returned, cost in db.fetch_all(PYTHON_QUERY):
+        if status not in ("active", "completed"):
+            continue
+        start = datetime.fromisoformat(start)
+        end = datetime.fromisoformat(end)
+        first_day = max((start - first).days, 0)
+        last_day = min((end - first).days, days - 1)
+        for day in range(first_day, last_day + 1):
+            day_start = first + timedelta(days=day)
+            overlap = min(end, day_start + timedelta(days=1)) - max(start, day_start)
+            if overlap > timedelta(0):
+                rented[day] += overlap.total_seconds() / 86400
+        if not first <= start < first + timedelta(days=days):
+            continue
+        revenue.append(cost)
+        if status == "completed":
+            duration = (end - start).total_seconds() / 86400
+            durations.append(duration)
+            mileage.append((returned - initial) / max(-(-duration // 1), 1))
+    return (
+        [r / fleet_size for r in rented],
+        statistics.mean(durations),
+        statistics.median(durations),
+        statistics.quantiles(mileage, n=10),
+        sum(revenue),
+        statistics.quantiles(revenue, n=100),
+    )
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<44} {(time.perf_counter() - start) * 1e3:9.1f} ms")
+    return result
+
+
+def main():
+    vehicles = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rentals = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CRS_DB_PATH"] = os.path.join(tmp, "bench.db")
+        initialize()
+        db = Database()
+        populate(db, vehicles, rentals)
+        print(f"{vehicles} vehicles, {rentals} rentals")
+
+        timed("python loops over fetch_all", lambda: python_report(db, vehicles))
+
+        history = RentalHistoryRepository()
+        timed("snapshot: first build from SQLite", history.load)
+        timed("snapshot: refresh, nothing changed", history.load)
+        insert_rentals(
+            db,
+            [
+                (11, 1, datetime(2025, 6, 2), datetime(2025, 6, 4), "active")
+                + (1000, 1000, 100)
+            ]
+            * 1000,
+        )
+        timed("snapshot: refresh after 1000 new rentals", history.load)
+        columns = timed(
+            "snapshot: new instance reads the .npy files",
+            RentalHistoryRepository().load,
+        )
+        timed(
+            "numpy metrics",
+            lambda: FleetAnalyticsService.compute(columns, vehicles, *PERIOD),
+        )
+        Database.close_all()
+
+
+if __name__ == "__main__":
+    main()
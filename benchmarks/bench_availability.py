@@ -0,0 +1,131 @@
+"""
+Availability queries over a large fleet and rental history.
+
+Compares the rental_periods R*Tree with the same questions asked of the
+rentals table directly.
+
+Usage: python benchmarks/bench_availability.py [vehicles] [rentals]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from db.database import Database  # noqa: E402
+from main import initialize  # noqa: E402
+from repository.availability import AvailabilityRepository  # noqa: E402
+
+NAIVE_IS_AVAILABLE = """
+SELECT 1 FROM rentals
+WHERE vehicle_id = ? AND rental_status IN ('apply', 'active')
+  AND start_date < ? AND expected_return_date > ?
+LIMIT 1
+"""
+
+NAIVE_FREE_IDS = """
+SELECT vehicle_id FROM vehicles WHERE status != 'maintenance'
+EXCEPT
+SELECT vehicle_id FROM rentals
+WHERE rental_status IN ('apply', 'active')
+  AND start_date < ? AND expected_return_date > ?
+"""
+
+
+def populate(db, vehicles, rentals):
+    random.seed(1)
+    db.execute_many(
+        "INSERT INTO vehicles (make, model, year, license_plate, mileage, daily_rate) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [("Make", "Model", 2022, f"BENCH{i}", 1000, 50) for i in range(vehicles)],
+    )
+    origin = datetime(2024, 1, 1)
+    batch = []
+    for _ in range(rentals):
+        start = origin + timedelta(minutes=random.randrange(3 * 365 * 24 * 60))
+        end = start + timedelta(days=random.randint(1, 14))
+        status = random.choice(("completed", "completed", "active", "apply"))
+        batch.append((random.randint(11, vehicles + 10), 1, start, end, status))
+        if len(batch) == 100000:
+            insert_rentals(db, batch)
+            batch = []
+    insert_rentals(db, batch)
+
+
+def insert_rentals(db, batch):
+    with db.transaction():
+        db.execute_many(
+            "INSERT INTO rentals (vehicle_id, customer_id, start_date, "
+            "expected_return_date, rental_status) VALUES (?, ?, ?, ?, ?)",
+            batch,
+        )
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    vehicles = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rentals = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CRS_DB_PATH"] = os.path.join(tmp, "bench.db")
+        initialize()
+        db = Database()
+        repo = AvailabilityRepository()
+
+        start = time.perf_counter()
+        populate(db, vehicles, rentals)
+        print(
+            f"{vehicles} vehicles, {rentals} rentals loaded in "
+            f"{time.perf_counter() - start:.1f}s"
+        )
+
+        window_start = datetime(2025, 6, 1, 10)
+        window_end = window_start + timedelta(days=3)
+        vehicle_ids = [random.randint(11, vehicles + 10) for _ in range(1000)]
+
+        rtree_check, _ = timed(
+            lambda: [
+                repo.is_available(v, window_start, window_end) for v in vehicle_ids
+            ],
+            1,
+        )
+        naive_check, _ = timed(
+            lambda: [
+                db.fetch_one(NAIVE_IS_AVAILABLE, (v, window_end, window_start))
+                for v in vehicle_ids
+            ],
+            1,
+        )
+        rtree_busy, busy = timed(
+            lambda: repo.busy_vehicle_ids(window_start, window_end), 5
+        )
+        rtree_free, free = timed(
+            lambda: repo.free_vehicle_ids(window_start, window_end), 5
+        )
+        naive_free, _ = timed(
+            lambda: db.fetch_all(NAIVE_FREE_IDS, (window_end, window_start)), 1
+        )
+        Database.close_all()
+
+    print(
+        f"is_available (one vehicle):  rtree {rtree_check / 1000 * 1e6:9.1f} us"
+        f"   rentals table {naive_check / 1000 * 1e6:9.1f} us"
+    )
+    print(f"busy vehicles ({len(busy)} ids):  rtree {rtree_busy * 1e3:9.2f} ms")
+    print(
+        f"free vehicles ({len(free)} ids):  rtree {rtree_free * 1e3:9.1f} ms"
+        f"   rentals table {naive_free * 1e3:9.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
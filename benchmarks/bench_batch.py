@@ -0,0 +1,48 @@
+"""
+Throughput of --batch: adds vehicles, updates them, rents them out and
+returns them, all through the services without prompts.
+
+Usage: python benchmarks/bench_batch.py [vehicles]
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from db.database import Database  # noqa: E402
+from globals import CurrentUser  # noqa: E402
+from main import initialize  # noqa: E402
+from repository.customers import Customers, CustomersRepository  # noqa: E402
+from util.batch import BatchRunner, print_result  # noqa: E402
+
+
+def batch_lines(count):
+    for i in range(count):
+        yield (
+            f"/vehicle add make=Kia model=Rio year=2022 license_plate=BATCH{i} "
+            f'daily_rate=35.00 description="Batch vehicle {i}"'
+        )
+    # The seed data has 10 vehicles
+    for vehicle_id in range(11, count + 11):
+        yield f"/vehicle update vehicle_id={vehicle_id} mileage=1000"
+    for rental_id, vehicle_id in enumerate(range(11, count + 11), 1):
+        yield f"/rental add vehicle_id={vehicle_id} customer_id=1 days=3"
+        yield f"/rental complete rental_id={rental_id} return_mileage=1200"
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CRS_DB_PATH"] = os.path.join(tmp, "bench.db")
+        initialize()
+        CustomersRepository().add_customer(Customers(user_id=2, full_name="Bench"))
+        admin = CurrentUser(user_id=1, username="admin", role_name="staff")
+        result = BatchRunner().run_lines(admin, batch_lines(count))
+        Database.close_all()
+    print_result(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Per-query latency of connect-per-query versus the pooled Database.
+
+Usage: python benchmarks/bench_connection_pool.py [queries]
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from db.database import Database  # noqa: E402
+
+QUERY = "SELECT vehicle_id, make, model FROM vehicles WHERE vehicle_id = ?"
+
+
+@contextmanager
+def connect_per_query(db_path):
+    """The connection handling Database used before pooling."""
+    conn = sqlite3.connect(db_path)
+    try:
+        yield conn
+    finally:
+        conn.commit()
+        conn.close()
+
+
+def run_unpooled(db_path, n):
+    start = time.perf_counter()
+    for i in range(n):
+        with connect_per_query(db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(QUERY, (i % 100 + 1,))
+            cursor.fetchone()
+            cursor.close()
+    return time.perf_counter() - start
+
+
+def run_pooled(db, n):
+    start = time.perf_counter()
+    for i in range(n):
+        db.fetch_one(QUERY, (i % 100 + 1,))
+    return time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        db = Database(db_path)
+        db.execute(
+            "CREATE TABLE vehicles (vehicle_id INTEGER PRIMARY KEY, make TEXT, model TEXT)"
+        )
+        db.execute_many(
+            "INSERT INTO vehicles(make, model) VALUES(?, ?)",
+            [(f"make{i}", f"model{i}") for i in range(100)],
+        )
+
+        before = run_unpooled(db_path, n)
+        after = run_pooled(db, n)
+        Database.close_all()
+
+    print(f"queries:            {n}")
+    print(f"connect-per-query:  {before / n * 1e6:8.1f} us/query")
+    print(f"pooled connection:  {after / n * 1e6:8.1f} us/query")
+    print(f"speedup:            {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
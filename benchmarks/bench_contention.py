@@ -0,0 +1,105 @@
+"""
+Readers against writers on the rentals table, per pragma profile.
+
+Reader threads list rentals while writer threads insert rentals, each
+write in its own transaction. Reports throughput and the slowest read.
+
+Usage: python benchmarks/bench_contention.py [seconds] [readers] [writers]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from db.config import PRAGMA_PROFILES  # noqa: E402
+from db.database import Database  # noqa: E402
+from repository.rentals import Rentals, RentalsRepository  # noqa: E402
+
+READ_QUERY = """
+SELECT rental_id, vehicle_id, customer_id, rental_status, total_cost
+FROM rentals ORDER BY rental_id DESC LIMIT 50
+"""
+
+
+def new_rental(i):
+    start = datetime.now()
+    return Rentals(
+        vehicle_id=i % 10 + 1,
+        customer_id=1,
+        staff_id=1,
+        start_date=start,
+        expected_return_date=start + timedelta(days=3),
+        initial_mileage=1000,
+        rental_status="active",
+        total_cost=135,
+    )
+
+
+def run(profile, seconds, readers, writers):
+    os.environ["CRS_DB_PROFILE"] = profile
+    os.environ["CRS_DB_POOL_SIZE"] = str(readers + writers)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CRS_DB_PATH"] = os.path.join(tmp, "bench.db")
+        repo = RentalsRepository()
+        repo.create_table()
+        for i in range(1000):
+            repo.add_rental(new_rental(i))
+
+        stop = threading.Event()
+        reads, writes, slowest_read = [0], [0], [0.0]
+        lock = threading.Lock()
+
+        def reader():
+            db = Database()
+            count, worst = 0, 0.0
+            while not stop.is_set():
+                start = time.perf_counter()
+                db.fetch_all(READ_QUERY)
+                worst = max(worst, time.perf_counter() - start)
+                count += 1
+            with lock:
+                reads[0] += count
+                slowest_read[0] = max(slowest_read[0], worst)
+
+        def writer():
+            count = 0
+            while not stop.is_set():
+                with repo.db.transaction():
+                    repo.add_rental(new_rental(count))
+                count += 1
+            with lock:
+                writes[0] += count
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads += [threading.Thread(target=writer) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        Database.close_all()
+
+    print(
+        f"{profile:8} reads/s: {reads[0] / seconds:9.0f}  "
+        f"writes/s: {writes[0] / seconds:7.0f}  "
+        f"slowest read: {slowest_read[0] * 1000:7.1f} ms"
+    )
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    writers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    print(f"{readers} readers, {writers} writers, {seconds}s per profile")
+    for profile in PRAGMA_PROFILES:
+        run(profile, seconds, readers, writers)
+
+
+if __name__ == "__main__":
+    main()
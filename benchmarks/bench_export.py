@@ -0,0 +1,100 @@
+"""
+Exports of a large rentals table: streaming from the cursor to CSV, gzipped
+CSV and gzipped JSONL, against loading every row with fetch_all() before
+writing the same CSV, and a one-month export read through the start date
+index.
+
+Usage: python benchmarks/bench_export.py [rentals]
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from db.database import Database  # noqa: E402
+from main import initialize  # noqa: E402
+from repository.customers import Customers, CustomersRepository  # noqa: E402
+from repository.rentals import RentalExport, RentalsRepository  # noqa: E402
+from util.exporter import export_file  # noqa: E402
+
+
+def populate(db, rentals):
+    CustomersRepository().add_customer(
+        Customers(user_id=1, full_name="Bench", email="bench@example.com")
+    )
+    origin = datetime(2020, 1, 1)
+    batch = []
+    for i in range(rentals):
+        start = origin + timedelta(minutes=7 * i)
+        batch.append((i % 10 + 1, 1, start, start + timedelta(days=3), 90 + i % 50))
+        if len(batch) == 100000 or i == rentals - 1:
+            with db.transaction():
+                db.execute_many(
+                    "INSERT INTO rentals (vehicle_id, customer_id, start_date, "
+                    "expected_return_date, rental_status, total_cost) "
+                    "VALUES (?, ?, ?, ?, 'completed', ?)",
+                    batch,
+                )
+            batch = []
+
+
+def fetch_all_export(path):
+    """Every row in memory first, as with get_rental_details() and no limit."""
+    rows = list(RentalsRepository().export_rentals())
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(RentalExport._fields)
+        writer.writerows(rows)
+    return len(rows)
+
+
+def measured(run):
+    """Seconds of one run, then the peak memory of another, traced run."""
+    start = time.perf_counter()
+    rows = run()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, seconds, peak
+
+
+def main():
+    rentals = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CRS_DB_PATH"] = os.path.join(tmp, "bench.db")
+        initialize()
+        populate(Database(), rentals)
+
+        def out(name):
+            return os.path.join(tmp, name)
+
+        runs = {
+            "fetch_all, csv": lambda: fetch_all_export(out("all.csv")),
+            "stream, csv": lambda: export_file("rentals", out("r.csv")).rows,
+            "stream, csv.gz": lambda: export_file("rentals", out("r.csv.gz")).rows,
+            "stream, jsonl.gz": lambda: export_file("rentals", out("r.jsonl.gz")).rows,
+            "stream, one month": lambda: (
+                export_file(
+                    "rentals", out("month.csv"), date(2020, 6, 1), date(2020, 6, 30)
+                ).rows
+            ),
+        }
+        for label, run in runs.items():
+            rows, seconds, peak = measured(run)
+            print(
+                f"{label:<18} {rows:8} rows {seconds:7.2f} s "
+                f"{rows / seconds:9,.0f} rows/s {peak / 2**20:8.1f} MiB peak"
+            )
+        Database.close_all()
+
+
+if __name__ == "__main__":
+    main()
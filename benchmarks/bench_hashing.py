@@ -0,0 +1,38 @@
+"""
+Password hashing for bulk account creation: one hash after another on the
+calling thread, like add_user, versus hash_passwords on all CPU cores.
+
+Usage: python benchmarks/bench_hashing.py [passwords] [rounds]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from util.passwords import hash_password, hash_passwords  # noqa: E402
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    if len(sys.argv) > 2:
+        os.environ["CRS_BCRYPT_ROUNDS"] = sys.argv[2]
+    passwords = [f"password{i}" for i in range(count)]
+
+    start = time.perf_counter()
+    for password in passwords:
+        hash_password(password)
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hash_passwords(passwords)
+    pooled = time.perf_counter() - start
+
+    print(f"{count} passwords, {os.cpu_count()} CPU cores")
+    print(f"One by one:     {serial:6.2f}s ({count / serial:7.1f} hashes/s)")
+    print(f"Process pool:   {pooled:6.2f}s ({count / pooled:7.1f} hashes/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Bulk import of a generated vehicles CSV file through util.importer, versus
+adding the same vehicles one by one with add_vehicle like /vehicle add does.
+
+Usage: python benchmarks/bench_import.py [vehicles]
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from db.database import Database  # noqa: E402
+from main import initialize  # noqa: E402
+from repository.vehicles import Vehicles, VehiclesRepository  # noqa: E402
+from util.importer import import_file  # noqa: E402
+
+MAKES = [("Toyota", "Corolla"), ("Honda", "Civic"), ("Ford", "Focus"), ("BMW", "X5")]
+
+# Single inserts are slow, so only this many are timed and extrapolated
+ONE_BY_ONE = 2000
+
+
+def write_csv(path, vehicles):
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(
+            ["make", "model", "year", "license_plate", "mileage", "daily_rate"]
+        )
+        for i in range(vehicles):
+            make, model = MAKES[i % len(MAKES)]
+            writer.writerow(
+                [make, model, 2015 + i % 10, f"IMP{i:07d}", i % 90000, "45.00"]
+            )
+
+
+def main():
+    vehicles = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CRS_DB_PATH"] = os.path.join(tmp, "bench.db")
+        initialize()
+        path = os.path.join(tmp, "vehicles.csv")
+        write_csv(path, vehicles)
+
+        result = import_file("vehicles", path)
+
+        repo = VehiclesRepository()
+        start = time.perf_counter()
+        for i in range(ONE_BY_ONE):
+            repo.add_vehicle(
+                Vehicles(
+                    make="Toyota",
+                    model="Corolla",
+                    year=2020,
+                    license_plate=f"ONE{i:07d}",
+                    mileage=0,
+                    daily_rate=45.0,
+                )
+            )
+        one_by_one = (time.perf_counter() - start) / ONE_BY_ONE
+        Database.close_all()
+
+    print(
+        f"Bulk import:  {result.imported} vehicles in {result.seconds:.2f}s "
+        f"({result.rows_per_second:,.0f} rows/s)"
+    )
+    print(
+        f"add_vehicle:  {1 / one_by_one:,.0f} rows/s, "
+        f"~{one_by_one * vehicles:.1f}s for {vehicles} vehicles"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Login throughput of the blocking CLI path (user lookup, bcrypt check,
+last_login write and role lookup one after another) versus AuthService with
+many concurrent logins on one event loop.
+
+Usage: python benchmarks/bench_login.py [logins] [concurrency] [rounds]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from db.database import Database  # noqa: E402
+from main import initialize  # noqa: E402
+from repository.roles import RoleRepository  # noqa: E402
+from repository.users import Users, UsersRepository  # noqa: E402
+from service.auth import AuthService  # noqa: E402
+from util.passwords import check_password  # noqa: E402
+
+USERS = 100
+
+
+def blocking_login(users_repo, roles_repo, username, password):
+    user = users_repo.get_by_username(username)
+    if user and check_password(password, user.password):
+        users_repo.update_last_login(user.user_id)
+        return roles_repo.get_role(user.role_id)
+    return None
+
+
+async def async_logins(logins, concurrency):
+    async with AuthService() as auth:
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def login(i):
+            async with semaphore:
+                start = time.perf_counter()
+                await auth.login(f"user{i % USERS}", "password")
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(login(i) for i in range(logins)))
+    return sorted(latencies)
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    os.environ["CRS_BCRYPT_ROUNDS"] = sys.argv[3] if len(sys.argv) > 3 else "10"
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CRS_DB_PATH"] = os.path.join(tmp, "bench.db")
+        initialize()
+        users_repo = UsersRepository()
+        users_repo.add_users(
+            users_repo.prepare_users(
+                [
+                    Users(username=f"user{i}", password="password", role_id=2)
+                    for i in range(USERS)
+                ]
+            )
+        )
+
+        roles_repo = RoleRepository()
+        start = time.perf_counter()
+        for i in range(logins):
+            blocking_login(users_repo, roles_repo, f"user{i % USERS}", "password")
+        blocking = time.perf_counter() - start
+
+        start = time.perf_counter()
+        latencies = asyncio.run(async_logins(logins, concurrency))
+        service = time.perf_counter() - start
+        Database.close_all()
+
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(
+        f"{logins} logins, bcrypt rounds {os.environ['CRS_BCRYPT_ROUNDS']}, "
+        f"{os.cpu_count()} CPU cores"
+    )
+    print(f"Blocking CLI path: {logins / blocking:7.1f} logins/s")
+    print(
+        f"AuthService:       {logins / service:7.1f} logins/s at concurrency "
+        f"{concurrency} (p50 {p50 * 1e3:.0f} ms, p99 {p99 * 1e3:.0f} ms)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+/rental list over a large rentals table: one rich table of every row, as
+the list commands printed whole results before, against the streaming
+plain, csv and jsonl formats and a table page of the terminal's size.
+
+Usage: python benchmarks/bench_output.py [rentals] [table rows]
+"""
+
+import contextlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from command.rentals import RentalCommand  # noqa: E402
+from db.database import Database  # noqa: E402
+from globals import CurrentUser  # noqa: E402
+from main import initialize  # noqa: E402
+from repository.customers import Customers, CustomersRepository  # noqa: E402
+from util.pagination import viewport_size  # noqa: E402
+
+ADMIN = CurrentUser(user_id=1, username="admin", role_name="staff")
+
+
+def populate(db, rentals):
+    CustomersRepository().add_customer(Customers(user_id=1, full_name="Bench"))
+    origin = datetime(2023, 1, 1)
+    batch = []
+    for i in range(rentals):
+        start = origin + timedelta(hours=i)
+        batch.append((i % 10 + 1, 1, start, start + timedelta(days=3), 90))
+        if len(batch) == 100000 or i == rentals - 1:
+            with db.transaction():
+                db.execute_many(
+                    "INSERT INTO rentals (vehicle_id, customer_id, start_date, "
+                    "expected_return_date, rental_status, total_cost) "
+                    "VALUES (?, ?, ?, ?, 'completed', ?)",
+                    batch,
+                )
+            batch = []
+
+
+def measured(run):
+    """Seconds of one run, then the peak memory of another, traced run."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    rentals = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    table_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CRS_DB_PATH"] = os.path.join(tmp, "bench.db")
+        initialize()
+        db = Database()
+        populate(db, rentals)
+        command = RentalCommand()
+        service = command.rental_service
+
+        runs = {
+            f"rich table, {table_rows} rows": lambda: command.display_rental_table(
+                service.list_rentals(ADMIN, limit=table_rows)
+            ),
+            f"table page, {viewport_size()} rows": lambda: command.display_rental_table(
+                service.list_rentals(ADMIN, limit=viewport_size())
+            ),
+        }
+        for output in ("plain", "csv", "jsonl"):
+            runs[f"--format {output}, {rentals} rows"] = lambda output=output: (
+                command.list_rentals(ADMIN, output=output)
+            )
+        for label, run in runs.items():
+            seconds, peak = measured(run)
+            print(f"{label:<31} {seconds:8.2f} s {peak / 2**20:9.1f} MiB peak")
+        Database.close_all()
+
+
+if __name__ == "__main__":
+    main()
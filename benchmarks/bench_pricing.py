@@ -0,0 +1,84 @@
+"""
+Quotes for search results with a seasonal rate table: the compiled pricing
+engine against pricing every day of every candidate with Decimal.
+
+Usage: python benchmarks/bench_pricing.py [candidates]
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from service.pricing import PricingEngine, RateTable, Season  # noqa: E402
+
+RATES = RateTable(
+    weekend_percent=20,
+    seasons=(
+        Season("06-15", "08-31", 30),
+        Season("12-20", "01-05", 50),
+        Season("02-01", "03-15", -15),
+    ),
+    long_term=((7, 10), (30, 25)),
+)
+
+
+def naive_quote(daily_rate, start, days):
+    rate = Decimal(str(daily_rate))
+    total = Decimal(0)
+    for i in range(days):
+        day = start + timedelta(days=i)
+        percent = Decimal(0)
+        if day.weekday() >= 5:
+            percent += Decimal(str(RATES.weekend_percent))
+        month_day = day.strftime("%m-%d")
+        for season in RATES.seasons:
+            if season.contains(month_day):
+                percent += Decimal(str(season.percent))
+        total += rate * (100 + percent) / 100
+    total = total.quantize(Decimal("0.01"), ROUND_HALF_UP)
+    discount = Decimal(0)
+    for min_days, off in RATES.long_term:
+        if days >= min_days:
+            discount = total * Decimal(str(off)) / 100
+    return total - discount.quantize(Decimal("0.01"), ROUND_HALF_UP)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    random.seed(1)
+    candidates = [
+        (
+            random.choice((35, 45, 49.99, 60, 89.5, 120)),
+            date(2025, 1, 1) + timedelta(days=random.randrange(730)),
+            random.choice((1, 2, 3, 5, 7, 14, 30)),
+        )
+        for _ in range(count)
+    ]
+
+    start = time.perf_counter()
+    engine = PricingEngine(RATES)
+    compiled = time.perf_counter() - start
+    print(f"rate table compiled in {compiled * 1e3:.1f} ms")
+
+    start = time.perf_counter()
+    quotes = engine.quote_many(candidates)
+    fast = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = [naive_quote(*candidate) for candidate in candidates]
+    naive = time.perf_counter() - start
+
+    mismatches = sum(q.total != e for q, e in zip(quotes, expected, strict=True))
+    print(
+        f"{count} quotes  engine {fast * 1e3:.1f} ms   per-day Decimal {naive * 1e3:.1f} ms"
+    )
+    print(f"{mismatches} quotes differ")
+
+
+if __name__ == "__main__":
+    main()
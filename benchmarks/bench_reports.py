@@ -0,0 +1,141 @@
+"""
+Reports over years of rentals, from the summary tables kept by triggers
+and from the same questions asked of the rentals table directly.
+
+Usage: python benchmarks/bench_reports.py [vehicles] [rentals]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from functools import partial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from db.database import Database  # noqa: E402
+from main import initialize  # noqa: E402
+from repository.reports import ReportsRepository  # noqa: E402
+
+MAKES = ("Toyota", "Honda", "Ford", "Kia", "BMW")
+
+NAIVE_REVENUE = """
+SELECT v.vehicle_id, v.make, v.model, v.license_plate, COUNT(*), SUM(r.total_cost)
+FROM rentals r
+JOIN vehicles v ON v.vehicle_id = r.vehicle_id
+WHERE r.rental_status IN ('active', 'completed')
+  AND r.start_date >= ? AND r.start_date < ?
+GROUP BY r.vehicle_id
+ORDER BY 6 DESC
+"""
+
+NAIVE_UTILIZATION = """
+SELECT v.make, COUNT(DISTINCT v.vehicle_id), COUNT(r.rental_id),
+       COALESCE(SUM(julianday(COALESCE(r.actual_return_date, r.expected_return_date))
+                    - julianday(r.start_date)), 0) / COUNT(DISTINCT v.vehicle_id) / ?
+FROM vehicles v
+LEFT JOIN rentals r ON r.vehicle_id = v.vehicle_id
+     AND r.rental_status IN ('active', 'completed')
+     AND r.start_date >= ? AND r.start_date < ?
+GROUP BY v.make
+"""
+
+NAIVE_STATUS = "SELECT rental_status, COUNT(*) FROM rentals GROUP BY rental_status"
+
+
+def populate(db, vehicles, rentals):
+    random.seed(1)
+    db.execute_many(
+        "INSERT INTO vehicles (make, model, year, license_plate, mileage, daily_rate) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (random.choice(MAKES), "Model", 2022, f"BENCH{i}", 1000, 50)
+            for i in range(vehicles)
+        ],
+    )
+    origin = datetime(2023, 1, 1)
+    batch = []
+    for _ in range(rentals):
+        start = origin + timedelta(minutes=random.randrange(3 * 365 * 24 * 60))
+        days = random.randint(1, 14)
+        status = random.choice(("completed", "completed", "active", "cancelled"))
+        batch.append(
+            (
+                random.randint(11, vehicles + 10),
+                1,
+                start,
+                start + timedelta(days=days),
+                status,
+                days * 50,
+            )
+        )
+        if len(batch) == 100000:
+            insert_rentals(db, batch)
+            batch = []
+    insert_rentals(db, batch)
+
+
+def insert_rentals(db, batch):
+    with db.transaction():
+        db.execute_many(
+            "INSERT INTO rentals (vehicle_id, customer_id, start_date, "
+            "expected_return_date, rental_status, total_cost) VALUES (?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    vehicles = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rentals = int(sys.argv[2]) if len(sys.argv) > 2 else 500000
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CRS_DB_PATH"] = os.path.join(tmp, "bench.db")
+        initialize()
+        db = Database()
+        repo = ReportsRepository()
+
+        start = time.perf_counter()
+        populate(db, vehicles, rentals)
+        print(
+            f"{vehicles} vehicles, {rentals} rentals loaded in "
+            f"{time.perf_counter() - start:.1f}s"
+        )
+
+        periods = {
+            "one month": (date(2025, 6, 1), date(2025, 6, 30)),
+            "three years": (date(2023, 1, 1), date(2025, 12, 31)),
+        }
+        for label, (first, last) in periods.items():
+            days = (last - first).days + 1
+            bounds = (first.isoformat(), (last + timedelta(days=1)).isoformat())
+            summary = timed(partial(repo.revenue_by_vehicle, first, last), 5)
+            naive = timed(partial(db.fetch_all, NAIVE_REVENUE, bounds), 1)
+            print(
+                f"revenue by vehicle, {label:<11}  summary {summary * 1e3:8.1f} ms"
+                f"   rentals table {naive * 1e3:8.1f} ms"
+            )
+            summary = timed(partial(repo.utilization_by_make, first, last), 5)
+            naive = timed(partial(db.fetch_all, NAIVE_UTILIZATION, (days, *bounds)), 1)
+            print(
+                f"utilization by make, {label:<11} summary {summary * 1e3:8.1f} ms"
+                f"   rentals table {naive * 1e3:8.1f} ms"
+            )
+        summary = timed(repo.status_counts, 5)
+        naive = timed(lambda: db.fetch_all(NAIVE_STATUS), 1)
+        print(
+            f"rentals by status                   summary {summary * 1e3:8.2f} ms"
+            f"   rentals table {naive * 1e3:8.1f} ms"
+        )
+        Database.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Memory and time of listing rentals as plain tuples, dataclasses, slotted
+dataclasses and named tuples built by the row factory.
+
+Usage: python benchmarks/bench_rows.py [rentals]
+"""
+
+import os
+import sqlite3
+import sys
+import time
+import tracemalloc
+from dataclasses import fields, make_dataclass
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from db.rows import columns, named_row, row_factory  # noqa: E402
+from repository.rentals import Rentals  # noqa: E402
+
+# The same record without slots, as the repositories built it before
+PlainRentals = make_dataclass(
+    "PlainRentals", [(f.name, f.type, f.default) for f in fields(Rentals)]
+)
+
+RECORDS = (
+    ("tuple", None),
+    ("dataclass", PlainRentals),
+    ("slots dataclass", Rentals),
+    ("named tuple", named_row(Rentals)),
+)
+
+
+def create(count):
+    connection = sqlite3.connect(":memory:")
+    connection.execute(f"CREATE TABLE rentals ({columns(Rentals)})")
+    connection.executemany(
+        "INSERT INTO rentals VALUES (?, ?, ?, 1, ?, ?, NULL, ?, NULL, 'active', ?, ?)",
+        (
+            (
+                i,
+                i % 500,
+                i % 20000,
+                "2030-01-01 10:00:00",
+                "2030-01-03 10:00:00",
+                i * 7,
+                90.0 + i % 40,
+                "2029-12-30 09:00:00",
+            )
+            for i in range(count)
+        ),
+    )
+    return connection
+
+
+def listed(connection, record):
+    cursor = connection.cursor()
+    if record is not None:
+        cursor.row_factory = row_factory(record)
+    return cursor.execute(f"SELECT {columns(Rentals)} FROM rentals").fetchall()
+
+
+def measured(connection, record):
+    """Memory held by the listed rows, then the time to list them untraced."""
+    tracemalloc.start()
+    rows = listed(connection, record)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    start = time.perf_counter()
+    listed(connection, record)
+    return size, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    connection = create(count)
+    for label, record in RECORDS:
+        size, elapsed = measured(connection, record)
+        print(
+            f"{label:<16} {size / 2**20:7.1f} MiB"
+            f" {size / count:6.0f} B/row {elapsed:6.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Customer search through the FTS5 index versus the LIKE '%x%' predicates
+get_customers used before.
+
+Usage: python benchmarks/bench_search.py [customers]
+"""
+
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from db.database import Database  # noqa: E402
+from main import initialize  # noqa: E402
+from repository.customers import CustomersRepository  # noqa: E402
+
+LIKE_QUERY = """
+SELECT * FROM customers
+WHERE full_name LIKE ? OR email LIKE ? OR phone LIKE ? OR driver_license LIKE ?
+LIMIT 50
+"""
+
+FIRST_NAMES = ["John", "Jane", "Alice", "Bob", "Chen", "Priya", "Omar", "Sofia"]
+LAST_NAMES = ["Smith", "Nguyen", "Garcia", "Brown", "Wang", "Patel", "Kim", "Jones"]
+
+
+def random_word(length):
+    return "".join(random.choices(string.ascii_lowercase, k=length))
+
+
+def populate(db, customers):
+    random.seed(1)
+    batch = []
+    for i in range(customers):
+        last = random.choice(LAST_NAMES) + random_word(4)
+        batch.append(
+            (
+                f"{random.choice(FIRST_NAMES)} {last}",
+                f"{last.lower()}{i}@example.com",
+                f"04{random.randrange(10**8):08d}",
+                f"DL{i:08d}",
+            )
+        )
+        if len(batch) == 100000:
+            insert(db, batch)
+            batch = []
+    insert(db, batch)
+
+
+def insert(db, batch):
+    with db.transaction():
+        db.execute_many(
+            "INSERT INTO customers (full_name, email, phone, driver_license) "
+            "VALUES (?, ?, ?, ?)",
+            batch,
+        )
+
+
+def timed(fn, terms):
+    start = time.perf_counter()
+    for term in terms:
+        fn(term)
+    return (time.perf_counter() - start) / len(terms)
+
+
+def main():
+    customers = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CRS_DB_PATH"] = os.path.join(tmp, "bench.db")
+        initialize()
+        db = Database()
+        repo = CustomersRepository()
+
+        start = time.perf_counter()
+        populate(db, customers)
+        print(
+            f"{customers} customers loaded in {time.perf_counter() - start:.1f}s "
+            "(including FTS triggers)"
+        )
+
+        rows = db.fetch_all(
+            "SELECT full_name, phone FROM customers ORDER BY random() LIMIT 50"
+        )
+        terms = [name.split()[1] for name, _ in rows]
+        terms += [phone[:6] for _, phone in rows]
+
+        fts = timed(lambda term: repo.search_customers(term, limit=50), terms)
+        like = timed(lambda term: db.fetch_all(LIKE_QUERY, (f"%{term}%",) * 4), terms)
+        # A bare common surname matches 1/8 of all customers, and every match
+        # has to be ranked
+        broad_fts = timed(lambda term: repo.search_customers(term), LAST_NAMES)
+        broad_like = timed(
+            lambda term: db.fetch_all(LIKE_QUERY, (f"%{term}%",) * 4), LAST_NAMES
+        )
+        Database.close_all()
+
+    print("                     selective term   common surname")
+    print(f"FTS5 prefix search: {fts * 1e3:11.2f} ms   {broad_fts * 1e3:11.2f} ms")
+    print(f"LIKE '%x%' search:  {like * 1e3:11.2f} ms   {broad_like * 1e3:11.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
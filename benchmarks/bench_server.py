@@ -0,0 +1,234 @@
+"""
+Load test of the HTTP API server, in the style of locust: many simulated
+users log in, then run a weighted mix of browsing and booking requests
+over keep-alive connections for a fixed time. The server runs in its own
+process, like in production.
+
+Usage: python benchmarks/bench_server.py [clients] [seconds] [workers]
+"""
+
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "app"))
+
+from db.database import Database  # noqa: E402
+from main import initialize  # noqa: E402
+from repository.accounts import AccountsRepository  # noqa: E402
+from repository.customers import Customers  # noqa: E402
+from repository.staff import Staff  # noqa: E402
+from repository.users import Users  # noqa: E402
+from repository.vehicles import Vehicles, VehiclesRepository  # noqa: E402
+
+VEHICLES = 1000
+CUSTOMERS = 500
+STAFF = 10
+PORT = 8765
+WORDS = ["Toyota", "Honda", "Ford", "BMW", "Tesla", "sedan", "SUV", "electric"]
+
+
+def seed():
+    initialize()
+    VehiclesRepository().add_vehicles(
+        [
+            Vehicles(
+                make=random.choice(WORDS[:5]),
+                model=f"Model {i}",
+                year=2015 + i % 10,
+                license_plate=f"LT{i:05d}",
+                mileage=i * 10,
+                daily_rate=30 + i % 70,
+                description=f"{random.choice(WORDS[5:])} number {i}",
+            )
+            for i in range(VEHICLES)
+        ]
+    )
+    accounts = [
+        (
+            Users(username=f"customer{i}", password="password", role_id=2),
+            Customers(full_name=f"Customer {i}", email=f"customer{i}@example.com"),
+        )
+        for i in range(CUSTOMERS)
+    ]
+    accounts += [
+        (
+            Users(username=f"staff{i}", password="password", role_id=1),
+            Staff(full_name=f"Staff {i}", email=f"staff{i}@example.com"),
+        )
+        for i in range(STAFF)
+    ]
+    AccountsRepository().add_accounts(accounts)
+    Database.close_all()
+
+
+class Client:
+    """One simulated user on one keep-alive connection."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.token = None
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else b""
+        head = f"{method} {path} HTTP/1.1\r\nContent-Length: {len(data)}\r\n"
+        if self.token:
+            head += f"Authorization: Bearer {self.token}\r\n"
+        self.writer.write(head.encode() + b"\r\n" + data)
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        payload = await self.reader.readexactly(length) if length else b""
+        return status, json.loads(payload) if payload else None
+
+    async def login(self):
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", PORT)
+        username = (
+            f"staff{self.index % STAFF}"
+            if self.index % 20 == 0
+            else f"customer{self.index % CUSTOMERS}"
+        )
+        status, body = await self.request(
+            "POST", "/login", {"username": username, "password": "password"}
+        )
+        assert status == 200, body
+        self.token = body["token"]
+
+    # Weighted task mix of a browsing customer
+    async def list_vehicles(self):
+        after_id = random.randrange(VEHICLES)
+        return await self.request("GET", f"/vehicles?after_id={after_id}&limit=20")
+
+    async def search_vehicles(self):
+        return await self.request("GET", f"/vehicles/search?q={random.choice(WORDS)}")
+
+    async def get_vehicle(self):
+        return await self.request("GET", f"/vehicles/{random.randrange(1, VEHICLES)}")
+
+    async def list_rentals(self):
+        return await self.request("GET", "/rentals?limit=20")
+
+    async def get_profile(self):
+        return await self.request("GET", "/profile")
+
+    async def book_rental(self):
+        start = date.today() + timedelta(days=random.randrange(1, 365))
+        body = {
+            "vehicle_id": random.randrange(1, VEHICLES),
+            "days": random.randrange(1, 4),
+            "start_date": start.isoformat(),
+            "customer_id": random.randrange(1, CUSTOMERS),
+        }
+        return await self.request("POST", "/rentals", body)
+
+    TASKS = [
+        (list_vehicles, 40),
+        (search_vehicles, 20),
+        (get_vehicle, 20),
+        (list_rentals, 10),
+        (get_profile, 5),
+        (book_rental, 5),
+    ]
+
+
+async def run_client(client, deadline, latencies, statuses):
+    tasks, weights = zip(*Client.TASKS, strict=True)
+    while time.perf_counter() < deadline:
+        task = random.choices(tasks, weights)[0]
+        start = time.perf_counter()
+        try:
+            status, _ = await task(client)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            status = 0
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+    client.writer.close()
+
+
+async def load(clients, seconds):
+    # Log everyone in first, so the mix measures steady state traffic
+    users = [Client(i) for i in range(clients)]
+    await asyncio.gather(*(client.login() for client in users))
+
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    deadline = start + seconds
+    await asyncio.gather(
+        *(run_client(client, deadline, latencies, statuses) for client in users)
+    )
+    return time.perf_counter() - start, sorted(latencies), statuses
+
+
+def wait_for_server(process, timeout=30.0):
+    async def connect():
+        reader, writer = await asyncio.open_connection("127.0.0.1", PORT)
+        writer.close()
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("The server exited")
+        try:
+            return asyncio.run(connect())
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("The server did not start")
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 30
+    workers = sys.argv[3] if len(sys.argv) > 3 else "8"
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CRS_DB_PATH"] = os.path.join(tmp, "bench.db")
+        os.environ["CRS_BCRYPT_ROUNDS"] = "4"
+        os.environ["CRS_SESSION_SECRET"] = "bench"
+        seed()
+
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                os.path.join(ROOT, "app", "server.py"),
+                "--port",
+                str(PORT),
+                "--workers",
+                workers,
+            ],
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_server(process)
+            elapsed, latencies, statuses = asyncio.run(load(clients, seconds))
+        finally:
+            process.terminate()
+            process.wait()
+
+    requests = len(latencies)
+    errors = sum(n for status, n in statuses.items() if status == 0 or status >= 500)
+    p = lambda q: latencies[min(int(requests * q), requests - 1)] * 1e3  # noqa: E731
+    print(
+        f"{clients} clients, {workers} worker threads, {os.cpu_count()} CPU cores, "
+        f"{elapsed:.0f} s"
+    )
+    print(f"Requests: {requests} ({requests / elapsed:.0f} req/s), errors: {errors}")
+    print(f"Latency:  p50 {p(0.5):.0f} ms, p95 {p(0.95):.0f} ms, p99 {p(0.99):.0f} ms")
+    print(f"Statuses: {dict(sorted(statuses.items()))}")
+
+
+if __name__ == "__main__":
+    main()
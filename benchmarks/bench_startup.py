@@ -0,0 +1,78 @@
+"""
+Schema setup at program start: the versioned migration against running
+every repository's create_table() on each start, for a new database and
+for one that is already current.
+
+Usage: python benchmarks/bench_startup.py [repeat]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from db.database import Database  # noqa: E402
+from main import initialize  # noqa: E402
+from repository.availability import AvailabilityRepository  # noqa: E402
+from repository.customers import CustomersRepository  # noqa: E402
+from repository.rentals import RentalsRepository  # noqa: E402
+from repository.reports import ReportsRepository  # noqa: E402
+from repository.roles import RoleRepository  # noqa: E402
+from repository.sessions import SessionsRepository  # noqa: E402
+from repository.staff import StaffRepository  # noqa: E402
+from repository.users import UsersRepository  # noqa: E402
+from repository.vehicles import VehiclesRepository  # noqa: E402
+
+REPOSITORIES = (
+    CustomersRepository,
+    RentalsRepository,
+    RoleRepository,
+    StaffRepository,
+    UsersRepository,
+    VehiclesRepository,
+    AvailabilityRepository,
+    SessionsRepository,
+    ReportsRepository,
+)
+
+
+def create_tables():
+    """Every table, index and trigger created statement by statement."""
+    for repository in REPOSITORIES:
+        repository().create_table()
+    RoleRepository().load_roles()
+
+
+def timed(setup, repeat, tmp, fresh):
+    total = 0.0
+    for i in range(repeat):
+        path = os.path.join(tmp, f"{setup.__name__}-{i if fresh else 0}.db")
+        os.environ["CRS_DB_PATH"] = path
+        start = time.perf_counter()
+        setup()
+        # A program start opens its connection once
+        Database.close_all()
+        total += time.perf_counter() - start
+    return total / repeat
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, fresh in (("new database", True), ("current database", False)):
+            if not fresh:
+                # Create the databases the starts below find
+                for setup in (initialize, create_tables):
+                    timed(setup, 1, tmp, False)
+            migrated = timed(initialize, repeat, tmp, fresh)
+            legacy = timed(create_tables, repeat, tmp, fresh)
+            print(
+                f"{label:<17} migration {migrated * 1e3:6.2f} ms"
+                f"   create_table() calls {legacy * 1e3:6.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
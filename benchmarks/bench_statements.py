@@ -0,0 +1,78 @@
+"""
+get_by_id throughput with a cold statement cache (a new connection per
+call, like before the connection pool, or a pooled connection without
+statement cache) and warm (a registered statement on a pooled connection).
+
+Usage: python benchmarks/bench_statements.py [lookups]
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from db import config  # noqa: E402
+from db.database import ConnectionPool, Database  # noqa: E402
+from db.statements import statement_stats  # noqa: E402
+from main import initialize  # noqa: E402
+from repository.vehicles import GET_BY_ID  # noqa: E402
+
+# The query as get_by_id used to pass it, with its original whitespace
+RAW_SQL = """
+        SELECT vehicle_id, make, model, year, license_plate, mileage, daily_rate, description, status
+        FROM vehicles
+        WHERE vehicle_id = ?
+        """
+
+
+def measure(label, lookups, lookup):
+    start = time.perf_counter()
+    for i in range(lookups):
+        lookup(i % 10 + 1)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {lookups / elapsed:>10,.0f} lookups/s")
+
+
+def main():
+    lookups = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        os.environ["CRS_DB_PATH"] = path
+        initialize()
+
+        def new_connection(vehicle_id):
+            conn = sqlite3.connect(path)
+            try:
+                return conn.execute(RAW_SQL, (vehicle_id,)).fetchone()
+            finally:
+                conn.close()
+
+        uncached = ConnectionPool(path, 1, config.pragmas(), cached_statements=0)
+
+        def pooled_uncached(vehicle_id):
+            with uncached.connection() as conn:
+                return conn.execute(RAW_SQL, (vehicle_id,)).fetchone()
+
+        db = Database()
+
+        def warm(vehicle_id):
+            return db.fetch_one(GET_BY_ID, (vehicle_id,))
+
+        measure("cold: new connection per call", lookups // 10, new_connection)
+        measure("cold: pooled, no statement cache", lookups, pooled_uncached)
+        measure("warm: pooled, registered statement", lookups, warm)
+        uncached.close()
+        Database.close_all()
+
+    stats = statement_stats()[GET_BY_ID.name]
+    print(
+        f"{GET_BY_ID.name}: {stats['calls']} calls, "
+        f"{stats['seconds'] / stats['calls'] * 1e6:.1f} µs per call in SQLite"
+    )
+
+
+if __name__ == "__main__":
+    main()
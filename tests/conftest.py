@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+# The application modules import each other relative to the app directory
+# (e.g. ``from db.database import Database``), the same way ``python app/main.py``
+# runs them.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Points the application at a fresh database file for one test."""
+    from db.database import Database
+    from db.metrics import METRICS
+    from repository.roles import RoleRepository
+    from util.cache import clear_caches
+
+    path = str(tmp_path / "crs.db")
+    monkeypatch.setenv("CRS_DB_PATH", path)
+    yield path
+    Database.close_all()
+    clear_caches()
+    METRICS.reset()
+    RoleRepository._roles = {}
+
+
+@pytest.fixture
+def initialized_db(db_path):
+    """A fresh database with the application schema and seed data."""
+    from main import initialize
+
+    initialize()
+    return db_path
@@ -0,0 +1,65 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from repository.customers import Customers, CustomersRepository
+from repository.rental_history import RentalHistoryRepository
+from repository.rentals import Rentals, RentalsRepository
+from service.analytics import FleetAnalyticsService
+
+
+@pytest.fixture
+def rentals(initialized_db):
+    CustomersRepository().add_customer(Customers(user_id=2, full_name="Ann"))
+    return RentalsRepository()
+
+
+def rental(vehicle_id, start, days, status, total_cost):
+    return Rentals(
+        vehicle_id=vehicle_id,
+        customer_id=1,
+        staff_id=1,
+        start_date=start,
+        expected_return_date=start + timedelta(days=days),
+        rental_status=status,
+        total_cost=total_cost,
+    )
+
+
+def test_snapshot_refreshes_incrementally(rentals, tmp_path):
+    start = datetime(2025, 3, 1)
+    first = rentals.add_rental(rental(1, start, 2, "active", 90))
+    rentals.add_rental(rental(2, start, 2, "cancelled", 0))
+    history = RentalHistoryRepository(str(tmp_path / "snapshot"))
+    assert sorted(history.load().rental_id.tolist()) == [1, 2]
+
+    rentals.complete_rental(first, 1300, start + timedelta(days=1))
+    rentals.add_rental(rental(3, start, 1, "apply", 50))
+    columns = history.load()
+
+    assert sorted(columns.rental_id.tolist()) == [1, 2, 3]
+    completed = columns.select(columns.rental_id == 1)
+    assert completed.status.tolist() == [3]
+    assert completed.end_minute[0] - completed.start_minute[0] == 24 * 60
+    # A new process reads the saved snapshot and only the changes
+    reread = RentalHistoryRepository(str(tmp_path / "snapshot")).load()
+    assert sorted(reread.rental_id.tolist()) == [1, 2, 3]
+
+
+def test_fleet_report(rentals, tmp_path):
+    # Vehicle 1 is rented all of March 2, vehicle 2 the second half of March 3
+    start = datetime(2025, 3, 2)
+    rentals.add_rental(rental(1, start, 1, "completed", 45))
+    rentals.add_rental(rental(2, start + timedelta(hours=36), 2, "active", 100))
+    rentals.add_rental(rental(3, start, 1, "reject", 45))
+    history = RentalHistoryRepository(str(tmp_path / "snapshot"))
+
+    report = FleetAnalyticsService.compute(
+        history.load(), 2, date(2025, 3, 1), date(2025, 3, 3)
+    )
+
+    assert np.allclose(report.daily_utilization, [0, 0.5, 0.25])
+    assert report.rentals == 2
+    assert report.average_days == 1
+    assert report.revenue["total"] == 145
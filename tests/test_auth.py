@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from repository.users import Users, UsersRepository
+from service.auth import AuthService
+
+
+@pytest.fixture
+def users(initialized_db, monkeypatch):
+    monkeypatch.setenv("CRS_BCRYPT_ROUNDS", "4")
+    repo = UsersRepository()
+    repo.add_users(
+        repo.prepare_users(
+            [
+                Users(username="alice", password="secret", role_id=2),
+                Users(username="bob", password="hunter2", role_id=1),
+            ]
+        )
+    )
+    return repo
+
+
+def test_get_with_role(users):
+    user, role_name = users.get_with_role("alice")
+    assert (user.username, role_name) == ("alice", "customer")
+    assert users.get_with_role("nobody") is None
+
+
+def test_login(users):
+    async def run():
+        async with AuthService(flush_interval=60) as auth:
+            return await asyncio.gather(
+                auth.login("alice", "secret"),
+                auth.login("bob", "hunter2"),
+                auth.login("alice", "wrong"),
+                auth.login("nobody", "secret"),
+            )
+
+    alice, bob, wrong, unknown = asyncio.run(run())
+
+    assert (alice.username, alice.role_name) == ("alice", "customer")
+    assert bob.role_name == "staff"
+    assert wrong is None and unknown is None
+
+
+def test_last_login_written_in_batches(users):
+    before = users.get_by_username("alice").last_login
+
+    async def run():
+        async with AuthService(flush_interval=60) as auth:
+            await auth.login("alice", "secret")
+            await auth.login("bob", "hunter2")
+            # Nothing is written until the next flush
+            assert users.get_by_username("alice").last_login == before
+            await auth.flush()
+            return users.get_by_username("alice").last_login
+
+    assert asyncio.run(run()) != before
+
+
+def test_failed_flush_keeps_the_flusher_and_closes_the_pool(users, monkeypatch):
+    update_last_logins = users.update_last_logins
+    failures = []
+
+    def fail_once(logins):
+        if not failures:
+            failures.append(logins)
+            raise RuntimeError("database is locked")
+        update_last_logins(logins)
+
+    async def run():
+        auth = AuthService(flush_interval=0.01)
+        monkeypatch.setattr(auth.users_repo, "update_last_logins", fail_once)
+        await auth.__aenter__()
+        await auth.login("alice", "secret")
+        # The first write fails, and the next periodic flush retries it
+        while not failures or auth._logins:
+            await asyncio.sleep(0.01)
+        assert not auth._flusher.done()
+
+        monkeypatch.setattr(auth.users_repo, "update_last_logins", lambda logins: 1 / 0)
+        await auth.login("bob", "hunter2")
+        with pytest.raises(ZeroDivisionError):
+            await auth.close()
+        return auth
+
+    before = users.get_by_username("alice").last_login
+    auth = asyncio.run(run())
+
+    assert users.get_by_username("alice").last_login != before
+    assert auth.executor._shutdown
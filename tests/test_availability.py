@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from repository.availability import AvailabilityRepository
+from repository.rentals import Rentals, RentalsRepository
+from repository.vehicles import VehiclesRepository
+from service.errors import ServiceError
+from service.rentals import RentalService
+
+NEXT_WEEK = datetime.now().replace(microsecond=0) + timedelta(days=7)
+
+
+@pytest.fixture
+def repo(initialized_db):
+    return AvailabilityRepository()
+
+
+def book(vehicle_id, start, days, status="apply"):
+    RentalsRepository().add_rental(
+        Rentals(
+            vehicle_id=vehicle_id,
+            customer_id=1,
+            start_date=start,
+            expected_return_date=start + timedelta(days=days),
+            rental_status=status,
+        )
+    )
+
+
+def test_overlapping_dates_are_reserved(repo):
+    book(1, NEXT_WEEK, 3)
+
+    assert not repo.is_available(
+        1, NEXT_WEEK + timedelta(days=1), NEXT_WEEK + timedelta(days=5)
+    )
+    assert not repo.is_available(
+        1, NEXT_WEEK - timedelta(days=1), NEXT_WEEK + timedelta(hours=1)
+    )
+    assert repo.is_available(
+        1, NEXT_WEEK + timedelta(days=3), NEXT_WEEK + timedelta(days=4)
+    )
+    assert repo.is_available(1, datetime.now(), datetime.now() + timedelta(days=2))
+    assert repo.is_available(2, NEXT_WEEK, NEXT_WEEK + timedelta(days=3))
+
+
+def test_free_vehicles_excludes_reserved_and_maintenance(repo):
+    book(1, NEXT_WEEK, 3)
+    VehiclesRepository().update_status(2, "maintenance")
+
+    free = repo.free_vehicle_ids(NEXT_WEEK, NEXT_WEEK + timedelta(days=1))
+
+    assert repo.busy_vehicle_ids(NEXT_WEEK, NEXT_WEEK + timedelta(days=1)) == [1]
+    assert 1 not in free and 2 not in free
+    assert sorted(free) == list(range(3, 11))
+    assert [
+        row[0] for row in repo.free_vehicles(NEXT_WEEK, NEXT_WEEK + timedelta(days=1))
+    ] == free
+
+
+def test_finished_rentals_release_their_dates(repo):
+    book(1, NEXT_WEEK, 3)
+    rentals = RentalsRepository()
+
+    rentals.update_status(1, "cancelled")
+    assert repo.is_available(1, NEXT_WEEK, NEXT_WEEK + timedelta(days=3))
+
+    rentals.update_status(1, "active")
+    assert not repo.is_available(1, NEXT_WEEK, NEXT_WEEK + timedelta(days=3))
+
+    rentals.complete_rental(1, 20000, datetime.now())
+    assert repo.is_available(1, NEXT_WEEK, NEXT_WEEK + timedelta(days=3))
+
+
+def test_reservations_made_before_the_index_are_loaded(repo):
+    for name in ("insert", "update", "delete"):
+        repo.db.execute(f"DROP TRIGGER rental_periods_{name}")
+    repo.db.execute("DROP TABLE rental_periods")
+    book(1, NEXT_WEEK, 3)
+
+    repo.create_table()
+
+    assert not repo.is_available(1, NEXT_WEEK, NEXT_WEEK + timedelta(days=1))
+
+
+def test_vehicle_booked_next_week_can_be_rented_today(repo):
+    service = RentalService()
+    book(1, NEXT_WEEK, 3)
+    start = datetime.now()
+
+    def rental(days, start=start):
+        return Rentals(
+            vehicle_id=1,
+            customer_id=1,
+            staff_id=1,
+            start_date=start,
+            expected_return_date=start + timedelta(days=days),
+            rental_status="active",
+        )
+
+    with pytest.raises(ServiceError):
+        service.create_rental(rental(10), 10)
+    service.create_rental(rental(2), 2)
+    # The vehicle is out now, but it can still be booked after it is back
+    assert VehiclesRepository().get_by_id(1).status == "rented"
+    later = rental(2, start=NEXT_WEEK + timedelta(days=5))
+    later.rental_status = "apply"
+    assert service.create_rental(later, 2)
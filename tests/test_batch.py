@@ -0,0 +1,54 @@
+import pytest
+
+from globals import CurrentUser
+from repository.rentals import RentalsRepository
+from repository.vehicles import VehiclesRepository
+from util.batch import BatchRunner, parse_line
+
+ADMIN = CurrentUser(user_id=1, username="admin", role_name="staff")
+
+
+def test_parse_line():
+    assert parse_line('/vehicle update vehicle_id=3 description="Two words"') == (
+        "vehicle update",
+        {"vehicle_id": "3", "description": "Two words"},
+    )
+    with pytest.raises(ValueError):
+        parse_line("/vehicle update 3")
+
+
+def test_run_lines(initialized_db, monkeypatch):
+    monkeypatch.setenv("CRS_BCRYPT_ROUNDS", "4")
+    lines = [
+        "# A comment and a blank line are skipped",
+        "",
+        "/vehicle add make=Kia model=Rio year=2022 license_plate=NEW001 "
+        "daily_rate=35.00",
+        "/vehicle update vehicle_id=2 mileage=26000",
+        "/customer add full_name=Ann email=ann@example.com username=ann password=pw",
+        "/rental add vehicle_id=11 customer_id=1 days=2",
+        "/rental add vehicle_id=11 customer_id=1 days=2",
+        "/vehicle delete vehicle_id=abc",
+        "/vehicle fly vehicle_id=1",
+        "/vehicle delete id=1",
+    ]
+
+    result = BatchRunner().run_lines(ADMIN, lines)
+
+    assert (result.commands, result.succeeded, result.failed) == (8, 4, 4)
+    assert result.errors == [
+        "Line 7: Vehicle is not available for rent",
+        "Line 8: vehicle_id is not valid: abc",
+        "Line 9: Unknown command: /vehicle fly",
+        "Line 10: Unknown arguments: id",
+    ]
+    vehicles = VehiclesRepository()
+    assert vehicles.get_by_id(11).status == "rented"
+    assert vehicles.get_by_id(2).mileage == 26000
+    assert RentalsRepository().get_by_id(1).total_cost == 70
+
+
+def test_permissions_apply(initialized_db):
+    customer = CurrentUser(user_id=2, username="ann", role_name="customer")
+    result = BatchRunner().run_lines(customer, ["/vehicle delete vehicle_id=1"])
+    assert result.errors == ["Line 1: Only staff can do this"]
@@ -0,0 +1,78 @@
+import time
+
+from repository.roles import RoleRepository
+from repository.staff import Staff, StaffRepository, staff_cache
+from repository.vehicles import VehiclesRepository, vehicle_cache
+from util.cache import MISSING, LRUCache, cache_stats
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache("test.lru", maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats() == {"hits": 3, "misses": 1, "size": 2}
+
+
+def test_entries_expire_after_ttl():
+    cache = LRUCache("test.ttl", ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is MISSING
+
+
+def test_vehicle_reads_are_cached_and_writes_invalidate(initialized_db):
+    repo = VehiclesRepository()
+
+    assert repo.get_by_id(1).status == "available"
+    assert repo.get_by_id(1).status == "available"
+    assert vehicle_cache.stats()["hits"] == 1
+
+    repo.update_status(1, "maintenance")
+    assert repo.get_by_id(1).status == "maintenance"
+    assert "vehicles.get_by_id" in cache_stats()
+
+
+def test_reads_inside_a_transaction_bypass_the_cache(initialized_db):
+    repo = VehiclesRepository()
+    repo.get_by_id(1)
+    # Another process changes the row behind the cache's back
+    repo.db.execute("UPDATE vehicles SET status = 'rented' WHERE vehicle_id = 1")
+
+    assert repo.get_by_id(1).status == "available"
+    with repo.db.transaction():
+        assert repo.get_by_id(1).status == "rented"
+
+
+def test_rolled_back_write_does_not_leave_stale_entry(initialized_db):
+    repo = VehiclesRepository()
+    try:
+        with repo.db.transaction():
+            repo.update_status(1, "maintenance")
+            raise RuntimeError
+    except RuntimeError:
+        pass
+
+    assert repo.get_by_id(1).status == "available"
+
+
+def test_staff_update_invalidates_lookup_by_user(initialized_db):
+    repo = StaffRepository()
+    assert repo.get_by_user_id(1).full_name == "admin"
+
+    repo.update_staff(Staff(staff_id=1, full_name="Administrator"))
+
+    assert repo.get_by_user_id(1).full_name == "Administrator"
+    assert staff_cache.stats()["size"] == 1
+
+
+def test_roles_are_served_from_memory_after_loading(initialized_db):
+    repo = RoleRepository()
+    repo.db.execute("UPDATE roles SET role_name = 'changed' WHERE role_id = 1")
+
+    assert repo.get_role(1).role_name == "staff"
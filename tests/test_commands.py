@@ -0,0 +1,37 @@
+import pytest
+
+from command.factory import CommandFactory
+from globals import CurrentUser
+
+ADMIN = CurrentUser(user_id=1, username="admin", role_name="staff")
+CUSTOMER = CurrentUser(user_id=2, username="ann", role_name="customer")
+
+
+def test_commands_are_built_once(initialized_db):
+    commands = CommandFactory()
+    assert commands.get_command("/vehicle list") is commands.get_command("/vehicle")
+    assert commands.get_command("/fly") is None
+
+
+def test_commands_use_the_user_of_each_call(initialized_db, capsys):
+    commands = CommandFactory()
+
+    commands.handle("/?", CUSTOMER)
+    assert "/staff" not in capsys.readouterr().out
+    commands.handle("/?", ADMIN)
+    assert "/staff" in capsys.readouterr().out
+    commands.handle("/customer list", CUSTOMER)
+    assert "Unknown command" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("subcommand", ["revenue", "utilization", "fleet"])
+def test_reports_check_the_role_before_prompting(
+    initialized_db, capsys, monkeypatch, subcommand
+):
+    def ask(*args, **kwargs):
+        raise AssertionError("the customer was asked for the report period")
+
+    monkeypatch.setattr("util.validation.Prompt.ask", ask)
+    CommandFactory().handle(f"/report {subcommand}", CUSTOMER)
+
+    assert "Unknown command" in capsys.readouterr().out
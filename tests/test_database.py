@@ -0,0 +1,136 @@
+import sqlite3
+import threading
+
+import pytest
+
+from db import config
+from db.database import Database
+
+
+def test_connections_are_reused(db_path):
+    db = Database()
+    db.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+    db.execute("INSERT INTO t(name) VALUES(?)", ("a",))
+
+    with db.get_connection() as first:
+        pass
+    with db.get_connection() as second:
+        pass
+
+    assert first is second
+    assert Database().pool is db.pool
+    assert db.fetch_one("SELECT name FROM t") == ("a",)
+
+
+def test_nested_use_shares_the_thread_connection(db_path):
+    db = Database()
+    with db.get_connection() as outer:
+        with db.get_connection() as inner:
+            assert inner is outer
+
+
+def test_generators_closed_out_of_order_keep_the_connection(db_path):
+    db = Database()
+    db.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+    db.execute_many("INSERT INTO t(id) VALUES(?)", [(i,) for i in range(5)])
+    outer = db.iter_query("SELECT id FROM t ORDER BY id", batch_size=1)
+    inner = db.iter_query("SELECT id FROM t ORDER BY id", batch_size=1)
+    assert (next(outer), next(inner)) == ((0,), (0,))
+    conn = db.pool.current()
+
+    outer.close()
+
+    # The inner cursor still reads from the connection, so it is not idle
+    assert db.pool.current() is conn and db.pool._idle.empty()
+    assert [row[0] for row in inner] == [1, 2, 3, 4]
+    assert db.pool.current() is None and db.pool._local.depth == 0
+    with db.get_connection() as again:
+        assert again is conn
+
+
+def test_pool_is_bounded(db_path, monkeypatch):
+    monkeypatch.setenv("CRS_DB_POOL_SIZE", "2")
+    Database.close_all()
+    db = Database()
+    barrier = threading.Barrier(4)
+
+    def worker():
+        for _ in range(20):
+            db.fetch_one("SELECT 1")
+        barrier.wait()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(db.pool._connections) <= 2
+
+
+def test_transaction_commits_all_writes(db_path):
+    db = Database()
+    db.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+
+    with db.transaction():
+        db.execute("INSERT INTO t(name) VALUES(?)", ("a",))
+        Database().execute("INSERT INTO t(name) VALUES(?)", ("b",))
+
+    assert db.fetch_all("SELECT name FROM t ORDER BY id") == [("a",), ("b",)]
+
+
+def test_transaction_rolls_back_on_error(db_path):
+    db = Database()
+    db.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.transaction():
+            db.execute("INSERT INTO t(name) VALUES(?)", ("a",))
+            with db.transaction():
+                db.execute("INSERT INTO t(name) VALUES(?)", ("a",))
+
+    assert db.fetch_all("SELECT name FROM t") == []
+
+
+def test_pragma_profile_is_applied(db_path, monkeypatch):
+    monkeypatch.setenv("CRS_DB_PRAGMAS", "cache_size=-2000")
+    db = Database()
+
+    assert db.fetch_one("PRAGMA journal_mode") == ("wal",)
+    assert db.fetch_one("PRAGMA synchronous") == (1,)  # NORMAL
+    assert db.fetch_one("PRAGMA cache_size") == (-2000,)
+
+
+def test_busy_timeout_is_applied_first(monkeypatch):
+    monkeypatch.setenv("CRS_DB_PRAGMAS", "busy_timeout=100,cache_size=-2000")
+    assert list(config.pragmas())[:2] == ["busy_timeout", "journal_mode"]
+    assert config.pragmas()["busy_timeout"] == "100"
+
+
+def test_unknown_pragma_profile_is_rejected(db_path, monkeypatch):
+    monkeypatch.setenv("CRS_DB_PROFILE", "fast")
+    with pytest.raises(ValueError):
+        Database()
+
+
+def test_iter_query_streams_in_batches(db_path):
+    db = Database()
+    db.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+    db.execute_many("INSERT INTO t(id) VALUES(?)", [(i,) for i in range(25)])
+
+    rows = db.iter_query("SELECT id FROM t ORDER BY id", batch_size=10)
+
+    assert next(rows) == (0,)
+    assert [row[0] for row in rows] == list(range(1, 25))
+
+
+def test_execute_each_counts_the_rows_of_every_execution(db_path):
+    db = Database()
+    db.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+
+    counts = db.execute_each(
+        "INSERT INTO t(id) SELECT ?1 WHERE ?1 % 2 = 0", [(i,) for i in range(5)]
+    )
+
+    assert counts == [1, 0, 1, 0, 1]
+    assert db.fetch_all("SELECT id FROM t ORDER BY id") == [(0,), (2,), (4,)]
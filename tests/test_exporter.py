@@ -0,0 +1,118 @@
+import csv
+import gzip
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+
+from db.database import Database
+from repository.customers import Customers, CustomersRepository
+from repository.rentals import RentalExport
+from util.exporter import export_file
+
+
+def add_rentals(*starts):
+    CustomersRepository().add_customer(
+        Customers(user_id=2, full_name="Ann", email="ann@example.com")
+    )
+    Database().execute_many(
+        "INSERT INTO rentals (vehicle_id, customer_id, start_date, "
+        "expected_return_date, rental_status, total_cost) "
+        "VALUES (1, 1, ?, ?, 'completed', 90)",
+        [(start, start) for start in starts],
+    )
+
+
+def test_export_rentals_of_a_month_to_gzipped_csv(initialized_db, tmp_path):
+    add_rentals(
+        "2030-06-30 10:00:00",
+        "2030-05-31 23:00:00",
+        "2030-06-01 08:00:00",
+        "2030-07-01 00:00:00",
+    )
+    out = tmp_path / "out"
+    out.mkdir()
+    path = str(out / "rentals.csv.gz")
+
+    result = export_file("rentals", path, date(2030, 6, 1), date(2030, 6, 30))
+
+    assert result.rows == 2
+    assert result.bytes == os.path.getsize(path)
+    assert os.listdir(out) == ["rentals.csv.gz"]
+    with gzip.open(path, "rt", newline="") as file:
+        header, *rows = csv.reader(file)
+    assert header == list(RentalExport._fields)
+    assert [row[1] for row in rows] == ["2030-06-01 08:00:00", "2030-06-30 10:00:00"]
+    assert rows[0][9:11] == ["Toyota", "Camry"]
+    assert rows[0][13:15] == ["Ann", "ann@example.com"]
+
+
+def test_export_vehicles_to_jsonl(initialized_db, tmp_path):
+    path = str(tmp_path / "vehicles.jsonl")
+
+    result = export_file("vehicles", path)
+
+    with open(path) as file:
+        vehicles = [json.loads(line) for line in file]
+    assert result.rows == len(vehicles) == 10
+    assert vehicles[0]["make"] == "Toyota"
+
+
+def test_export_rejects_unknown_files_and_filters(initialized_db, tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    with pytest.raises(ValueError):
+        export_file("rentals", str(out / "rentals.xlsx"))
+    with pytest.raises(ValueError):
+        export_file("vehicles", str(out / "v.csv"), first=date(2030, 1, 1))
+    with pytest.raises(ValueError):
+        export_file("users", str(out / "users.csv"))
+    assert os.listdir(out) == []
+
+
+class FailingCursor:
+    """A cursor whose second batch of rows fails, as on a disk error."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.batches = 0
+
+    def execute(self, sql, params):
+        return self.cursor.execute(sql, params)
+
+    def fetchmany(self, size):
+        self.batches += 1
+        if self.batches > 1:
+            raise sqlite3.OperationalError("disk I/O error")
+        return self.cursor.fetchmany(size)
+
+
+def test_failed_read_leaves_no_file(initialized_db, tmp_path, monkeypatch):
+    add_rentals(*(f"2030-06-{day:02} 10:00:00" for day in range(1, 31)))
+    get_cursor = Database.get_cursor
+
+    @contextmanager
+    def failing_cursor(self, row=None):
+        with get_cursor(self, row) as cursor:
+            yield FailingCursor(cursor)
+
+    monkeypatch.setattr(Database, "get_cursor", failing_cursor)
+    out = tmp_path / "out"
+    out.mkdir()
+
+    with pytest.raises(sqlite3.Error):
+        export_file("rentals", str(out / "rentals.csv"))
+    assert os.listdir(out) == []
+
+
+def test_rental_export_reads_the_start_date_index(initialized_db):
+    plan = Database().fetch_all(
+        "EXPLAIN QUERY PLAN SELECT rental_id FROM rentals "
+        "WHERE start_date >= ? AND start_date < ? ORDER BY start_date, rental_id",
+        ("2030-06-01", "2030-07-01"),
+    )
+    assert any("idx_rentals_start_date" in row[3] for row in plan)
+    assert not any("TEMP B-TREE" in row[3] for row in plan)
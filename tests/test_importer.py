@@ -0,0 +1,150 @@
+import json
+from datetime import datetime
+
+from db.database import Database
+from repository.availability import AvailabilityRepository
+from repository.vehicles import Vehicles, VehiclesRepository
+from util.importer import chunked, import_file
+
+VEHICLES_CSV = """make,model,year,license_plate,mileage,daily_rate,description,status
+Toyota,Corolla,2020,NEW001,1000,45.00,Compact,available
+Honda,Civic,2021,NEW002,,50.50,,
+Ford,Focus,1800,GHI789,0,40.00,Too old,available
+Mazda,3,2022,JKL012,0,fifty,Bad rate,available
+Toyota,Yaris,2019,NEW001,0,35.00,Duplicate plate,available
+"""
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_chunked_splits_records():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 2)) == []
+
+
+def test_import_vehicles_skips_invalid_and_duplicate_rows(initialized_db, tmp_path):
+    result = import_file("vehicles", write(tmp_path, "vehicles.csv", VEHICLES_CSV), 2)
+
+    assert (result.rows, result.imported, result.skipped) == (5, 2, 3)
+    assert len(result.errors) == 2
+    assert result.errors[0].startswith("Line 4: year")
+    rows = Database().fetch_all(
+        "SELECT license_plate, mileage, daily_rate, status FROM vehicles "
+        "WHERE license_plate LIKE 'NEW%' ORDER BY vehicle_id"
+    )
+    assert rows == [
+        ("NEW001", 1000, 45.0, "available"),
+        ("NEW002", 0, 50.5, "available"),
+    ]
+
+
+def test_imported_vehicles_are_searchable(initialized_db, tmp_path):
+    import_file("vehicles", write(tmp_path, "vehicles.csv", VEHICLES_CSV))
+    repo = VehiclesRepository()
+    repo.add_vehicle(
+        Vehicles(
+            make="Honda",
+            model="Civic",
+            year=2022,
+            license_plate="NEW003",
+            daily_rate=40.0,
+        )
+    )
+
+    plates = sorted(row[4] for row in repo.search_vehicles("civic"))
+    assert plates == ["NEW002", "NEW003"]
+
+
+def test_import_customers_from_jsonl(initialized_db, tmp_path):
+    records = [
+        {"full_name": "John Smith", "email": "john@example.com", "phone": "0412345678"},
+        {"full_name": "Jane Doe", "email": "not-an-email"},
+        {"full_name": "", "email": "empty@example.com"},
+        {"full_name": "John Again", "email": "john@example.com"},
+    ]
+    text = "\n".join(json.dumps(record) for record in records) + "\n"
+
+    result = import_file("customers", write(tmp_path, "customers.jsonl", text))
+
+    assert (result.rows, result.imported) == (4, 1)
+    assert Database().fetch_all("SELECT full_name, user_id FROM customers") == [
+        ("John Smith", None)
+    ]
+
+
+def test_import_skips_malformed_jsonl_lines(initialized_db, tmp_path):
+    lines = [
+        json.dumps({"full_name": "John Smith", "email": "john@example.com"}),
+        '{"full_name": "Cut off',
+        "",
+        "[1, 2]",
+        json.dumps({"full_name": "Jane Doe", "email": "jane@example.com"}),
+    ]
+    text = "\n".join(lines) + "\n"
+
+    result = import_file("customers", write(tmp_path, "customers.jsonl", text))
+
+    assert (result.rows, result.imported, result.skipped) == (4, 2, 2)
+    assert result.errors[0].startswith("Line 2: not valid JSON")
+    assert result.errors[1] == "Line 4: not a JSON object"
+
+
+def test_import_rentals_checks_references(initialized_db, tmp_path):
+    import_file("vehicles", write(tmp_path, "vehicles.csv", VEHICLES_CSV))
+    import_file(
+        "customers",
+        write(tmp_path, "customers.jsonl", '{"full_name": "John Smith"}\n'),
+    )
+    rentals = """vehicle_id,customer_id,start_date,expected_return_date,actual_return_date,total_cost
+1,1,2024-01-01 10:00:00,2024-01-03 10:00:00,2024-01-03 09:00:00,90.00
+2,1,2030-01-01,2030-01-05,,
+99,1,2030-01-01,2030-01-05,,
+1,1,2024-01-05,2024-01-04,,
+"""
+
+    result = import_file("rentals", write(tmp_path, "rentals.csv", rentals))
+
+    assert (result.rows, result.imported) == (4, 2)
+    rows = Database().fetch_all(
+        "SELECT vehicle_id, rental_status, total_cost FROM rentals ORDER BY rental_id"
+    )
+    assert rows == [(1, "completed", 90.0), (2, "active", None)]
+    # Imported reservations block the vehicle like booked ones
+    busy = AvailabilityRepository().busy_vehicle_ids(
+        datetime(2030, 1, 2), datetime(2030, 1, 3)
+    )
+    assert busy == [2]
+
+
+def test_import_rentals_rejects_double_bookings(initialized_db, tmp_path):
+    import_file(
+        "customers",
+        write(tmp_path, "customers.jsonl", '{"full_name": "John Smith"}\n'),
+    )
+    header = "vehicle_id,customer_id,start_date,expected_return_date,rental_status\n"
+    booked = header + "1,1,2030-02-01,2030-02-05,apply\n"
+    import_file("rentals", write(tmp_path, "booked.csv", booked))
+    rentals = header + (
+        "1,1,2030-02-04,2030-02-08,apply\n"
+        "2,1,2030-02-01,2030-02-05,active\n"
+        "2,1,2030-02-03,2030-02-04,apply\n"
+        "2,1,2030-02-05,2030-02-07,apply\n"
+        "3,1,2030-02-01,2030-02-05,cancelled\n"
+        "1,1,2030-02-01,2030-02-05,completed\n"
+    )
+
+    result = import_file("rentals", write(tmp_path, "rentals.csv", rentals))
+
+    assert (result.rows, result.imported, result.skipped) == (6, 4, 2)
+    assert [error.partition(":")[0] for error in result.errors] == ["Line 2", "Line 4"]
+    assert "booked for these dates" in result.errors[0]
+    statuses = dict(Database().fetch_all("SELECT vehicle_id, status FROM vehicles"))
+    assert (statuses[1], statuses[2], statuses[3]) == (
+        "available",
+        "rented",
+        "available",
+    )
@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+import pytest
+
+from db.database import Database
+from repository.customers import CustomersRepository
+from repository.rentals import RentalsRepository
+from repository.staff import StaffRepository
+from repository.vehicles import VehiclesRepository
+
+# Hot lookups that must be answered through an index
+HOT_QUERIES = [
+    lambda: RentalsRepository().get_rental_details(customer_id=1),
+    lambda: RentalsRepository().get_rental_details("active"),
+    lambda: CustomersRepository().get_by_user_id(1),
+    lambda: StaffRepository().get_by_user_id(1),
+    lambda: VehiclesRepository().get_vehicles(status="available"),
+]
+
+
+def capture_query(call):
+    """Runs a repository call and returns the SQL and parameters it used."""
+    captured = []
+
+    def fetch(self, query, params=(), row=None):
+        captured.append((query, params))
+
+    with (
+        patch.object(Database, "fetch_all", fetch),
+        patch.object(Database, "fetch_one", fetch),
+    ):
+        call()
+    return captured[0]
+
+
+@pytest.mark.parametrize("call", HOT_QUERIES)
+def test_hot_query_does_not_scan(initialized_db, call):
+    query, params = capture_query(call)
+
+    plan = Database().fetch_all(f"EXPLAIN QUERY PLAN {query}", params)
+
+    assert plan
+    for row in plan:
+        assert not row[3].startswith("SCAN"), row[3]
+
+
+def test_initialize_is_idempotent(initialized_db):
+    from main import initialize
+
+    initialize()
+    names = {
+        row[0]
+        for row in Database().fetch_all(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'"
+        )
+    }
+    assert names == {
+        "idx_customers_user_id",
+        "idx_rentals_customer_id",
+        "idx_rentals_rental_status",
+        "idx_rentals_start_date",
+        "idx_rentals_vehicle_id",
+        "idx_staff_user_id",
+        "idx_vehicles_status",
+    }
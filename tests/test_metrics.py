@@ -0,0 +1,77 @@
+import pytest
+
+from db.database import Database
+from db.metrics import METRICS, Histogram
+from globals import CurrentUser
+from repository.vehicles import VehiclesRepository
+from service.debug import DebugService
+from service.errors import PermissionDenied
+
+ADMIN = CurrentUser(user_id=1, username="admin", role_name="staff")
+
+
+def test_histogram():
+    histogram = Histogram((1, 10))
+    for value in (0.5, 1, 5, 50):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [("1", 2), ("10", 3), ("+Inf", 4)]
+    assert histogram.quantile(0.5) == 1
+    assert histogram.quantile(0.75) == 10
+    assert histogram.sum == 56.5
+
+
+def test_queries_are_recorded_by_caller(initialized_db):
+    METRICS.reset()
+    VehiclesRepository().get_by_id(1)
+
+    stats = {(s.statement, s.caller): s for s in METRICS.snapshot()}
+    get_by_id = stats[("vehicles.get_by_id", "VehiclesRepository.get_by_id")]
+    assert get_by_id.seconds.count == 1
+    assert get_by_id.rows.sum == 1
+
+
+def test_slow_queries_are_logged(initialized_db, tmp_path, monkeypatch):
+    log = tmp_path / "slow.log"
+    monkeypatch.setenv("CRS_DB_SLOW_QUERY_MS", "0")
+    monkeypatch.setenv("CRS_DB_SLOW_LOG", str(log))
+    METRICS.reset()
+
+    VehiclesRepository().get_by_id(2)
+
+    line = log.read_text().splitlines()[0]
+    assert "rows=1 vehicles.get_by_id VehiclesRepository.get_by_id: SELECT" in line
+
+
+def test_unwritable_slow_log_does_not_fail_queries(
+    initialized_db, tmp_path, monkeypatch, capsys
+):
+    monkeypatch.setenv("CRS_DB_SLOW_QUERY_MS", "0")
+    monkeypatch.setenv("CRS_DB_SLOW_LOG", str(tmp_path / "missing" / "slow.log"))
+    METRICS.reset()
+    vehicles = VehiclesRepository()
+
+    with Database().transaction():
+        vehicles.update_status(2, "maintenance")
+        vehicles.get_by_id(2)
+    vehicles.get_by_id(3)
+
+    assert vehicles.get_by_id(2).status == "maintenance"
+    assert capsys.readouterr().out.count("slow-query log is turned off") == 1
+
+
+def test_export(initialized_db, tmp_path):
+    VehiclesRepository().get_by_id(1)
+    path = tmp_path / "crs.prom"
+
+    DebugService().export_stats(ADMIN, str(path))
+
+    text = path.read_text()
+    assert "# TYPE crs_db_query_duration_seconds histogram" in text
+    assert (
+        'crs_db_query_rows_count{statement="vehicles.get_by_id",'
+        'caller="VehiclesRepository.get_by_id"} 1'
+    ) in text
+    customer = CurrentUser(user_id=2, username="ann", role_name="customer")
+    with pytest.raises(PermissionDenied):
+        DebugService().query_stats(customer)
@@ -0,0 +1,110 @@
+import sqlite3
+
+import pytest
+
+from db.database import Database, split_script
+from db.metrics import METRICS
+from db.migrations import migrate, schema_version
+from repository.customers import Customers, CustomersRepository
+from repository.schema import SCHEMA, SCHEMA_VERSION, migrate_schema
+
+
+def test_current_database_starts_with_one_pragma_read(initialized_db):
+    from main import initialize
+
+    assert schema_version(Database()) == SCHEMA_VERSION
+    METRICS.reset()
+
+    initialize()
+
+    queries = {s.statement: s.seconds.count for s in METRICS.snapshot()}
+    # The version check, then loading the roles
+    assert queries == {"migrations.user_version": 1, "unregistered": 1}
+
+
+def test_unversioned_database_gets_missing_tables_and_derived_rows(initialized_db):
+    db = Database()
+    CustomersRepository().add_customer(Customers(user_id=2, full_name="Ann Lee"))
+    db.execute(
+        "INSERT INTO rentals (vehicle_id, customer_id, start_date, "
+        "expected_return_date, rental_status, total_cost) "
+        "VALUES (1, 1, '2030-01-01 10:00:00', '2030-01-03 10:00:00', 'active', 90)"
+    )
+    # A database made before the summaries and versions existed
+    for table in ("daily", "monthly", "status"):
+        db.execute(f"DROP TABLE rental_{table}_summary")
+    db.execute("DELETE FROM rental_periods")
+    db.execute("PRAGMA user_version = 0")
+
+    assert migrate_schema() == [SCHEMA_VERSION]
+
+    assert db.fetch_all(
+        "SELECT day, rentals, revenue_cents, rented_minutes "
+        "FROM rental_daily_summary ORDER BY day"
+    ) == [
+        ("2030-01-01", 1, 9000, 14 * 60),
+        ("2030-01-02", 0, 0, 24 * 60),
+        ("2030-01-03", 0, 0, 10 * 60),
+    ]
+    assert db.fetch_all("SELECT * FROM rental_monthly_summary") == [
+        ("2030-01", 1, 1, 9000, 48 * 60)
+    ]
+    assert db.fetch_one("SELECT COUNT(*) FROM rental_periods") == (1,)
+    assert db.fetch_one("SELECT COUNT(*) FROM vehicles") == (10,)
+
+
+def test_version_2_summaries_are_spread_over_the_days(initialized_db):
+    db = Database()
+    CustomersRepository().add_customer(Customers(user_id=2, full_name="Ann Lee"))
+    db.execute(
+        "INSERT INTO rentals (vehicle_id, customer_id, start_date, "
+        "expected_return_date, rental_status, total_cost) "
+        "VALUES (1, 1, '2030-01-01 00:00:00', '2030-01-03 00:00:00', 'active', 90)"
+    )
+    # Version 2 counted every minute for the day the rental starts
+    db.execute("UPDATE rental_daily_summary SET rented_minutes = 2880")
+    db.execute("DELETE FROM rental_daily_summary WHERE day > '2030-01-01'")
+    db.execute("PRAGMA user_version = 2")
+
+    assert migrate_schema() == [3]
+
+    assert db.fetch_all(
+        "SELECT day, rented_minutes FROM rental_daily_summary ORDER BY day"
+    ) == [("2030-01-01", 1440), ("2030-01-02", 1440)]
+
+
+def test_upgrades_run_in_order_in_one_transaction(initialized_db):
+    db = Database()
+    upgrades = {
+        SCHEMA_VERSION + 1: "CREATE TABLE extras (name TEXT);",
+        SCHEMA_VERSION + 2: "ALTER TABLE extras ADD COLUMN note TEXT;",
+    }
+    assert migrate(db, SCHEMA, SCHEMA_VERSION + 2, upgrades) == [
+        SCHEMA_VERSION + 1,
+        SCHEMA_VERSION + 2,
+    ]
+    assert db.fetch_one("SELECT note FROM extras") is None
+
+    upgrades[SCHEMA_VERSION + 3] = (
+        "CREATE TABLE more (x);\nINSERT INTO missing VALUES (1);"
+    )
+    with pytest.raises(sqlite3.OperationalError):
+        migrate(db, SCHEMA, SCHEMA_VERSION + 3, upgrades)
+    assert schema_version(db) == SCHEMA_VERSION + 2
+    assert db.fetch_one("SELECT 1 FROM sqlite_master WHERE name = 'more'") is None
+
+    with pytest.raises(RuntimeError):
+        migrate(db, SCHEMA, SCHEMA_VERSION, upgrades)
+
+
+def test_split_script_keeps_triggers_and_literals_whole():
+    script = """
+    CREATE TRIGGER t AFTER INSERT ON a BEGIN
+        INSERT INTO b VALUES (';');
+        DELETE FROM c;
+    END;
+    SELECT 1"""
+    statements = split_script(script)
+    assert len(statements) == 2
+    assert statements[0].endswith("END;")
+    assert statements[1] == "SELECT 1"
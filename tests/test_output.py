@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+
+import pytest
+
+from command.factory import CommandFactory
+from globals import CurrentUser
+from repository.vehicles import VehicleRow, VehiclesRepository
+from util.output import split_format, write_rows
+from util.pagination import show_rows
+
+ADMIN = CurrentUser(user_id=1, username="admin", role_name="staff")
+
+
+def test_split_format_removes_the_option():
+    assert split_format("/rental list --format csv") == ("/rental list", "csv")
+    assert split_format("/vehicle list --format=jsonl") == ("/vehicle list", "jsonl")
+    assert split_format("/staff list") == ("/staff list", "table")
+    with pytest.raises(ValueError):
+        split_format("/staff list --format xml")
+    with pytest.raises(ValueError):
+        split_format("/staff list --format")
+
+
+def test_write_rows_formats(initialized_db):
+    rows = VehiclesRepository().get_vehicles(limit=2, stream=True)
+    assert not isinstance(rows, list)
+
+    out = io.StringIO()
+    write_rows(rows, VehicleRow._fields, "csv", out)
+    header, first, second = csv.reader(io.StringIO(out.getvalue()))
+    assert header == list(VehicleRow._fields)
+    assert first[1:3] == ["Toyota", "Camry"]
+
+    out = io.StringIO()
+    write_rows([VehicleRow(*range(8), None)], VehicleRow._fields, "jsonl", out)
+    assert json.loads(out.getvalue()) == {
+        **dict(zip(VehicleRow._fields, range(8), strict=False)),
+        "status": None,
+    }
+
+    out = io.StringIO()
+    write_rows([("a b", None, 3)], ("x", "y", "z"), "plain", out)
+    assert out.getvalue() == "a b\t\t3\n"
+
+
+def test_list_commands_stream_every_row(initialized_db, capsys):
+    commands = CommandFactory()
+
+    commands.handle("/vehicle list --format csv", ADMIN)
+    lines = capsys.readouterr().out.splitlines()
+    # The header and all 10 vehicles, without paging
+    assert len(lines) == 11
+    assert lines[0].startswith("vehicle_id,make,model")
+
+    commands.handle("/vehicle delete --format csv", ADMIN)
+    assert "does not support --format" in capsys.readouterr().out
+
+
+def test_show_rows_stops_when_declined(monkeypatch):
+    monkeypatch.setattr("util.pagination.Confirm.ask", lambda *a, **k: False)
+    pages = []
+    show_rows(list(range(5)), pages.append, page_size=2)
+    assert pages == [[0, 1]]
+
+    monkeypatch.setattr("util.pagination.Confirm.ask", lambda *a, **k: True)
+    pages = []
+    show_rows(list(range(5)), pages.append, page_size=2)
+    assert pages == [[0, 1], [2, 3], [4]]
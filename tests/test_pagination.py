@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+from repository.customers import Customers, CustomersRepository
+from repository.rentals import Rentals, RentalsRepository
+from repository.vehicles import VehiclesRepository
+from util.pagination import keyset_pages
+
+
+def test_vehicle_pages_cover_every_row_once(initialized_db):
+    repo = VehiclesRepository()
+
+    pages = list(
+        keyset_pages(
+            lambda after_id, limit: repo.get_vehicles(after_id=after_id, limit=limit),
+            page_size=4,
+        )
+    )
+
+    assert [len(rows) for rows, _ in pages] == [4, 4, 2]
+    assert [has_more for _, has_more in pages] == [True, True, False]
+    ids = [row[0] for rows, _ in pages for row in rows]
+    assert ids == list(range(1, 11))
+
+
+def test_rental_pages_are_newest_first(initialized_db):
+    CustomersRepository().add_customer(Customers(full_name="Jane"))
+    rentals = RentalsRepository()
+    start = datetime.now()
+    for vehicle_id in range(1, 6):
+        rentals.add_rental(
+            Rentals(
+                vehicle_id=vehicle_id,
+                customer_id=1,
+                start_date=start,
+                expected_return_date=start + timedelta(days=1),
+            )
+        )
+
+    pages = list(
+        keyset_pages(
+            lambda before_id, limit: rentals.get_rental_details(
+                before_id=before_id, limit=limit
+            ),
+            page_size=2,
+        )
+    )
+
+    assert [[row[0] for row in rows] for rows, _ in pages] == [[5, 4], [3, 2], [1]]
+
+
+def test_empty_result_is_a_single_empty_page(initialized_db):
+    repo = CustomersRepository()
+
+    pages = list(
+        keyset_pages(lambda after_id, limit: repo.get_customers("", after_id, limit))
+    )
+
+    assert pages == [([], False)]
@@ -0,0 +1,69 @@
+import pytest
+
+from repository.customers import CustomersRepository
+from repository.users import Users, UsersRepository
+from util.importer import import_file
+from util.passwords import bcrypt_rounds, check_password, hash_password, hash_passwords
+
+
+@pytest.fixture(autouse=True)
+def fast_hashes(monkeypatch):
+    monkeypatch.setenv("CRS_BCRYPT_ROUNDS", "4")
+
+
+def test_bcrypt_rounds_from_environment(monkeypatch):
+    assert bcrypt_rounds() == 4
+    assert hash_password("secret").startswith("$2b$04$")
+
+    monkeypatch.setenv("CRS_BCRYPT_ROUNDS", "3")
+    with pytest.raises(ValueError):
+        bcrypt_rounds()
+
+
+def test_hash_passwords_in_process_pool():
+    passwords = [f"password{i}" for i in range(8)]
+
+    hashes = hash_passwords(passwords, workers=2)
+
+    assert len(hashes) == 8
+    assert all(check_password(p, h) for p, h in zip(passwords, hashes, strict=True))
+    assert not check_password("password0", hashes[1])
+
+
+def test_add_users_skips_taken_usernames(initialized_db):
+    repo = UsersRepository()
+    users = [
+        Users(username="admin", password="x", role_id=1),
+        Users(username="alice", password="a", role_id=2),
+        Users(username="bob", password="b", role_id=2),
+        Users(username="alice", password="again", role_id=2),
+    ]
+
+    user_ids = repo.add_users(repo.prepare_users(users))
+
+    assert sorted(user_ids) == ["alice", "bob"]
+    alice = repo.get_by_user_id(user_ids["alice"])
+    assert check_password("a", alice.password)
+
+
+def test_import_accounts(initialized_db, tmp_path):
+    path = tmp_path / "accounts.csv"
+    path.write_text(
+        "username,password,role,full_name,email,driver_license\n"
+        "alice,a,customer,Alice Smith,alice@example.com,DL1\n"
+        "carol,c,staff,Carol Jones,carol@example.com,\n"
+        "dave,d,customer,Dave Brown,dave@example.com,DL1\n"
+        "erin,e,manager,Erin White,erin@example.com,DL2\n"
+    )
+
+    result = import_file("accounts", str(path))
+
+    assert (result.rows, result.imported) == (4, 2)
+    users_repo = UsersRepository()
+    # dave's driver license is a duplicate, so no user is left without a profile
+    assert users_repo.get_by_username("dave") is None
+    alice = users_repo.get_by_username("alice")
+    assert CustomersRepository().get_by_user_id(alice.user_id).full_name == (
+        "Alice Smith"
+    )
+    assert users_repo.get_by_username("carol").role_id == 1
@@ -0,0 +1,129 @@
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from repository.customers import Customers, CustomersRepository
+from repository.rentals import Rentals, RentalsRepository
+from service.errors import ServiceError
+from service.pricing import PricingEngine, RateTable, Season, pricing_engine
+from service.rentals import RentalService
+
+RATES = RateTable(
+    weekend_percent=20,
+    seasons=(Season("12-20", "01-05", 50),),
+    long_term=((7, 10), (30, 25)),
+    late_fee_percent=150,
+    grace_minutes=60,
+    included_mileage_per_day=100,
+    overage_cents=25,
+)
+
+
+def test_quote_applies_weekend_season_and_long_term_rates():
+    engine = PricingEngine(RATES)
+
+    # Friday to Sunday: 45 + 54 + 54
+    quote = engine.quote(45, date(2025, 6, 6), 3)
+    assert quote.total_cents == 15300
+
+    # Across the new year every day is in season
+    assert engine.quote("45.00", date(2025, 12, 30), 2).total_cents == 2 * 6750
+
+    # A week gets 10% off, whatever weekday it starts
+    week = engine.quote(45, date(2025, 6, 2), 7)
+    assert week.base_cents == 5 * 4500 + 2 * 5400
+    assert week.discount_cents == 3330
+    assert week.total == Decimal("299.70")
+    assert engine.quote(45, date(2025, 6, 2), 40).discount_cents > 0
+
+    with pytest.raises(ServiceError):
+        engine.quote(45, date(2025, 6, 2), 0)
+
+
+def test_final_quote_adds_late_fees_and_mileage_overage():
+    engine = PricingEngine(RATES)
+    start = datetime(2025, 6, 2, 9)  # Monday
+    expected = start + timedelta(days=2)
+
+    on_time = engine.final_quote(45, start, expected, expected, 150)
+    assert on_time.total_cents == 9000
+
+    # 30 minutes late is within the grace period, 25 hours late is two days
+    grace = engine.final_quote(45, start, expected, expected + timedelta(minutes=30), 0)
+    assert grace.late_days == 0
+    late = engine.final_quote(45, start, expected, expected + timedelta(hours=25), 500)
+    assert late.late_days == 2
+    assert late.late_fee_cents == 2 * 6750
+    # 400 miles are included in the four days
+    assert late.overage_cents == 100 * 25
+
+
+def test_quote_many_prices_candidates_and_skips_invalid_ones():
+    engine = PricingEngine(RATES)
+    quotes = engine.quote_many(
+        [
+            (45, date(2025, 6, 6), 3),
+            (None, date(2025, 6, 6), 3),
+            (45, date(2025, 6, 6), 0),
+            (45, date(1990, 1, 1), 3),
+        ]
+    )
+    assert quotes[0].total_cents == 15300
+    assert quotes[1:] == [None, None, None]
+
+
+@pytest.fixture
+def rates_file(initialized_db, tmp_path, monkeypatch):
+    path = tmp_path / "rates.json"
+    path.write_text(
+        json.dumps(
+            {
+                "weekend_percent": 20,
+                "seasons": [{"start": "07-01", "end": "08-31", "percent": 30}],
+                "long_term": [[7, 10]],
+                "included_mileage_per_day": 100,
+                "overage_cents": 25,
+            }
+        )
+    )
+    monkeypatch.setenv("CRS_PRICING_PATH", str(path))
+    CustomersRepository().add_customer(Customers(user_id=2, full_name="Ann"))
+    return path
+
+
+def test_rental_service_uses_the_configured_rate_table(rates_file):
+    assert pricing_engine().rates.weekend_percent == 20
+    service = RentalService()
+
+    assert (
+        service.quote_rental(1, date(2025, 7, 4), 3).total_cents == 3 * 5850 + 2 * 900
+    )
+    quotes = service.quote_rentals(
+        [(1, date(2025, 6, 2), 1), (2, date(2025, 6, 2), 1), (999, date(2025, 6, 2), 1)]
+    )
+    assert quotes[0].total_cents == 4500
+    assert quotes[1] is not None
+    assert quotes[2] is None
+
+    # A rental booked Monday to Wednesday, returned on time with 300 miles extra
+    start = datetime(2025, 6, 2, 9)
+    rental = Rentals(
+        vehicle_id=1,
+        customer_id=1,
+        staff_id=1,
+        start_date=start,
+        expected_return_date=start + timedelta(days=2),
+        rental_status="active",
+    )
+    rental_id = service.create_rental(rental, 2)
+    assert RentalsRepository().get_by_id(rental_id).total_cost == 90
+
+    initial = RentalsRepository().get_by_id(rental_id).initial_mileage
+    cost = service.final_cost(
+        RentalsRepository().get_by_id(rental_id),
+        initial + 500,
+        start + timedelta(days=2),
+    )
+    assert cost == 90 + 300 * 0.25
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from globals import CurrentUser
+from repository.rentals import Rentals, RentalsRepository
+from repository.vehicles import VehiclesRepository
+from service.errors import ServiceError
+from service.rentals import RentalService
+
+ADMIN = CurrentUser(user_id=1, username="admin", role_name="staff")
+
+
+@pytest.fixture
+def service(initialized_db):
+    return RentalService()
+
+
+def new_rental(vehicle_id=1, days=3):
+    start = datetime.now()
+    return Rentals(
+        vehicle_id=vehicle_id,
+        customer_id=1,
+        staff_id=1,
+        start_date=start,
+        expected_return_date=start + timedelta(days=days),
+        rental_status="active",
+    )
+
+
+def test_create_rental_updates_vehicle_and_rental_together(service):
+    service.create_rental(new_rental(), 3)
+
+    vehicle = VehiclesRepository().get_by_id(1)
+    assert vehicle.status == "rented"
+    rental = RentalsRepository().get_by_id(1)
+    assert rental.total_cost == 45 * 3
+
+
+def test_create_rental_rolls_back_vehicle_status_on_failure(service, monkeypatch):
+    def fail(rental):
+        raise RuntimeError("crash between writes")
+
+    monkeypatch.setattr(service.rental_repo, "add_rental", fail)
+    with pytest.raises(RuntimeError):
+        service.create_rental(new_rental(), 3)
+
+    assert VehiclesRepository().get_by_id(1).status == "available"
+
+
+def test_rental_can_only_be_completed_once(service):
+    service.create_rental(new_rental(), 3)
+    returned = RentalsRepository().get_by_id(1).initial_mileage + 100
+    service.complete_rental(ADMIN, 1, returned)
+    completed = RentalsRepository().get_by_id(1)
+
+    with pytest.raises(ServiceError):
+        service.complete_rental(ADMIN, 1, returned + 5000)
+
+    rental = RentalsRepository().get_by_id(1)
+    assert rental.rental_status == "completed"
+    assert (rental.return_mileage, rental.total_cost) == (
+        returned,
+        completed.total_cost,
+    )
+    assert VehiclesRepository().get_by_id(1).mileage == returned
+
+
+def test_accepting_a_started_booking_rents_the_vehicle(service):
+    today = new_rental(vehicle_id=1)
+    today.rental_status = "apply"
+    later = new_rental(vehicle_id=2)
+    later.rental_status = "apply"
+    later.start_date += timedelta(days=7)
+    first = service.create_rental(today, 3)
+    second = service.create_rental(later, 3)
+    vehicles = VehiclesRepository()
+    assert vehicles.get_by_id(1).status == "available"
+
+    service.audit_rental(ADMIN, first, "active")
+    service.audit_rental(ADMIN, second, "active")
+
+    assert vehicles.get_by_id(1).status == "rented"
+    assert vehicles.get_by_id(2).status == "available"
@@ -0,0 +1,155 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from db.database import Database
+from globals import CurrentUser
+from repository.customers import Customers, CustomersRepository
+from repository.rentals import Rentals, RentalsRepository
+from repository.reports import ReportsRepository, split_period
+from service.errors import PermissionDenied
+from service.reports import ReportService
+from service.rentals import RentalService
+
+ADMIN = CurrentUser(user_id=1, username="admin", role_name="staff")
+DAY = date(2025, 3, 10)
+
+
+def rental(vehicle_id, status, total_cost, start=datetime(2025, 3, 10, 9)):
+    return Rentals(
+        vehicle_id=vehicle_id,
+        customer_id=1,
+        staff_id=1,
+        start_date=start,
+        expected_return_date=start + timedelta(days=2),
+        rental_status=status,
+        total_cost=total_cost,
+    )
+
+
+@pytest.fixture
+def customer(initialized_db):
+    return CustomersRepository().add_customer(Customers(user_id=2, full_name="Ann"))
+
+
+def test_summaries_follow_rental_changes(customer):
+    repo = RentalsRepository()
+    first = repo.add_rental(rental(1, "active", 90))
+    second = repo.add_rental(rental(1, "apply", 90))
+    repo.add_rentals([rental(2, "completed", 100.10), rental(3, "cancelled", 50)])
+    reports = ReportsRepository()
+
+    assert reports.revenue_by_vehicle(DAY, DAY) == [
+        (2, "Honda", "CR-V", "XYZ789", 1, 100.1),
+        (1, "Toyota", "Camry", "ABC123", 1, 90.0),
+    ]
+
+    repo.update_status(second, "active")
+    repo.complete_rental(first, 1200, datetime(2025, 3, 11, 9))
+    repo.update_status(second, "cancelled")
+    Database().execute("DELETE FROM rentals WHERE vehicle_id = 2")
+
+    assert reports.revenue_by_vehicle(DAY, DAY) == [
+        (1, "Toyota", "Camry", "ABC123", 1, 90.0)
+    ]
+    assert reports.status_counts() == [("cancelled", 2), ("completed", 1)]
+    toyota = [
+        row for row in reports.utilization_by_make(DAY, DAY) if row[0] == "Toyota"
+    ]
+    # The Camry was out from 9:00, 15 hours of one day of every Toyota
+    toyotas = Database().fetch_one(
+        "SELECT COUNT(*) FROM vehicles WHERE make = 'Toyota'"
+    )
+    assert toyota == [("Toyota", toyotas[0], 1, 15 / 24 / toyotas[0])]
+
+
+def test_utilization_counts_the_minutes_inside_the_period(customer):
+    repo = RentalsRepository()
+    # Ten days from midnight of March 31st, across the end of the month
+    long = rental(1, "active", 450, datetime(2025, 3, 31))
+    long.expected_return_date = datetime(2025, 4, 10)
+    rental_id = repo.add_rental(long)
+    reports = ReportsRepository()
+
+    def camry(start, end):
+        rows = reports.utilization_by_make(start, end)
+        toyotas = next(row[1] for row in rows if row[0] == "Toyota")
+        return next(row[3] for row in rows if row[0] == "Toyota") * toyotas
+
+    assert camry(date(2025, 3, 31), date(2025, 3, 31)) == 1.0
+    assert camry(date(2025, 4, 5), date(2025, 4, 5)) == 1.0
+    assert camry(date(2025, 4, 10), date(2025, 4, 10)) == 0.0
+    assert camry(date(2025, 3, 1), date(2025, 3, 31)) == 1 / 31
+    assert camry(date(2025, 3, 1), date(2025, 4, 30)) == 10 / 61
+    # Revenue and the rental count for the day it starts
+    assert reports.revenue_by_vehicle(date(2025, 4, 1), date(2025, 4, 30)) == []
+
+    odd = rental(2, "active", 10, datetime(2025, 1, 30, 7, 13, 29, 500000))
+    odd.expected_return_date = datetime(2025, 3, 2, 18, 46, 31)
+    repo.add_rental(odd)
+    # Months hold the sums of their days
+    assert Database().fetch_all(
+        "SELECT strftime('%Y-%m', day), vehicle_id, SUM(rentals), "
+        "SUM(revenue_cents), SUM(rented_minutes) FROM rental_daily_summary "
+        "GROUP BY 1, 2 ORDER BY 1, 2"
+    ) == Database().fetch_all(
+        "SELECT * FROM rental_monthly_summary ORDER BY month, vehicle_id"
+    )
+
+    repo.complete_rental(rental_id, 1100, datetime(2025, 4, 2, 12))
+    assert camry(date(2025, 4, 1), date(2025, 4, 30)) == 1.5 / 30
+    assert camry(date(2025, 4, 5), date(2025, 4, 5)) == 0.0
+    Database().execute("DELETE FROM rentals")
+    assert (
+        Database().fetch_all(
+            "SELECT * FROM rental_daily_summary WHERE rentals != 0 "
+            "OR revenue_cents != 0 OR rented_minutes != 0"
+        )
+        == []
+    )
+    assert (
+        Database().fetch_all(
+            "SELECT * FROM rental_monthly_summary WHERE rented_minutes != 0"
+        )
+        == []
+    )
+
+
+def test_existing_rentals_are_summarized(customer):
+    RentalsRepository().add_rentals([rental(1, "completed", 45)])
+    db = Database()
+    for table in ("daily", "monthly", "status"):
+        db.execute(f"DROP TABLE rental_{table}_summary")
+
+    ReportsRepository().create_table()
+
+    assert ReportsRepository().revenue_by_vehicle(DAY, DAY)[0][4:] == (1, 45.0)
+
+
+def test_split_period():
+    assert split_period(date(2025, 1, 15), date(2025, 4, 10)) == (
+        "2025-01-15",
+        "2025-01-31",
+        "2025-02",
+        "2025-03",
+        "2025-04-01",
+        "2025-04-10",
+    )
+    assert split_period(date(2025, 2, 1), date(2025, 2, 27)) == (
+        "2025-02-01",
+        "2025-02-27",
+        "",
+        "",
+        "",
+        "",
+    )
+
+
+def test_reports_are_for_staff(initialized_db):
+    RentalService().create_rental(rental(1, "active", None, datetime.now()), 3)
+    rows = ReportService().revenue_by_vehicle(ADMIN)
+    assert rows[0][0] == 1 and rows[0][5] == 135.0
+
+    customer = CurrentUser(user_id=2, username="ann", role_name="customer")
+    with pytest.raises(PermissionDenied):
+        ReportService().status_counts(customer)
@@ -0,0 +1,41 @@
+import pytest
+
+from db.database import Database
+from db.rows import columns, named_row
+from repository.customers import Customers, CustomersRepository
+from repository.rentals import Rentals, RentalsRepository
+from repository.vehicles import VehicleRow, Vehicles, VehiclesRepository
+
+
+def test_columns_and_named_rows_follow_the_record_fields():
+    assert columns(Vehicles, "v").startswith("v.vehicle_id, v.make, v.model,")
+    row = named_row(Customers)(*range(8))
+    assert row.created_at == row[7] == 7
+    assert type(row).__name__ == "CustomersRow"
+
+
+def test_queries_return_typed_records(initialized_db):
+    CustomersRepository().add_customer(Customers(user_id=2, full_name="Ann"))
+    Database().execute(
+        "INSERT INTO rentals (vehicle_id, customer_id, start_date, "
+        "expected_return_date, rental_status, total_cost) "
+        "VALUES (1, 1, '2030-01-01 10:00:00', '2030-01-03 10:00:00', 'active', 90)"
+    )
+
+    vehicles = VehiclesRepository().get_vehicles(limit=2)
+    assert isinstance(vehicles[0], VehicleRow)
+    assert (vehicles[0].make, vehicles[0].daily_rate) == ("Toyota", 45)
+
+    [details] = RentalsRepository().get_rental_details()
+    assert (details.make, details.customer, details.total_cost) == (
+        "Toyota",
+        "Ann",
+        90,
+    )
+
+    rental = RentalsRepository().get_by_id(details.rental_id)
+    assert isinstance(rental, Rentals)
+    assert rental.vehicle_id == 1
+    # Slotted records have no per-instance dict
+    with pytest.raises(AttributeError):
+        rental.note = "late"
@@ -0,0 +1,81 @@
+import pytest
+
+from repository.customers import Customers, CustomersRepository
+from repository.vehicles import Vehicles, VehiclesRepository
+
+
+@pytest.fixture
+def customers(initialized_db):
+    repo = CustomersRepository()
+    for name, email, phone, license in [
+        ("John Smith", "john@example.com", "0412345678", "DL100"),
+        ("Jane Smithers", "jane@example.com", "0498765432", "DL200"),
+        ("Bob Jones", "bob@mail.com", "0411111111", "DL300"),
+    ]:
+        repo.add_customer(
+            Customers(full_name=name, email=email, phone=phone, driver_license=license)
+        )
+    return repo
+
+
+def names(rows, column):
+    return sorted(row[column] for row in rows)
+
+
+def test_customer_search_matches_word_prefixes(customers):
+    assert names(customers.search_customers("smi"), 2) == [
+        "Jane Smithers",
+        "John Smith",
+    ]
+    assert names(customers.search_customers("jo smi"), 2) == ["John Smith"]
+    assert names(customers.search_customers("0411"), 2) == ["Bob Jones"]
+    assert names(customers.search_customers("mail"), 2) == ["Bob Jones"]
+    assert customers.search_customers("") == []
+    assert customers.search_customers('"*') == []
+
+
+def test_customer_search_ranks_best_match_first(customers):
+    results = customers.search_customers("smith")
+    assert results[0][2] == "John Smith"
+
+
+def test_customer_index_follows_updates_and_deletes(customers):
+    customers.update_customer(Customers(customer_id=3, full_name="Bob Brown"))
+    assert customers.search_customers("jones") == []
+    assert names(customers.search_customers("brown"), 2) == ["Bob Brown"]
+
+    customers.delete_customer(3)
+    assert customers.search_customers("brown") == []
+
+
+def test_customer_listing_filters_by_search(customers):
+    rows = customers.get_customers("smi", after_id=1)
+    assert names(rows, 2) == ["Jane Smithers"]
+
+
+def test_vehicle_search_covers_make_model_and_description(initialized_db):
+    repo = VehiclesRepository()
+
+    assert names(repo.search_vehicles("toy"), 1) == ["Toyota"]
+    assert names(repo.search_vehicles("camry"), 1) == ["Toyota"]
+    assert names(repo.search_vehicles("suv"), 1) == ["Audi", "Honda", "Hyundai"]
+    assert names(repo.search_vehicles("electric"), 1) == ["Tesla"]
+
+
+def test_vehicle_search_filters_status_and_follows_writes(initialized_db):
+    repo = VehiclesRepository()
+    repo.update_status(7, "maintenance")
+    repo.add_vehicle(
+        Vehicles(
+            make="Kia",
+            model="Sportage",
+            year=2024,
+            license_plate="KIA001",
+            daily_rate=50,
+            description="Family SUV",
+        )
+    )
+
+    results = repo.search_vehicles("suv", status="available")
+
+    assert names(results, 1) == ["Honda", "Hyundai", "Kia"]
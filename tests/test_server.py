@@ -0,0 +1,153 @@
+import asyncio
+import json
+
+import pytest
+
+from repository.accounts import AccountsRepository
+from repository.customers import Customers
+from repository.staff import Staff
+from repository.users import Users
+from repository.vehicles import VehiclesRepository
+from server import ApiServer
+
+
+@pytest.fixture
+def accounts(initialized_db, monkeypatch):
+    monkeypatch.setenv("CRS_BCRYPT_ROUNDS", "4")
+    monkeypatch.setenv("CRS_SESSION_SECRET", "test")
+    AccountsRepository().add_accounts(
+        [
+            (
+                Users(username="alice", password="secret", role_id=2),
+                Customers(full_name="Alice", email="alice@example.com"),
+            ),
+            (
+                Users(username="bob", password="hunter2", role_id=1),
+                Staff(full_name="Bob", email="bob@example.com"),
+            ),
+        ]
+    )
+
+
+async def request(port, method, path, body=None, token=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = json.dumps(body).encode() if body is not None else b""
+    head = [f"{method} {path} HTTP/1.1", f"Content-Length: {len(data)}"]
+    if token:
+        head.append(f"Authorization: Bearer {token}")
+    head.append("Connection: close")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + data)
+    response = await reader.read()
+    writer.close()
+    status_line, _, payload = response.partition(b"\r\n\r\n")
+    status = int(status_line.split()[1])
+    return status, json.loads(payload) if payload else None
+
+
+def run_with_server(scenario):
+    """Runs scenario(port) against a server on a free port."""
+
+    async def run():
+        started = asyncio.get_running_loop().create_future()
+        server = ApiServer(workers=4)
+        task = asyncio.create_task(
+            server.serve(
+                "127.0.0.1",
+                0,
+                lambda s: started.set_result(s.sockets[0].getsockname()[1]),
+            )
+        )
+        try:
+            return await scenario(await started)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            server.executor.shutdown()
+
+    return asyncio.run(run())
+
+
+def test_login_and_authorization(accounts):
+    async def scenario(port):
+        wrong = await request(port, "POST", "/login", {"username": "alice"})
+        anonymous = await request(port, "GET", "/vehicles")
+        _, login = await request(
+            port, "POST", "/login", {"username": "alice", "password": "secret"}
+        )
+        token = login["token"]
+        listed = await request(port, "GET", "/vehicles?limit=3", token=token)
+        staff_only = await request(port, "GET", "/customers", token=token)
+        missing = await request(port, "GET", "/vehicles/999", token=token)
+        return wrong, anonymous, login, listed, staff_only, missing
+
+    wrong, anonymous, login, listed, staff_only, missing = run_with_server(scenario)
+
+    assert wrong[0] == 401 and anonymous[0] == 401
+    assert login["role_name"] == "customer"
+    assert listed[0] == 200
+    assert [v["license_plate"] for v in listed[1]] == ["ABC123", "XYZ789", "MUS555"]
+    assert staff_only[0] == 403
+    assert missing[0] == 404
+
+
+def test_customers_only_see_available_vehicles(accounts):
+    async def scenario(port):
+        _, customer = await request(
+            port, "POST", "/login", {"username": "alice", "password": "secret"}
+        )
+        _, staff = await request(
+            port, "POST", "/login", {"username": "bob", "password": "hunter2"}
+        )
+        hidden = await request(port, "GET", "/vehicles/7", token=customer["token"])
+        shown = await request(port, "GET", "/vehicles/7", token=staff["token"])
+        return hidden, shown
+
+    VehiclesRepository().update_status(7, "maintenance")
+    hidden, shown = run_with_server(scenario)
+
+    assert hidden == (404, {"error": "Vehicle not found"})
+    assert shown[0] == 200 and shown[1]["status"] == "maintenance"
+
+
+def test_booking_flow(accounts):
+    async def scenario(port):
+        _, customer = await request(
+            port, "POST", "/login", {"username": "alice", "password": "secret"}
+        )
+        _, staff = await request(
+            port, "POST", "/login", {"username": "bob", "password": "hunter2"}
+        )
+        booked = await request(
+            port,
+            "POST",
+            "/rentals",
+            {"vehicle_id": 1, "days": 3},
+            token=customer["token"],
+        )
+        rental_id = booked[1]["rental_id"]
+        again = await request(
+            port,
+            "POST",
+            "/rentals",
+            {"vehicle_id": 1, "days": 1},
+            token=customer["token"],
+        )
+        audited = await request(
+            port,
+            "POST",
+            f"/rentals/{rental_id}/audit",
+            {"status": "active"},
+            token=staff["token"],
+        )
+        rental = await request(
+            port, "GET", f"/rentals/{rental_id}", token=customer["token"]
+        )
+        return booked, again, audited, rental
+
+    booked, again, audited, rental = run_with_server(scenario)
+
+    assert booked[0] == 201
+    assert again == (400, {"error": "Vehicle is already booked for these dates"})
+    assert audited[0] == 204
+    assert rental[1]["rental_status"] == "active"
+    assert rental[1]["total_cost"] == 135
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from globals import CurrentUser
+from repository.users import UsersRepository
+from util.session import (
+    end_session,
+    issue_token,
+    resume_session,
+    save_session,
+    verify_token,
+)
+
+ADMIN = CurrentUser(user_id=1, username="admin", role_name="staff")
+
+
+@pytest.fixture
+def session_file(initialized_db, tmp_path, monkeypatch):
+    path = tmp_path / "session"
+    monkeypatch.setenv("CRS_SESSION_PATH", str(path))
+    return path
+
+
+def test_token_round_trip(session_file):
+    token = issue_token(ADMIN, now=1000)
+
+    assert verify_token(token, now=1001) == ADMIN
+    # Expired
+    assert verify_token(token, now=1000 + 8 * 60 * 60) is None
+
+
+def test_tampered_token_is_rejected(session_file):
+    payload, _, signature = issue_token(ADMIN).partition(".")
+    other = issue_token(CurrentUser(2, "bob", "customer")).partition(".")[0]
+
+    assert verify_token(f"{other}.{signature}") is None
+    assert verify_token(f"{payload}.bad!") is None
+    assert verify_token("garbage") is None
+
+
+def test_secret_key_is_private(session_file, initialized_db):
+    issue_token(ADMIN)
+    assert os.stat(initialized_db + ".key").st_mode & 0o077 == 0
+
+
+def test_save_and_resume_session(session_file):
+    assert resume_session() is None
+    save_session(ADMIN)
+    assert session_file.stat().st_mode & 0o077 == 0
+    assert resume_session() == ADMIN
+
+    end_session()
+    assert resume_session() is None
+
+
+def test_password_change_revokes_sessions(session_file):
+    token = issue_token(ADMIN, now=1000)
+
+    UsersRepository().update_password(1, "new hash")
+
+    assert verify_token(token, now=1001) is None
+    assert verify_token(issue_token(ADMIN)) == ADMIN
+
+
+def test_deleting_user_revokes_sessions(session_file):
+    save_session(ADMIN)
+
+    UsersRepository().delete_user(1)
+
+    assert resume_session() is None
+    assert not session_file.exists()
@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+
+APP = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app")
+
+# Wall time of importing main, as reported by -X importtime, best of 3 runs.
+# It takes about 110 ms on one core; loading every command with the rich
+# console and NumPy at startup took about 370 ms.
+IMPORT_BUDGET_MS = 250
+
+# Modules that must not be imported before the first prompt
+DEFERRED = (
+    "numpy",
+    "rich.console",
+    "rich.prompt",
+    "rich.table",
+    "command.users",
+    "command.vehicles",
+    "command.reports",
+    "service.analytics",
+    "util.batch",
+    "util.importer",
+)
+
+
+def import_times(code: str):
+    """Runs code in a new interpreter and returns its imports in milliseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=APP,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative) / 1000
+    return times
+
+
+def test_startup_defers_heavy_modules_and_stays_within_budget():
+    runs = [import_times("import main") for _ in range(3)]
+
+    for name in DEFERRED:
+        assert name not in runs[0], f"{name} is imported at startup"
+    best = min(times["main"] for times in runs)
+    assert best < IMPORT_BUDGET_MS, f"importing main took {best:.0f} ms"
+
+
+def test_commands_are_imported_on_first_use():
+    # importlib.import_module() imports do not show up in -X importtime
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "from command.factory import CommandFactory\n"
+            "commands = CommandFactory()\n"
+            "commands.get_command('/vehicle')\n"
+            "commands.get_command('/report')\n"
+            "print(' '.join(sys.modules))",
+        ],
+        cwd=APP,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = set(result.stdout.split())
+    assert "command.vehicles" in modules
+    assert "command.reports" in modules
+    assert "command.rentals" not in modules
+    # Only /report fleet needs NumPy
+    assert "numpy" not in modules
@@ -0,0 +1,35 @@
+import pytest
+
+from db.statements import normalize, reset_statement_stats, statement, variant
+from repository import vehicles
+from repository.vehicles import VehiclesRepository
+
+
+def test_normalize_keeps_string_literals():
+    sql = """
+    SELECT *  FROM vehicles
+    WHERE description = 'two  spaces'
+    """
+    assert normalize(sql) == "SELECT * FROM vehicles WHERE description = 'two  spaces'"
+
+
+def test_statement_is_registered_once():
+    first = statement("test.select", "SELECT 1")
+    assert statement("test.select", "SELECT   1") is first
+    with pytest.raises(ValueError):
+        statement("test.select", "SELECT 2")
+
+
+def test_variant():
+    assert variant("t.get", status="", limit=True) == "t.get[limit]"
+    assert variant("t.get", status="") == "t.get"
+
+
+def test_statements_count_executions(initialized_db):
+    reset_statement_stats()
+    repo = VehiclesRepository()
+    repo.get_by_id(1)
+    repo.get_by_id(2)
+
+    assert vehicles.GET_BY_ID.calls == 2
+    assert vehicles.GET_BY_ID.seconds > 0
@@ -1,6 +1,7 @@
 import pytest
 
 from app.util.validation import (
+    validate_date,
     validate_digit,
     validate_email,
     validate_phone,
@@ -79,3 +80,16 @@ def test_validate_year():
 )
 def test_validate_price(price, expected):
     assert validate_price(price) == expected
+
+
+def test_validate_date():
+    import datetime
+
+    today = datetime.date.today()
+
+    assert validate_date(today.isoformat()) is True
+    assert validate_date((today + datetime.timedelta(days=30)).isoformat()) is True
+    assert validate_date((today - datetime.timedelta(days=1)).isoformat()) is False
+    assert validate_date("2025-02-30") is False
+    assert validate_date("tomorrow") is False
+    assert validate_date("") is False